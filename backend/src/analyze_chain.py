@@ -1,6 +1,7 @@
 import os
 import time
 from puzzle import Puzzle
+from chain_validator import validate_chain
 from main import load_puzzles_from_file
 
 def analyze_puzzle_chain(chain, min_length=64, verbose=True):
@@ -17,19 +18,15 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
     print(f"Chain length: {chain_length} ({(chain_length/total_puzzles*100):.1f}% of total puzzles)")
     
     # 1. Validate connections
-    connection_errors = []
-    for i in range(chain_length - 1):
-        p1 = puzzles[chain[i]]
-        p2 = puzzles[chain[i+1]]
-        if p1.puzzle_sides['gives'] != p2.puzzle_sides['takes']:
-            connection_errors.append(
-                f"Position {i}->{i+1}: {p1.puzzle_number} gives {p1.puzzle_sides['gives']} but {p2.puzzle_number} takes {p2.puzzle_sides['takes']}"
-            )
+    validation = validate_chain(Puzzle.get_graph(), chain, max_errors=None)
     
-    if connection_errors:
-        print(f"\n❌ INVALID CONNECTIONS FOUND: {len(connection_errors)}")
-        for error in connection_errors:
-            print(f"  {error}")
+    if not validation["connected"]:
+        print(f"\n❌ INVALID CONNECTIONS FOUND: {len(validation['breaks'])}")
+        for entry in validation["breaks"]:
+            i = entry["position"] - 2
+            p1 = Puzzle.get_puzzle(chain[i])
+            p2 = Puzzle.get_puzzle(chain[i+1])
+            print(f"  Position {i}->{i+1}: {p1.puzzle_number} gives {p1.puzzle_sides['gives']} but {p2.puzzle_number} takes {p2.puzzle_sides['takes']}")
     else:
         print(f"\n✅ All connections are valid")
     
@@ -37,26 +34,21 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
     chain_ids = set(chain)
     unique_ids = len(chain_ids)
     
-    if unique_ids != chain_length:
+    if not validation["unique"]:
         print(f"\n❌ DUPLICATE IDs FOUND: Chain has {chain_length} puzzles but only {unique_ids} unique IDs")
         
-        # Find duplicates
-        id_counts = {}
-        for puzzle_id in chain:
-            id_counts[puzzle_id] = id_counts.get(puzzle_id, 0) + 1
-            
-        duplicates = {puzzle_id: count for puzzle_id, count in id_counts.items() if count > 1}
+        duplicates = validation["duplicates"]
         print(f"  Duplicated IDs: {len(duplicates)}")
         
         if verbose:
-            for puzzle_id, count in duplicates.items():
-                puzzle = puzzles[puzzle_id]
-                print(f"  ID {puzzle_id} (Puzzle #{puzzle.puzzle_number}) appears {count} times")
+            for entry in duplicates:
+                puzzle = Puzzle.get_puzzle(entry["id"])
+                print(f"  ID {entry['id']} (Puzzle #{puzzle.puzzle_number}) appears {entry['count']} times")
     else:
         print(f"\n✅ All IDs in the chain are unique")
     
     # 3. Identify unused puzzles
-    all_ids = set(range(len(puzzles)))
+    all_ids = set(Puzzle.get_graph().nodes())
     unused_ids = all_ids - chain_ids
     unused_count = len(unused_ids)
     
@@ -75,7 +67,7 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
     if verbose and unused_ids:
         print("\nSample of unused puzzles:")
         for i, puzzle_id in enumerate(list(unused_ids)[:10]):  # Show first 10 unused
-            puzzle = puzzles[puzzle_id]
+            puzzle = Puzzle.get_puzzle(puzzle_id)
             print(f"  {i+1}. ID {puzzle_id}: #{puzzle.puzzle_number} - Takes: {puzzle.puzzle_sides['takes']}, Gives: {puzzle.puzzle_sides['gives']}")
         if unused_count > 10:
             print(f"  ... and {unused_count - 10} more")
@@ -83,15 +75,15 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
     # 4. Check if any unused puzzles could connect to the chain
     if unused_ids:
         # Get start and end of chain
-        chain_start = puzzles[chain[0]]
-        chain_end = puzzles[chain[-1]]
+        chain_start = Puzzle.get_puzzle(chain[0])
+        chain_end = Puzzle.get_puzzle(chain[-1])
         
         # Check which unused puzzles could connect to start/end
         could_connect_start = []
         could_connect_end = []
         
         for puzzle_id in unused_ids:
-            unused_puzzle = puzzles[puzzle_id]
+            unused_puzzle = Puzzle.get_puzzle(puzzle_id)
             
             # Could connect to start?
             if unused_puzzle.puzzle_sides['gives'] == chain_start.puzzle_sides['takes']:
@@ -122,25 +114,17 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
     # NEW: Find branching points in chain (where alternative paths were possible)
     print("\n===== BRANCHING ANALYSIS =====")
     
-    # Build graph of puzzle connections to analyze branching
-    graph = {}
-    for p in puzzles:
-        graph[p.id] = []
-    
-    # Add connections based on gives->takes matching
-    for p1 in puzzles:
-        for p2 in puzzles:
-            if p1.id != p2.id and p1.puzzle_sides['gives'] == p2.puzzle_sides['takes']:
-                graph[p1.id].append(p2.id)
+    # Use the shared value-bucket index to analyze branching
+    graph = Puzzle.get_graph()
     
     # Find branch points in the chain
     branching_points = []
     for i, puzzle_id in enumerate(chain[:-1]):  # Skip the last element as it can't branch forward
-        current_puzzle = puzzles[puzzle_id]
+        current_puzzle = Puzzle.get_puzzle(puzzle_id)
         next_id_in_chain = chain[i+1]
         
         # Find all possible connections from this point
-        possible_next_ids = graph[puzzle_id]
+        possible_next_ids = graph.neighbors(puzzle_id)
         
         # Filter out the one we actually used in the chain
         alternate_paths = [id for id in possible_next_ids if id != next_id_in_chain]
@@ -163,16 +147,16 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
             print("\nTop 10 branching points:")
             # Sort by number of alternatives
             for i, bp in enumerate(sorted(branching_points, key=lambda x: x['alternate_count'], reverse=True)[:10]):
-                used_next_puzzle = puzzles[bp['used_next']]
+                used_next_puzzle = Puzzle.get_puzzle(bp['used_next'])
                 print(f"  {i+1}. Position {bp['position']+1}: Puzzle #{bp['puzzle_number']} (ID {bp['puzzle_id']}) → #{used_next_puzzle.puzzle_number}")
-                print(f"     Used connection: Gives {puzzles[bp['puzzle_id']].puzzle_sides['gives']} → Takes {used_next_puzzle.puzzle_sides['takes']}")
+                print(f"     Used connection: Gives {Puzzle.get_puzzle(bp['puzzle_id']).puzzle_sides['gives']} → Takes {used_next_puzzle.puzzle_sides['takes']}")
                 print(f"     Alternatives: {bp['alternate_count']} other puzzles could have followed")
                 
                 # Show a few alternatives
                 if bp['alternate_count'] > 0:
                     print(f"     Example alternatives:")
                     for j, alt_id in enumerate(bp['alternate_ids'][:3]):
-                        alt_puzzle = puzzles[alt_id]
+                        alt_puzzle = Puzzle.get_puzzle(alt_id)
                         print(f"       - #{alt_puzzle.puzzle_number} (ID {alt_id}): Takes {alt_puzzle.puzzle_sides['takes']}, Gives {alt_puzzle.puzzle_sides['gives']}")
                     if bp['alternate_count'] > 3:
                         print(f"       ... and {bp['alternate_count'] - 3} more")
@@ -187,7 +171,7 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
         print("\nFormat 1:")
         formatted_chain_1 = []
         for i, puzzle_id in enumerate(chain):
-            puzzle = puzzles[puzzle_id]
+            puzzle = Puzzle.get_puzzle(puzzle_id)
             takes = puzzle.puzzle_sides['takes']
             gives = puzzle.puzzle_sides['gives']
             
@@ -215,7 +199,7 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
         print("\nFormat 2:")
         formatted_chain_2 = []
         for i, puzzle_id in enumerate(chain):
-            puzzle = puzzles[puzzle_id]
+            puzzle = Puzzle.get_puzzle(puzzle_id)
             formatted_chain_2.append(puzzle.puzzle_number)
             
         # Join with dots
@@ -230,8 +214,8 @@ def analyze_puzzle_chain(chain, min_length=64, verbose=True):
     return {
         "total_puzzles": total_puzzles,
         "chain_length": chain_length,
-        "is_valid": len(connection_errors) == 0,
-        "has_duplicates": unique_ids != chain_length,
+        "is_valid": validation["connected"],
+        "has_duplicates": not validation["unique"],
         "used_count": used_count,
         "unused_count": unused_count,
         "verification_passed": used_count + unused_count == total_puzzles,
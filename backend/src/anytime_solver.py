@@ -0,0 +1,261 @@
+# backend/src/anytime_solver.py
+import time
+import random
+import logging
+
+from puzzle_graph import VALUE_COUNT
+from trail_solver import TrailSearch
+
+logger = logging.getLogger(__name__)
+
+
+class AnytimeSearch:
+    """Greedy trail construction followed by local search on a ValueMultigraph
+
+    A greedy walk gives a complete trail within milliseconds. It is then
+    improved by extending both ends and splicing closed walks over unused
+    edges into the trail wherever it passes a value that still has some.
+    After that the search repeatedly cuts off a random end of the trail and
+    regrows it with some randomness, keeping the result unless it is shorter,
+    and restarts from another start value when it stops improving. The best
+    trail so far is always available, so the search can stop at any time.
+
+    Like TrailSearch, trails are kept as (takes, gives) pairs and only mapped
+    to puzzle IDs at the end. The multigraph must be unweighted.
+    """
+
+    # Perturbations without improvement before restarting from another start value
+    RESTART_AFTER = 200
+    # Chance of a random instead of the greedy choice while regrowing a trail
+    NOISE = 0.2
+
+    def __init__(self, multigraph, seed=None):
+        self.multigraph = multigraph
+        self.rng = random.Random(seed)
+        # Unused edge counts in both directions
+        self.out_counts = [{} for _ in range(VALUE_COUNT)]
+        self.in_counts = [{} for _ in range(VALUE_COUNT)]
+        self.out_left = [0] * VALUE_COUNT
+        self.in_left = [0] * VALUE_COUNT
+        for (takes, gives), ids in multigraph.edges.items():
+            self.out_counts[takes][gives] = len(ids)
+            self.in_counts[gives][takes] = len(ids)
+            self.out_left[takes] += len(ids)
+            self.in_left[gives] += len(ids)
+        self.iterations = 0
+
+    def _take(self, u, w):
+        self.out_counts[u][w] -= 1
+        self.in_counts[w][u] -= 1
+        self.out_left[u] -= 1
+        self.in_left[w] -= 1
+
+    def _release(self, pairs):
+        for u, w in pairs:
+            self.out_counts[u][w] += 1
+            self.in_counts[w][u] += 1
+            self.out_left[u] += 1
+            self.in_left[w] += 1
+
+    def _pick(self, vertex, counts, left, noise):
+        """Next value from vertex over an unused edge, or None
+
+        Self-loops come first since they never block anything; otherwise the
+        value with the most unused edges left to continue from wins.
+        """
+        candidates = [w for w, count in counts[vertex].items() if count]
+        if not candidates:
+            return None
+        if vertex in candidates:
+            return vertex
+        if noise and self.rng.random() < noise:
+            return self.rng.choice(candidates)
+        rng = self.rng
+        return max(candidates, key=lambda w: (left[w], rng.random()))
+
+    def _walk_forward(self, vertex, noise=0.0):
+        """Greedy trail over unused edges from vertex, as pairs"""
+        pairs = []
+        while True:
+            w = self._pick(vertex, self.out_counts, self.out_left, noise)
+            if w is None:
+                return pairs
+            self._take(vertex, w)
+            pairs.append((vertex, w))
+            vertex = w
+
+    def _walk_backward(self, vertex, noise=0.0):
+        """Greedy trail over unused edges ending at vertex, as pairs in trail order"""
+        pairs = []
+        while True:
+            u = self._pick(vertex, self.in_counts, self.in_left, noise)
+            if u is None:
+                pairs.reverse()
+                return pairs
+            self._take(u, vertex)
+            pairs.append((u, vertex))
+            vertex = u
+
+    def _closed_walk(self, vertex):
+        """Closed trail over unused edges from vertex back to it, possibly empty"""
+        pairs = self._walk_forward(vertex)
+        # Keep the walk up to its last return to vertex and give back the rest
+        end = len(pairs)
+        while end and pairs[end - 1][1] != vertex:
+            end -= 1
+        self._release(pairs[end:])
+        return pairs[:end]
+
+    def _splice_cycles(self, trail):
+        """Splice closed walks over unused edges in wherever the trail passes their value"""
+        if not trail:
+            return trail, False
+        spliced = []
+        changed = False
+        vertex = trail[0][0]
+        for pair in trail + [None]:
+            if self.out_left[vertex] and self.in_left[vertex]:
+                cycle = self._closed_walk(vertex)
+                if cycle:
+                    spliced.extend(cycle)
+                    changed = True
+            if pair is not None:
+                spliced.append(pair)
+                vertex = pair[1]
+        return spliced, changed
+
+    def _improve(self, trail, noise=0.0):
+        """Extend both ends and splice in cycles until nothing changes"""
+        while True:
+            if trail:
+                trail = trail + self._walk_forward(trail[-1][1], noise)
+                trail = self._walk_backward(trail[0][0], noise) + trail
+            trail, changed = self._splice_cycles(trail)
+            if not changed:
+                return trail
+
+    def construct(self, start, noise=0.0):
+        """A fresh trail from start, greedily built and improved; takes its edges"""
+        return self._improve(self._walk_forward(start, noise), noise)
+
+    def extend(self, trail):
+        """Grow an existing trail of pairs with unused edges; takes its edges
+
+        The trail's own pairs stay in order, new ones are only added at its
+        ends or spliced in as closed walks where it passes their value.
+        """
+        trail = list(trail)
+        for u, w in trail:
+            if not self.out_counts[u].get(w):
+                raise ValueError(f"Trail uses more {u:02d} -> {w:02d} edges than the multigraph has")
+            self._take(u, w)
+        return self._improve(trail)
+
+    def perturb(self, trail):
+        """Cut off a random end of the trail and regrow it with some randomness"""
+        cut = self.rng.randrange(len(trail))
+        if self.rng.random() < 0.5:
+            self._release(trail[cut:])
+            trail = trail[:cut]
+            if not trail:
+                return self.construct(self.rng.choice(self.start_values()), self.NOISE)
+            trail = trail + self._walk_forward(trail[-1][1], self.NOISE)
+        else:
+            self._release(trail[:cut])
+            trail = trail[cut:]
+            trail = self._walk_backward(trail[0][0], self.NOISE) + trail
+        return self._improve(trail, self.NOISE)
+
+    def start_values(self):
+        """Values with outgoing edges, those with surplus outgoing edges first"""
+        graph = self.multigraph
+        candidates = [v for v in range(VALUE_COUNT) if graph.out_degree[v]]
+        return sorted(candidates, key=lambda v: (-graph.imbalance(v), -graph.out_degree[v], v))
+
+    def _replace(self, old, new):
+        """Switch the taken edges from trail old to trail new"""
+        self._release(old)
+        for u, w in new:
+            self._take(u, w)
+
+
+def solve_anytime(multigraph, timeout_seconds=60, seed=None, progress_callback=None, stop_event=None):
+    """Longest trail by greedy construction and local search, stopping at the deadline
+
+    Returns the best trail found when the deadline fires, the stop event is
+    set or the trail reaches the upper bound, in which case it is optimal.
+    """
+    start_time = time.time()
+    deadline = start_time + timeout_seconds
+    trail_search = TrailSearch(multigraph)
+    upper_bound = trail_search.global_upper_bound() if multigraph.edge_count else 0
+    search = AnytimeSearch(multigraph, seed)
+
+    starts = search.start_values()
+    if not starts:
+        return {"chain": [], "optimal": True, "upper_bound": 0, "operations": 0, "search_time_seconds": 0.0}
+
+    def report_best(pairs):
+        if progress_callback is not None:
+            progress_callback("best", {
+                "best_length": len(pairs),
+                "chain": trail_search.expand(pairs),
+                "elapsed_seconds": time.time() - start_time
+            })
+
+    trail = search.construct(starts[0])
+    best = list(trail)
+    report_best(best)
+    logger.info(f"Anytime search: greedy trail of {len(best)} puzzles in {time.time() - start_time:.4f} "
+                f"seconds, upper bound {upper_bound}")
+
+    last_report = start_time
+    stale = 0
+    restarts = 0
+    while len(best) < upper_bound:
+        now = time.time()
+        if now >= deadline or (stop_event is not None and stop_event.is_set()):
+            break
+        if progress_callback is not None and now - last_report >= TrailSearch.PROGRESS_INTERVAL:
+            last_report = now
+            elapsed = now - start_time
+            progress_callback("progress", {
+                "operations": search.iterations,
+                "ops_per_second": search.iterations / elapsed if elapsed > 0 else 0,
+                "best_length": len(best),
+                "restarts": restarts,
+                "elapsed_seconds": elapsed
+            })
+
+        search.iterations += 1
+        if stale >= search.RESTART_AFTER:
+            # Start over from another value, still keeping the best trail
+            search._release(trail)
+            trail = search.construct(search.rng.choice(starts), search.NOISE)
+            stale = 0
+            restarts += 1
+        else:
+            candidate = search.perturb(list(trail))
+            if len(candidate) >= len(trail):
+                trail = candidate
+            else:
+                search._replace(candidate, trail)
+
+        if len(trail) > len(best):
+            best = list(trail)
+            stale = 0
+            report_best(best)
+        else:
+            stale += 1
+
+    elapsed = time.time() - start_time
+    optimal = len(best) >= upper_bound
+    logger.info(f"Anytime search finished: {len(best)} puzzles, upper bound {upper_bound}, optimal: {optimal}, "
+                f"{search.iterations:,} iterations and {restarts} restarts in {elapsed:.2f} seconds")
+    return {
+        "chain": trail_search.expand(best),
+        "optimal": optimal,
+        "upper_bound": upper_bound,
+        "operations": search.iterations,
+        "search_time_seconds": elapsed
+    }
@@ -0,0 +1,255 @@
+# backend/src/benchmarks.py
+import os
+import sys
+import time
+import logging
+
+from puzzle import Puzzle
+from main import load_puzzles_from_file
+
+# Configure minimal logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def legacy_path_copy_search(graph, starts, max_operations):
+    """Reference copy of the original DFS core that copies `path + [neighbor]` per push
+
+    Searches from each start in turn until max_operations nodes have been
+    visited. Returns (max_path, operation_count).
+    """
+    max_path = []
+    operation_count = 0
+    memo = {}
+
+    for start_node in starts:
+        stack = [(start_node, [start_node])]
+        visited = set()
+
+        while stack and operation_count < max_operations:
+            current, path = stack.pop()
+
+            if current in visited and len(path) <= memo.get(current, 0):
+                continue
+
+            visited.add(current)
+            memo[current] = max(memo.get(current, 0), len(path))
+            operation_count += 1
+
+            if len(path) > len(max_path):
+                max_path = path.copy()
+
+            for neighbor in sorted(graph[current], reverse=True):
+                if neighbor not in path:
+                    stack.append((neighbor, path + [neighbor]))
+        if operation_count >= max_operations:
+            break
+
+    return max_path, operation_count
+
+
+def in_place_search(graph, starts, max_operations):
+    """The same search as legacy_path_copy_search with the in-place path of Puzzle._search_dfs
+
+    One successor iterator per node on a single mutable path, with a
+    bytearray for path membership. Nodes are visited in the same order as
+    the path-copy version, so both do the same work for the same budget.
+    """
+    max_path = []
+    operation_count = 0
+    memo = {}
+    successors = {node: sorted(neighbors) for node, neighbors in graph.items()}
+    in_path = bytearray(max(graph) + 1 if graph else 0)
+    path = []
+
+    for start_node in starts:
+        visited = set()
+        iterators = []
+        pending = start_node
+
+        while pending is not None and operation_count < max_operations:
+            current = pending
+            pending = None
+            depth = len(path) + 1
+
+            if not (current in visited and depth <= memo.get(current, 0)):
+                visited.add(current)
+                memo[current] = max(memo.get(current, 0), depth)
+                operation_count += 1
+
+                path.append(current)
+                in_path[current] = 1
+                if depth > len(max_path):
+                    max_path = path.copy()
+                iterators.append(iter(successors[current]))
+
+            while iterators:
+                for neighbor in iterators[-1]:
+                    if not in_path[neighbor]:
+                        pending = neighbor
+                        break
+                if pending is not None:
+                    break
+                iterators.pop()
+                in_path[path.pop()] = 0
+
+        for node in path:
+            in_path[node] = 0
+        path.clear()
+        if operation_count >= max_operations:
+            break
+
+    return max_path, operation_count
+
+
+def chain_workload(length):
+    """Pieces whose values cycle through 00..99, so chains run as deep as the collection"""
+    return [f"{i % 100:02d}{i % 89 + 10:02d}{(i + 1) % 100:02d}" for i in range(length)]
+
+
+def bench_dfs(dataset=None, max_operations=20000, repeats=5, length=2000):
+    """Compare ops/sec of the path-copy DFS with the in-place DFS
+
+    Both searches run from the same start nodes in the same order with the
+    same operation budget, so they visit exactly the same nodes and only
+    their path handling differs. Rates are the median over repeats runs.
+    Without a dataset file a deep generated workload of length pieces is
+    used, where path copies grow with the chain depth.
+    """
+    Puzzle.reset()
+    if dataset is None:
+        for number in chain_workload(length):
+            Puzzle.add_puzzle_direct(number)
+        dataset = "generated chain workload"
+    else:
+        load_puzzles_from_file(os.path.join(DATA_DIR, dataset))
+    graph = Puzzle.get_graph().to_adjacency()
+    starts = sorted(graph)
+
+    rates = {"path copy": [], "in place": []}
+    results = {}
+    for _ in range(repeats):
+        for name, search in (("path copy", legacy_path_copy_search), ("in place", in_place_search)):
+            start_time = time.perf_counter()
+            path, operations = search(graph, starts, max_operations)
+            elapsed = time.perf_counter() - start_time
+            rates[name].append(operations / elapsed if elapsed > 0 else 0)
+            results[name] = (len(path), operations)
+    # Same starts, order and budget must mean the same work
+    assert results["path copy"] == results["in place"], results
+
+    median = {name: sorted(values)[len(values) // 2] for name, values in rates.items()}
+    best_length, operations = results["in place"]
+    print(f"\n===== DFS BENCHMARK: {dataset} ({len(graph)} puzzles) =====")
+    print(f"{operations:,} operations per run, best length {best_length}, median of {repeats} runs")
+    print(f"{'Search':<12} {'Ops/s':<12}")
+    print("-" * 24)
+    for name, rate in median.items():
+        print(f"{name:<12} {rate:<12,.0f}")
+    if median["path copy"] > 0:
+        print(f"\nSpeedup: {median['in place'] / median['path copy']:.1f}x ops/sec")
+
+    return {"legacy_ops_per_second": median["path copy"], "ops_per_second": median["in place"]}
+
+
+def bench_chain_render(length=10000):
+    """Time rendering a long chain through the API, export and debug paths
+
+    The chain is solved once up front and served to the endpoints from a
+    chain cache in a temporary directory, so the run neither solves on the
+    request path nor writes into the real chain cache or exports directory.
+    """
+    import tempfile
+    import main
+    from chain_cache import ChainCache
+    from chain_export import chunked, iter_path_text
+
+    # Values cycle through 00..99, so every piece follows the previous one
+    Puzzle.reset()
+    for number in chain_workload(length):
+        Puzzle.add_puzzle_direct(number)
+
+    chain = Puzzle.find_longest_chain(timeout_seconds=60, export_paths=False, mode="euler")
+    assert len(chain) == length
+
+    timings = {}
+    real_cache = main.chain_cache
+    with tempfile.TemporaryDirectory() as temp_dir:
+        main.chain_cache = ChainCache(cache_dir=temp_dir)
+        try:
+            store = Puzzle.get_graph().store
+            main.chain_cache.put(Puzzle.get_graph().content_hash(), "euler", 60, {"optimal": True},
+                                 [store.number(puzzle_id) for puzzle_id in chain])
+            client = main.app.test_client()
+            for name, url in [
+                ("longest_chain", "/api/puzzles/longest_chain?mode=euler"),
+                ("chain.txt", "/api/puzzles/export/chain.txt?mode=euler"),
+                ("chain.json", "/api/puzzles/export/chain.json?mode=euler"),
+            ]:
+                start_time = time.time()
+                response = client.get(url)
+                response.get_data()
+                timings[name] = time.time() - start_time
+                assert response.status_code == 200, f"{url} returned {response.status_code}"
+        finally:
+            main.chain_cache = real_cache
+
+        start_time = time.time()
+        Puzzle.debug_chain(chain)
+        timings["debug_chain"] = time.time() - start_time
+
+        # The rendering Puzzle.export_path does, into the temporary directory
+        start_time = time.time()
+        with open(os.path.join(temp_dir, "path.txt"), 'w') as f:
+            f.writelines(chunked(iter_path_text(chain, Puzzle.get_puzzle)))
+        timings["export_path"] = time.time() - start_time
+
+    print(f"\n===== CHAIN RENDER BENCHMARK: {length} puzzles =====")
+    for name, elapsed in timings.items():
+        print(f"{name:<15} {elapsed:.3f}s")
+
+    return timings
+
+
+def bench_load(count=10_000_000):
+    """Time loading a generated text file of count random puzzles"""
+    import random
+    import tempfile
+    
+    rng = random.Random(0)
+    with tempfile.NamedTemporaryFile(mode='wb', suffix=".txt", delete=False) as f:
+        block_size = max(min(count, 100000), 1)
+        block = "".join(f"{rng.randrange(100):02d}{rng.randrange(100):02d}{rng.randrange(100):02d}\n"
+                        for _ in range(block_size)).encode()
+        for _ in range(count // block_size):
+            f.write(block)
+        f.write(block[:7 * (count % block_size)])
+        file_path = f.name
+    
+    try:
+        start_time = time.time()
+        loaded = load_puzzles_from_file(file_path)
+        elapsed = time.time() - start_time
+    finally:
+        os.remove(file_path)
+    
+    print(f"\n===== LOAD BENCHMARK: {loaded:,} puzzles =====")
+    print(f"load_puzzles_from_file {elapsed:.2f}s ({loaded / elapsed if elapsed > 0 else 0:,.0f} puzzles/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "render":
+        bench_chain_render(int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
+    elif len(sys.argv) > 1 and sys.argv[1] == "load":
+        bench_load(int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000)
+    else:
+        dataset = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != "generated" else None
+        max_operations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+        bench_dfs(dataset, max_operations)
@@ -0,0 +1,147 @@
+# backend/src/chain_cache.py
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ChainCache:
+    """Longest-chain results keyed by dataset content hash and solver mode
+
+    Entries live in an in-memory LRU and, when a cache directory is given, are
+    also written as JSON files so they survive restarts. Chains are stored as
+    puzzle numbers rather than IDs, so a hit stays valid when the same pieces
+    are loaded in a different order.
+    """
+
+    def __init__(self, max_entries=32, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        dataset_hash, mode = key
+        return os.path.join(self.cache_dir, f"chain_{dataset_hash}_{mode}.json")
+
+    def _load_from_disk(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable chain cache file {path}: {e}")
+            return None
+
+    def _remember(self, key, entry):
+        """Insert an entry as most recently used, evicting the oldest"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, dataset_hash, mode, timeout_seconds):
+        """Cached entry usable for a solve with the given timeout, or None
+
+        An entry is reusable when it was proven optimal or was computed with
+        at least as much time as the caller is willing to spend.
+        """
+        key = (dataset_hash, mode)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            else:
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    self._remember(key, entry)
+
+        if entry is None:
+            return None
+        if not entry["optimal"] and entry["timeout_seconds"] < timeout_seconds:
+            return None
+        return entry
+
+    def put(self, dataset_hash, mode, timeout_seconds, result, numbers):
+        """Store a solve result; numbers are the puzzle numbers of its chain"""
+        key = (dataset_hash, mode)
+        entry = {
+            "mode": mode,
+            "timeout_seconds": timeout_seconds,
+            "optimal": result["optimal"],
+            "operations": result.get("operations", 0),
+            "search_time_seconds": result.get("search_time_seconds", 0.0),
+            "numbers": numbers
+        }
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is None:
+                # An evicted entry may still hold a stronger result on disk
+                existing = self._load_from_disk(key)
+            # Never replace a proven or longer result with a weaker one
+            if existing is not None and (existing["optimal"] or len(existing["numbers"]) > len(numbers)):
+                if timeout_seconds <= existing["timeout_seconds"]:
+                    self._remember(key, existing)
+                    return existing
+                # The kept result now also answers solves with the longer timeout
+                entry = dict(existing, timeout_seconds=timeout_seconds)
+            self._remember(key, entry)
+
+        self._write_to_disk(key, entry)
+        return entry
+
+    def _write_to_disk(self, key, entry):
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write chain cache file {path}: {e}")
+
+    def clear(self):
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+def chain_from_numbers(graph, numbers):
+    """Map cached puzzle numbers back onto puzzle IDs of the loaded collection
+
+    Returns None if the collection does not contain the pieces.
+    """
+    store = graph.store
+    wanted = {}
+    for number in numbers:
+        wanted[number] = wanted.get(number, 0) + 1
+
+    ids_by_number = {}
+    for puzzle_id in graph.nodes():
+        number = store.number(puzzle_id)
+        if number in wanted:
+            ids = ids_by_number.setdefault(number, [])
+            if len(ids) < wanted[number]:
+                ids.append(puzzle_id)
+
+    chain = []
+    used = {}
+    for number in numbers:
+        ids = ids_by_number.get(number, [])
+        index = used.get(number, 0)
+        if index >= len(ids):
+            return None
+        chain.append(ids[index])
+        used[number] = index + 1
+    return chain
@@ -0,0 +1,280 @@
+# backend/src/chain_counter.py
+import math
+import time
+import logging
+
+from trail_solver import TrailSearch
+from graph_reduction import solve_reduced
+from anytime_solver import solve_anytime
+from chain_enumerator import enumerate_trails
+
+logger = logging.getLogger(__name__)
+
+# Eulerian counts are only computed as exact integers up to this many digits;
+# beyond that they are known through their logarithm
+MAX_EXACT_DIGITS = 1000
+# Counts with more digits than this are shown in scientific notation
+MAX_SHOWN_DIGITS = 60
+
+
+def determinant(matrix):
+    """Exact determinant of a square integer matrix by fraction-free (Bareiss) elimination"""
+    matrix = [list(row) for row in matrix]
+    size = len(matrix)
+    sign = 1
+    previous = 1
+    for k in range(size - 1):
+        if not matrix[k][k]:
+            pivot = next((i for i in range(k + 1, size) if matrix[i][k]), None)
+            if pivot is None:
+                return 0
+            matrix[k], matrix[pivot] = matrix[pivot], matrix[k]
+            sign = -sign
+        pivot_row = matrix[k]
+        pivot_value = pivot_row[k]
+        pivot_tail = pivot_row[k + 1:]
+        for i in range(k + 1, size):
+            row = matrix[i]
+            factor = row[k]
+            if factor:
+                row[k + 1:] = [(a * pivot_value - factor * b) // previous for a, b in zip(row[k + 1:], pivot_tail)]
+            elif pivot_value != previous:
+                # Nothing to eliminate, but the row still takes the pivot factor
+                row[k + 1:] = [a * pivot_value // previous for a in row[k + 1:]]
+        previous = pivot_value
+    return sign * matrix[-1][-1] if size else 1
+
+
+def log10_determinant(matrix):
+    """log10 of the absolute determinant of a square matrix, by floating-point elimination
+
+    Returns None for a singular matrix. Pivots are summed as logarithms, so
+    determinants far beyond the float range are fine.
+    """
+    matrix = [[float(a) for a in row] for row in matrix]
+    size = len(matrix)
+    total = 0.0
+    for k in range(size):
+        pivot = max(range(k, size), key=lambda i: abs(matrix[i][k]))
+        if matrix[pivot][k] == 0.0:
+            return None
+        matrix[k], matrix[pivot] = matrix[pivot], matrix[k]
+        pivot_row = matrix[k]
+        pivot_value = pivot_row[k]
+        total += math.log10(abs(pivot_value))
+        pivot_tail = pivot_row[k + 1:]
+        for i in range(k + 1, size):
+            row = matrix[i]
+            factor = row[k] / pivot_value
+            if factor:
+                row[k + 1:] = [a - factor * b for a, b in zip(row[k + 1:], pivot_tail)]
+    return total
+
+
+def log10_of(count):
+    """log10 of a positive integer of any size"""
+    # Keep the leading 53 bits; math.log10 would convert the whole int to a float
+    shift = max(count.bit_length() - 53, 0)
+    return math.log10(count >> shift) + shift * math.log10(2)
+
+
+def _log10_factorial(n):
+    return math.lgamma(n + 1) / math.log(10)
+
+
+def _log10_sum(logs):
+    """log10 of the sum of numbers given by their log10, or None for no numbers"""
+    logs = list(logs)
+    if not logs:
+        return None
+    top = max(logs)
+    return top + math.log10(sum(10 ** (x - top) for x in logs))
+
+
+def _eulerian_terms(multigraph):
+    """Pieces of the BEST-theorem count, or None without an Eulerian trail
+
+    Returns the reduced Laplacian of the multigraph closed into a circuit,
+    the number of cuts that turn a circuit into a trail, and per value its
+    degree in the circuit, whether it got the closing edge and the
+    multiplicities of its (takes, gives) pairs.
+    """
+    vertices = sorted({v for pair in multigraph.edges for v in pair})
+    if not vertices:
+        return None
+    start = multigraph.eulerian_start(vertices)
+    if start is None:
+        return None
+    end = next((v for v in vertices if multigraph.imbalance(v) < 0), None)
+
+    counts = {pair: len(ids) for pair, ids in multigraph.edges.items()}
+    cuts = multigraph.edge_count
+    if end is not None:
+        # Close the trail into a circuit; only cuts at the extra edge count
+        counts[(end, start)] = counts.get((end, start), 0) + 1
+        cuts = 1
+
+    index = {v: i for i, v in enumerate(vertices)}
+    laplacian = [[0] * len(vertices) for _ in vertices]
+    for (takes, gives), count in counts.items():
+        laplacian[index[takes]][index[takes]] += count
+        laplacian[index[takes]][index[gives]] -= count
+    parallel = [[] for _ in vertices]
+    for (takes, _), ids in multigraph.edges.items():
+        parallel[index[takes]].append(len(ids))
+
+    terms = [(sum(parallel[i]) + (v == end), v == end, parallel[i]) for i, v in enumerate(vertices)]
+    return [row[1:] for row in laplacian[1:]], cuts, terms
+
+
+def count_eulerian_trails(multigraph):
+    """Distinct Eulerian trails of a weakly connected multigraph, or None if it has none
+
+    By the BEST theorem a connected balanced multigraph has
+    t_w * prod((deg(v) - 1)!) Eulerian circuits over distinguishable edges,
+    where t_w counts the spanning arborescences towards any value w, the
+    determinant of its reduced Laplacian. Cutting each circuit at each of its
+    m edges gives the trails, and dividing by m_e! for every set of m_e
+    parallel pieces counts each takes/gives sequence once. A trail from s to
+    t is a circuit of the multigraph with one extra edge t -> s, cut there.
+    """
+    eulerian = _eulerian_terms(multigraph)
+    if eulerian is None:
+        return None
+    minor, cuts, terms = eulerian
+    total = determinant(minor) * cuts
+    # (deg - 1)! / prod(m_e!) is deg! / prod(m_e!) / deg, with exact multinomials
+    divisor = 1
+    for degree, closing, parallel in terms:
+        multinomial = math.factorial(degree - closing)
+        for count in parallel:
+            multinomial //= math.factorial(count)
+        total *= multinomial * (degree if closing else 1)
+        divisor *= degree
+    return total // divisor
+
+
+def log10_eulerian_trails(multigraph):
+    """log10 of count_eulerian_trails() in floating point, which stays fast at any size"""
+    eulerian = _eulerian_terms(multigraph)
+    if eulerian is None:
+        return None
+    minor, cuts, terms = eulerian
+    total = log10_determinant(minor) + math.log10(cuts)
+    for degree, _, parallel in terms:
+        total += _log10_factorial(degree - 1) - sum(_log10_factorial(count) for count in parallel)
+    return total
+
+
+def log10_trail_count_bound(multigraph):
+    """log10 of an upper bound on the number of distinct trails of any length
+
+    A trail is fixed by its start value and, for every value, the order in
+    which it leaves it. A value with d outgoing pieces, m_e of them on each
+    takes/gives pair, has at most (d + 1) * d! / prod(m_e!) exit orders,
+    since every partial order extends to a full one.
+    """
+    per_value = {}
+    for (takes, _), ids in multigraph.edges.items():
+        per_value.setdefault(takes, []).append(len(ids))
+    if not per_value:
+        return 0.0
+    total = math.log10(len(per_value))
+    for parallel in per_value.values():
+        degree = sum(parallel)
+        total += math.log10(degree + 1) + _log10_factorial(degree) - sum(_log10_factorial(m) for m in parallel)
+    return total
+
+
+def format_count(count=None, log10=None):
+    """A count as a decimal string, in scientific notation when it is huge or only its log10 is known"""
+    if count is not None:
+        if count < 10 ** MAX_SHOWN_DIGITS:
+            return str(count)
+        log10 = log10_of(count)
+    if log10 is None:
+        return None
+    if log10 < 15:
+        return str(round(10 ** log10))
+    return f"{10 ** (log10 % 1):.6f}e+{int(log10)}"
+
+
+def count_longest_chains(multigraph, timeout_seconds=0.5):
+    """Number of distinct longest chains, exact where possible and bounded otherwise
+
+    Chains count once per takes/gives sequence. A weak component with an
+    Eulerian trail has that trail's length as its longest, counted by the
+    BEST theorem. Other components that could still reach the longest
+    length share the timeout: each is solved, and its longest chains are
+    enumerated when that finishes in time. Failing that their number is
+    only bounded.
+
+    Returns a dict with the longest length, whether it is proven, whether
+    the count is exact and log10 bounds on it. count holds the exact integer
+    when it is exact and has at most MAX_EXACT_DIGITS digits.
+    """
+    start_time = time.time()
+    deadline = start_time + timeout_seconds
+    components = multigraph.weak_components()
+
+    results = []
+    pending = []
+    for vertices, edge_count in components:
+        sub = multigraph.subgraph(vertices) if len(components) > 1 else multigraph
+        log10 = log10_eulerian_trails(sub)
+        if log10 is not None:
+            count = count_eulerian_trails(sub) if log10 < MAX_EXACT_DIGITS else None
+            results.append({"length": edge_count, "exact": True, "count": count, "lower": log10, "upper": log10})
+        else:
+            pending.append((vertices, sub))
+    longest = max((r["length"] for r in results), default=0)
+
+    if pending:
+        bounds = TrailSearch(multigraph).component_bounds()
+        pending = sorted(((bounds[min(vertices)], sub) for vertices, sub in pending), key=lambda item: -item[0])
+    for position, (bound, sub) in enumerate(pending):
+        if bound < longest:
+            break
+        share = max(deadline - time.time(), 0) / (len(pending) - position)
+        # A quick anytime search finds a long chain, the exact one may prove it
+        solved = solve_anytime(sub, share / 4)
+        if not solved["optimal"]:
+            exact_solved = solve_reduced(sub, share / 4)
+            if exact_solved["optimal"] or len(exact_solved["chain"]) > len(solved["chain"]):
+                solved = exact_solved
+        length = len(solved["chain"])
+        result = {"length": length, "exact": False, "count": None,
+                  "lower": 0.0, "upper": log10_trail_count_bound(sub)}
+        if solved["optimal"]:
+            remaining = max(deadline - time.time(), 0) / (len(pending) - position)
+            enumeration_deadline = time.time() + remaining
+            found = sum(1 for _ in enumerate_trails(sub, length, timeout_seconds=remaining))
+            result["lower"] = math.log10(max(found, 1))
+            # Enumeration only stops early at its deadline
+            if time.time() < enumeration_deadline:
+                result.update(exact=True, count=found, upper=result["lower"])
+        else:
+            # The component might still hold chains up to its bound
+            result["length_bound"] = solved["upper_bound"]
+        results.append(result)
+        longest = max(longest, length)
+
+    # Chains of the longest length, and components whose unproven length could reach it
+    contributing = [r for r in results if r["length"] == longest]
+    unresolved = [r for r in results if r["length"] < longest <= r.get("length_bound", 0)]
+    exact = all(r["exact"] for r in contributing) and not unresolved
+    count = None
+    if exact and all(r["count"] is not None for r in contributing):
+        count = sum(r["count"] for r in contributing)
+    elapsed = time.time() - start_time
+    logger.info(f"Counted longest chains of length {longest} in {elapsed:.3f} seconds (exact: {exact})")
+    return {
+        "longest_length": longest,
+        "optimal": all(r.get("length_bound", 0) <= longest for r in results),
+        "exact": exact,
+        "count": count,
+        "count_log10_lower": _log10_sum(r["lower"] for r in contributing),
+        "count_log10_upper": _log10_sum(r["upper"] for r in contributing + unresolved),
+        "components": len(results),
+        "search_time_seconds": elapsed
+    }
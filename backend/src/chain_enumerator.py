@@ -0,0 +1,101 @@
+# backend/src/chain_enumerator.py
+import time
+import logging
+
+from puzzle_graph import VALUE_COUNT
+from trail_solver import TrailSearch
+from graph_reduction import solve_reduced
+
+logger = logging.getLogger(__name__)
+
+
+def enumerate_trails(multigraph, min_length, limit=None, timeout_seconds=None):
+    """Lazily yield every maximal trail of at least min_length, as puzzle IDs
+
+    A trail is maximal when it cannot be extended at either end, so with
+    min_length set to the longest trail length this yields exactly the
+    longest chains. Pieces with identical takes/gives values are
+    interchangeable, so trails are enumerated as sequences of (takes, gives)
+    pairs and each sequence is yielded once, with the lowest free IDs of
+    every pair. Branches whose reachability bound cannot reach min_length
+    are cut. Stops after limit trails or once timeout_seconds have passed.
+    """
+    if limit is not None and limit <= 0:
+        return
+    deadline = time.time() + timeout_seconds if timeout_seconds is not None else None
+    search = TrailSearch(multigraph)
+    out_counts = search.out_counts
+    vertex_of = search.vertex_of
+    weight_of = search.weight_of
+    # Unused edges entering each value, to tell whether a trail's start is maximal
+    in_left = list(multigraph.in_degree)
+    yielded = 0
+
+    for start in range(VALUE_COUNT):
+        if not multigraph.out_degree[start] or search.upper_bound(start) < min_length:
+            continue
+        path = []
+        length = 0
+        vertices = [start]
+        stack = [search._successors(start)]
+        while stack:
+            search.operations += 1
+            if deadline is not None and search.operations % TrailSearch.CHECK_INTERVAL == 0 \
+                    and time.time() >= deadline:
+                logger.warning(f"Trail enumeration timed out after {yielded} trails")
+                return
+
+            candidates = stack[-1]
+            if not candidates:
+                stack.pop()
+                vertices.pop()
+                if path:
+                    u, key = path.pop()
+                    out_counts[u][key] += 1
+                    in_left[vertex_of[key]] += 1
+                    length -= weight_of[key]
+                continue
+
+            u = vertices[-1]
+            key = candidates.pop()
+            if not out_counts[u][key]:
+                continue
+            w = vertex_of[key]
+            out_counts[u][key] -= 1
+            in_left[w] -= 1
+            path.append((u, key))
+            length += weight_of[key]
+
+            successors = search._successors(w)
+            if successors and length + search.upper_bound(w) >= min_length:
+                vertices.append(w)
+                stack.append(successors)
+                continue
+
+            if not successors and length >= min_length and not in_left[start]:
+                yield search.expand(path)
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+            path.pop()
+            out_counts[u][key] += 1
+            in_left[w] += 1
+            length -= weight_of[key]
+
+
+def longest_chains(multigraph, limit=None, slack=0, timeout_seconds=60):
+    """Lazily yield the longest chains of a multigraph, or those within slack of it
+
+    The longest length is found first with an exact solve; if that times
+    out, its best chain's length is used instead. Both steps share the
+    timeout.
+    """
+    start_time = time.time()
+    result = solve_reduced(multigraph, timeout_seconds)
+    longest = len(result["chain"])
+    if not result["optimal"]:
+        logger.warning(f"Longest length {longest} is not proven optimal, enumerating chains of that length")
+    if not longest:
+        return
+    remaining = max(timeout_seconds - (time.time() - start_time), 0)
+    yield from enumerate_trails(multigraph, max(longest - slack, 1), limit, remaining)
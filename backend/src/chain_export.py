@@ -0,0 +1,188 @@
+# backend/src/chain_export.py
+import sys
+import json
+import zlib
+from array import array
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # zstd downloads are optional
+    zstandard = None
+
+# Rendered exports are sent and written in pieces of about this many characters
+CHUNK_SIZE = 64 * 1024
+# Compressions offered for the compact downloads, with their file suffixes
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def chunked(pieces, size=CHUNK_SIZE):
+    """Join a stream of small strings into chunks of about size characters"""
+    buffer = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _nested_json(value, depth):
+    """value as json.dumps(indent=2) renders it depth levels deep, without the first indent"""
+    return json.dumps(value, indent=2).replace("\n", "\n" + "  " * depth)
+
+
+def iter_json_document(fields, list_key, items):
+    """Render an object whose last field is a long list, one list item at a time
+
+    The output is the same as json.dumps(dict(fields, list_key=list(items)),
+    indent=2), but items may be any iterable and is never held in full.
+    """
+    yield "{"
+    for key, value in fields.items():
+        yield f"\n  {json.dumps(key)}: {_nested_json(value, 1)},"
+    yield f"\n  {json.dumps(list_key)}: ["
+    empty = True
+    for item in items:
+        yield ("\n    " if empty else ",\n    ") + _nested_json(item, 2)
+        empty = False
+    yield "]" if empty else "\n  ]"
+    yield "\n}"
+
+
+def path_entries(path, lookup):
+    """Per-piece dicts of a path as the export files list them, skipping unknown IDs"""
+    for i, node_id in enumerate(path):
+        p = lookup(node_id)
+        if p:
+            yield {
+                "position": i,
+                "id": p.id,
+                "number": p.puzzle_number,
+                "takes": p.puzzle_sides['takes'],
+                "gives": p.puzzle_sides['gives']
+            }
+
+
+def iter_path_text(path, lookup):
+    """Lines of a single path text export"""
+    yield f"Path length: {len(path)} puzzles\n"
+    yield "----------------------------\n"
+    for i, node_id in enumerate(path):
+        p = lookup(node_id)
+        if not p:
+            yield f"{i+1}. ERROR: Puzzle with ID {node_id} not found\n"
+            continue
+        yield f"{i+1}. Puzzle #{p.puzzle_number} - Takes: {p.puzzle_sides['takes']}, Gives: {p.puzzle_sides['gives']}\n"
+
+
+def iter_chain_text(chain_ids, lookup):
+    """Lines of the chain.txt download"""
+    yield "Puzzle Chain Export\n"
+    yield "=================\n"
+    yield "\n"
+    yield f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    yield f"Chain Length: {len(chain_ids)} puzzles\n"
+    yield "\n"
+    yield "Chain:\n"
+
+    previous = None
+    for i, puzzle_id in enumerate(chain_ids):
+        puzzle = lookup(puzzle_id)
+        if puzzle:
+            yield f"\n{i+1}. Puzzle #{puzzle.puzzle_number} - Takes: {puzzle.puzzle_sides['takes']}, Gives: {puzzle.puzzle_sides['gives']}"
+            # Add connection for all but first
+            if i > 0 and previous:
+                yield f"\n   Connection: {previous.puzzle_sides['gives']} → {puzzle.puzzle_sides['takes']}"
+        previous = puzzle
+
+
+def chain_json_entries(chain_ids, lookup):
+    """Per-piece dicts of the chain.json download, with the connection to the previous piece"""
+    previous = None
+    for i, puzzle_id in enumerate(chain_ids):
+        puzzle = lookup(puzzle_id)
+        if puzzle:
+            puzzle_data = {
+                "position": i + 1,
+                "id": puzzle.id,
+                "puzzle_number": puzzle.puzzle_number,
+                "takes": puzzle.puzzle_sides["takes"],
+                "gives": puzzle.puzzle_sides["gives"]
+            }
+            if i > 0 and previous:
+                puzzle_data["connection"] = {
+                    "from_puzzle": previous.puzzle_number,
+                    "gives": previous.puzzle_sides["gives"],
+                    "takes": puzzle.puzzle_sides["takes"],
+                    "is_valid": previous.puzzle_sides["gives"] == puzzle.puzzle_sides["takes"]
+                }
+            yield puzzle_data
+        previous = puzzle
+
+
+def iter_merged_digits(chain_ids, store):
+    """The chain as one digit string, each piece overlapping the previous one's gives value
+
+    The first piece is written in full and every following piece only adds
+    its middle and gives digits, since its takes value repeats the previous
+    piece's gives. Raises ValueError at a break in the chain.
+    """
+    takes, gives = store.takes, store.gives
+    previous = None
+    batch = []
+    for puzzle_id in chain_ids:
+        number = store.number(puzzle_id)
+        if previous is None:
+            batch.append(number)
+        elif gives[previous] != takes[puzzle_id]:
+            raise ValueError(f"Chain breaks between puzzles {store.number(previous)} and {number}")
+        else:
+            batch.append(number[2:])
+        previous = puzzle_id
+        if len(batch) >= CHUNK_SIZE // 4:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def iter_id_bytes(chain_ids):
+    """The chain's puzzle IDs as little-endian uint32 values"""
+    step = CHUNK_SIZE // 4
+    for start in range(0, len(chain_ids), step):
+        ids = array('I', chain_ids[start:start + step])
+        if sys.byteorder != 'little':
+            ids.byteswap()
+        yield ids.tobytes()
+
+
+def compressed(chunks, method):
+    """Compress a stream of str or bytes chunks with "gzip" or "zstd" as they arrive
+
+    Raises ValueError for an unknown method, or for zstd when the zstandard
+    package is not installed.
+    """
+    if method == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    elif method == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        raise ValueError(f"Unknown compression: '{method}', expected one of {', '.join(COMPRESSIONS)}")
+    return _compress(chunks, compressor)
+
+
+def _compress(chunks, compressor):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
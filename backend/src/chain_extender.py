@@ -0,0 +1,144 @@
+# backend/src/chain_extender.py
+import re
+import sys
+import json
+import time
+import logging
+from collections import deque
+
+from anytime_solver import AnytimeSearch
+from chain_cache import chain_from_numbers
+from chain_validator import validate_chain, validation_errors
+from trail_solver import ValueMultigraph
+
+logger = logging.getLogger(__name__)
+
+# A puzzle number anywhere in a text export, e.g. "1. Puzzle #104211 - Takes: 10, ..."
+PUZZLE_NUMBER = re.compile(r'\b\d{6}\b')
+
+
+def chain_numbers(data):
+    """Puzzle numbers of a chain in any of the shapes the app produces
+
+    Accepts a chain.json export ({"chain": [{"puzzle_number": ...}, ...]}),
+    a longest_chain_*.json file ({"path": [{"number": ...}, ...]}), an API
+    solve result, a chain cache entry ({"numbers": [...]}) or a plain list
+    of puzzle numbers. Raises ValueError for anything else.
+    """
+    if isinstance(data, dict):
+        for key in ("chain", "path", "numbers"):
+            if key in data:
+                return chain_numbers(data[key])
+        raise ValueError("Expected a 'chain', 'path' or 'numbers' list")
+    if not isinstance(data, list):
+        raise ValueError("Expected a list of puzzles")
+
+    numbers = []
+    for entry in data:
+        if isinstance(entry, dict):
+            entry = entry.get("puzzle_number", entry.get("number"))
+        if isinstance(entry, int) and not isinstance(entry, bool):
+            entry = f"{entry:06d}"
+        if not isinstance(entry, str) or not PUZZLE_NUMBER.fullmatch(entry):
+            raise ValueError(f"Not a puzzle number: {entry!r}")
+        numbers.append(entry)
+    return numbers
+
+
+def parse_chain_text(text):
+    """Puzzle numbers of a chain given as JSON text or as a chain.txt export"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return PUZZLE_NUMBER.findall(text)
+    return chain_numbers(data)
+
+
+def read_chain_file(file_path):
+    """Puzzle numbers of a chain stored as JSON or as a chain.txt export"""
+    with open(file_path, 'r') as f:
+        return parse_chain_text(f.read())
+
+
+def check_chain(graph, chain):
+    """Raise ValueError unless chain is a valid chain of distinct pieces in graph"""
+    result = validate_chain(graph, chain, max_errors=1)
+    if not result["valid"]:
+        raise ValueError(validation_errors(result)[0])
+
+
+def extend_chain(graph, chain, seed=0):
+    """Grow a chain of puzzle IDs with the graph's unused pieces
+
+    Unused pieces are walked onto both ends of the chain, and closed walks
+    over them are spliced in wherever the chain passes a value they start
+    and end at, until none are left to add. This is a single local search
+    pass, much cheaper than a new solve, and keeps every piece of the input
+    chain in its original order. The result is not necessarily optimal.
+    """
+    start_time = time.time()
+    check_chain(graph, chain)
+    takes, gives = graph.takes, graph.gives
+    multigraph = ValueMultigraph.from_puzzle_graph(graph)
+    search = AnytimeSearch(multigraph, seed)
+    pairs = search.extend([(takes[puzzle_id], gives[puzzle_id]) for puzzle_id in chain])
+
+    # Pieces of the input chain keep their place, new pairs draw from the unused ones
+    queues = {}
+    for puzzle_id in chain:
+        queues.setdefault((takes[puzzle_id], gives[puzzle_id]), deque()).append(puzzle_id)
+    used = set(chain)
+    for pair, ids in multigraph.edges.items():
+        queues.setdefault(pair, deque()).extend(puzzle_id for puzzle_id in ids if puzzle_id not in used)
+    extended = [queues[pair].popleft() for pair in pairs]
+
+    elapsed = time.time() - start_time
+    logger.info(f"Extended chain from {len(chain)} to {len(extended)} puzzles in {elapsed:.4f} seconds")
+    return {
+        "chain": extended,
+        "original_length": len(chain),
+        "chain_length": len(extended),
+        "added": len(extended) - len(chain),
+        "search_time_seconds": elapsed
+    }
+
+
+def extend_numbers(graph, numbers, seed=0):
+    """extend_chain for a chain given as puzzle numbers; raises ValueError if they are not loaded"""
+    chain = chain_from_numbers(graph, numbers)
+    if chain is None:
+        raise ValueError("Chain contains puzzles that are not loaded")
+    return extend_chain(graph, chain, seed)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python chain_extender.py <puzzle file> <chain file> [output file]")
+        sys.exit(1)
+
+    from puzzle import PuzzleSession
+    from puzzle_loader import read_puzzle_file, read_binary_dataset
+
+    puzzle_file, chain_file = sys.argv[1], sys.argv[2]
+    session = PuzzleSession()
+    if puzzle_file.endswith(".pzb"):
+        session.add_columns(*read_binary_dataset(puzzle_file))
+    else:
+        session.add_columns(*read_puzzle_file(puzzle_file)[:3])
+
+    result = extend_numbers(session.graph, read_chain_file(chain_file))
+    store = session.store
+    numbers = [store.number(puzzle_id) for puzzle_id in result["chain"]]
+    print(f"Extended chain from {result['original_length']} to {result['chain_length']} puzzles "
+          f"in {result['search_time_seconds']:.3f} seconds")
+
+    if len(sys.argv) > 3:
+        with open(sys.argv[3], 'w') as f:
+            json.dump({"chain_length": len(numbers), "numbers": numbers}, f, indent=2)
+        print(f"Saved to {sys.argv[3]}")
+    else:
+        print("\n".join(numbers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# backend/src/chain_validator.py
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Each kind of problem is listed at most this many times; error_count has the full total
+MAX_REPORTED_ERRORS = 100
+
+# Loaded piece counts per puzzle number, kept for the latest collection validated against
+_counts_lock = threading.Lock()
+_counts_key = None
+_counts = None
+
+
+def _result(length, unknown, duplicates, breaks, max_errors, started):
+    """The structured result shared by both validators"""
+    return {
+        "valid": not (unknown or duplicates or breaks),
+        "chain_length": length,
+        "all_loaded": not unknown,
+        "unique": not duplicates,
+        "connected": not breaks,
+        "error_count": len(unknown) + len(duplicates) + len(breaks),
+        "unknown": unknown[:max_errors],
+        "duplicates": duplicates[:max_errors],
+        "breaks": breaks[:max_errors],
+        "validation_time_seconds": time.time() - started
+    }
+
+
+def validate_chain(graph, chain, max_errors=MAX_REPORTED_ERRORS):
+    """Check a chain of puzzle IDs against a PuzzleGraph in O(L)
+
+    Every ID must be loaded in graph and used once, and every piece must
+    take the value the previous one gives. The takes/gives values of the
+    whole chain are gathered into byte strings and compared in one go, so
+    the per-position work only happens for chains that have errors.
+
+    Returns a dict with valid, the per-check flags all_loaded, unique and
+    connected, error_count, and up to max_errors entries of each error kind:
+    unknown ({"position", "id"}), duplicates ({"id", "count"}) and breaks
+    ({"position", "gives", "takes"}), or all of them for max_errors=None.
+    Positions count from 1; a break is reported at the piece that does not
+    take the previous piece's value.
+    """
+    started = time.time()
+    length = len(chain)
+
+    unknown = []
+    flags = graph.membership(chain)
+    if flags.find(0) >= 0:
+        unknown = [{"position": i + 1, "id": chain[i]} for i, flag in enumerate(flags) if not flag]
+
+    duplicates = []
+    if len(set(chain)) != length:
+        duplicates = [{"id": puzzle_id, "count": count} for puzzle_id, count in Counter(chain).items() if count > 1]
+
+    takes, gives = graph.takes, graph.gives
+    breaks = []
+    if not unknown:
+        chain_takes = bytes(map(takes.__getitem__, chain))
+        chain_gives = bytes(map(gives.__getitem__, chain))
+        if chain_gives[:-1] != chain_takes[1:]:
+            breaks = [{"position": i + 2, "gives": g, "takes": t}
+                      for i, (g, t) in enumerate(zip(chain_gives, chain_takes[1:])) if g != t]
+    else:
+        # Only pieces that exist have sides to compare
+        for i in range(1, length):
+            previous, puzzle_id = chain[i - 1], chain[i]
+            if flags[i - 1] and flags[i] and gives[previous] != takes[puzzle_id]:
+                breaks.append({"position": i + 1, "gives": gives[previous], "takes": takes[puzzle_id]})
+
+    return _result(length, unknown, duplicates, breaks, max_errors, started)
+
+
+def loaded_counts(graph):
+    """How many pieces of each puzzle number graph holds, cached until its content changes"""
+    global _counts_key, _counts
+    key = graph.content_hash()
+    with _counts_lock:
+        if key == _counts_key:
+            return _counts
+    counts = Counter(map(graph.store.number, graph.nodes()))
+    with _counts_lock:
+        _counts_key, _counts = key, counts
+    return counts
+
+
+def validate_numbers(graph, numbers, max_errors=MAX_REPORTED_ERRORS):
+    """Check a chain given as 6-digit puzzle numbers against a PuzzleGraph in O(L)
+
+    This is how submitted chains are checked: a number may appear as often
+    as the collection holds pieces with that number. The sides are compared
+    as strided slices of the joined digits, and the collection's piece
+    counts are built once per collection and reused. Returns the same dict
+    as validate_chain, with "number" in place of "id" and duplicates also
+    giving how many pieces with that number are "loaded".
+    """
+    started = time.time()
+    length = len(numbers)
+    counts = loaded_counts(graph)
+
+    unknown = []
+    duplicates = []
+    for number, count in Counter(numbers).items():
+        loaded = counts.get(number, 0)
+        if not loaded:
+            unknown.append(number)
+        elif count > loaded:
+            duplicates.append({"number": number, "count": count, "loaded": loaded})
+    if unknown:
+        missing = set(unknown)
+        unknown = [{"position": i + 1, "number": number} for i, number in enumerate(numbers) if number in missing]
+
+    # Digits 4-5 of each number (gives) against digits 0-1 of the next (takes)
+    digits = "".join(numbers)
+    breaks = []
+    if digits[4::6][:-1] != digits[6::6] or digits[5::6][:-1] != digits[7::6]:
+        breaks = [{"position": i + 2, "gives": int(a[4:]), "takes": int(b[:2])}
+                  for i, (a, b) in enumerate(zip(numbers, numbers[1:])) if a[4:] != b[:2]]
+
+    return _result(length, unknown, duplicates, breaks, max_errors, started)
+
+
+def validation_errors(result):
+    """Readable messages for the errors listed in a validation result"""
+    messages = []
+    for entry in result["unknown"]:
+        piece = f"Puzzle {entry['number']}" if "number" in entry else f"Puzzle ID {entry['id']}"
+        messages.append(f"{piece} at position {entry['position']} is not loaded")
+    for entry in result["duplicates"]:
+        if "number" in entry:
+            messages.append(f"Puzzle {entry['number']} is used {entry['count']} times "
+                            f"but only {entry['loaded']} loaded")
+        else:
+            messages.append(f"Puzzle ID {entry['id']} is used {entry['count']} times")
+    for entry in result["breaks"]:
+        messages.append(f"Chain breaks at position {entry['position']}: {entry['gives']:02d} given "
+                        f"but {entry['takes']:02d} taken")
+    return messages
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python chain_validator.py <puzzle file> <chain file> [chain file ...]")
+        sys.exit(1)
+
+    from puzzle import PuzzleSession
+    from puzzle_loader import read_puzzle_file, read_binary_dataset
+    from chain_extender import read_chain_file
+
+    puzzle_file = sys.argv[1]
+    session = PuzzleSession()
+    if puzzle_file.endswith(".pzb"):
+        session.add_columns(*read_binary_dataset(puzzle_file))
+    else:
+        session.add_columns(*read_puzzle_file(puzzle_file)[:3])
+
+    all_valid = True
+    for chain_file in sys.argv[2:]:
+        result = validate_numbers(session.graph, read_chain_file(chain_file))
+        all_valid = all_valid and result["valid"]
+        status = "VALID" if result["valid"] else f"INVALID ({result['error_count']} errors)"
+        print(f"{chain_file}: {result['chain_length']} puzzles, {status}")
+        for message in validation_errors(result):
+            print(f"  {message}")
+    sys.exit(0 if all_valid else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,18 +9,9 @@ def build_graph_from_puzzles():
     puzzles = Puzzle.get_all_puzzles()
     print(f"Building graph from {len(puzzles)} puzzles...")
     
-    # Create graph structure
-    graph = {}
-    for p in puzzles:
-        graph[p.id] = []
-    
-    # Add connections
-    connection_count = 0
-    for p1 in puzzles:
-        for p2 in puzzles:
-            if p1.id != p2.id and p1.puzzle_sides['gives'] == p2.puzzle_sides['takes']:
-                graph[p1.id].append(p2.id)
-                connection_count += 1
+    # Create graph structure from the shared value-bucket index
+    graph = Puzzle.get_graph().to_adjacency()
+    connection_count = sum(len(neighbors) for neighbors in graph.values())
     
     print(f"Built graph with {len(puzzles)} nodes and {connection_count} connections")
     return graph, puzzles
@@ -36,12 +36,36 @@ DATASET_PATHS = {
     "cyclic": DATA_DIR / "cyclic.txt"
 }
 
+# Binary datasets (see create_datasets.py --binary) are picked up by name
+for binary_path in sorted(DATA_DIR.glob('*.pzb')):
+    name = binary_path.stem if binary_path.stem not in DATASET_PATHS else f"{binary_path.stem}_binary"
+    DATASET_PATHS.setdefault(name, binary_path)
+
 # Application settings
 TIMEOUT = int(os.environ.get('TIMEOUT', 3600))
 PORT = int(os.environ.get('PORT', 5000))
 DEBUG = os.environ.get('FLASK_DEBUG', '').lower() == 'true'
 STATIC_FOLDER = os.environ.get('STATIC_FOLDER', 'static')
 
+# Longest-chain result cache
+CHAIN_CACHE_SIZE = int(os.environ.get('CHAIN_CACHE_SIZE', 32))
+CHAIN_CACHE_DIR = EXPORT_DIR / 'chain_cache' if os.environ.get('CHAIN_CACHE_DISK', 'true').lower() == 'true' else None
+
+# Parse every dataset at startup instead of on first use
+PRELOAD_DATASETS = os.environ.get('PRELOAD_DATASETS', '').lower() == 'true'
+
+# Background solve jobs
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+JOB_HISTORY = int(os.environ.get('JOB_HISTORY', 100))
+
+# Search budget for re-solving a component after a piece is added or removed
+INCREMENTAL_TIMEOUT = int(os.environ.get('INCREMENTAL_TIMEOUT', 10))
+
+# Uploaded puzzle files
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 200 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = int(os.environ.get('UPLOAD_CHUNK_BYTES', 1024 * 1024))
+UPLOAD_LIMIT = int(os.environ.get('UPLOAD_LIMIT', 8))  # Uploaded datasets kept in memory
+
 # Print configuration when module is imported
 print(f"Loading config - Environment: {'Docker' if IN_DOCKER else 'Local'}")
 print(f"Base directory: {BASE_DIR}")
@@ -1,10 +1,14 @@
 # backend/create_datasets.py
 import os
+import sys
 import random
 import logging
 import time
 from pathlib import Path
 
+from puzzle import PuzzleSession
+from puzzle_loader import read_puzzle_file, write_binary_dataset
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -313,6 +317,65 @@ def create_cyclic_dataset(size, filename, cycle_length=3):
         logger.error(f"Error creating cyclic dataset {filename}: {e}")
         return False
 
+def convert_to_binary(filename):
+    """
+    Write a text dataset as a memory-mappable .pzb binary dataset next to it
+    
+    Args:
+        filename (str): Text dataset filename
+    
+    Returns:
+        bool: Success status
+    """
+    try:
+        start_time = time.time()
+        takes, middle, gives, skipped = read_puzzle_file(data_dir / filename)
+        session = PuzzleSession()
+        session.add_columns(takes, middle, gives)
+        
+        file_path = (data_dir / filename).with_suffix(".pzb")
+        write_binary_dataset(file_path, takes, middle, gives, session.graph.content_hash())
+        
+        elapsed = time.time() - start_time
+        logger.info(f"Wrote binary dataset with {len(takes)} puzzles ({skipped} lines skipped) at {file_path} in {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        logger.error(f"Error converting {filename} to binary: {e}")
+        return False
+
+def create_binary_random_dataset(size, filename):
+    """
+    Create a large random dataset directly in the .pzb binary format
+    
+    Unlike the text datasets this is not capped, so it can hold millions of
+    puzzles.
+    
+    Args:
+        size (int): Number of puzzles to create
+        filename (str): Output filename
+    
+    Returns:
+        bool: Success status
+    """
+    try:
+        start_time = time.time()
+        rng = random.Random()
+        takes = bytes(rng.choices(range(1, 100), k=size))
+        middle = bytes(rng.choices(range(1, 100), k=size))
+        gives = bytes(rng.choices(range(1, 100), k=size))
+        session = PuzzleSession()
+        session.add_columns(takes, middle, gives)
+        
+        file_path = data_dir / filename
+        write_binary_dataset(file_path, takes, middle, gives, session.graph.content_hash())
+        
+        elapsed = time.time() - start_time
+        logger.info(f"Created binary random dataset with {size} puzzles at {file_path} in {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        logger.error(f"Error creating binary dataset {filename}: {e}")
+        return False
+
 def verify_datasets():
     """Verify that all created datasets exist and have content"""
     try:
@@ -373,6 +436,15 @@ try:
         logger.info("All datasets created and verified successfully!")
     else:
         logger.warning("Some datasets may not have been created correctly.")
+    
+    # --binary [size]: also write .pzb copies, plus a random binary dataset of the given size
+    if "--binary" in sys.argv:
+        for filename in ["small_random.txt", "medium_random.txt", "small_connected.txt",
+                         "medium_connected.txt", "large_connected.txt", "complex.txt", "cyclic.txt"]:
+            convert_to_binary(filename)
+        args = sys.argv[sys.argv.index("--binary") + 1:]
+        if args and args[0].isdigit():
+            create_binary_random_dataset(int(args[0]), f"random_{args[0]}.pzb")
         
 except Exception as e:
     logger.error(f"Error creating datasets: {e}")
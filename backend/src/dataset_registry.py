@@ -0,0 +1,166 @@
+# backend/src/dataset_registry.py
+import os
+import time
+import logging
+import threading
+
+from puzzle import PuzzleSession
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetRegistry:
+    """Parsed datasets kept resident by dataset ID, with file metadata
+
+    Each dataset file is parsed into its own PuzzleSession on first use.
+    Later lookups only stat the file and reuse the session until its size or
+    mtime changes. A file that fails to load is remembered by the same stamp
+    and not parsed again until it changes. Loading a dataset holds only that
+    dataset's lock, so requests for other datasets are not blocked.
+    """
+
+    def __init__(self, paths, loader):
+        """paths maps dataset IDs to files; loader(path, session) parses a file into a session"""
+        self.paths = paths
+        self.loader = loader
+        self._entries = {}
+        # File stamps of datasets whose last load failed
+        self._failures = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_stamp(path):
+        """(size, mtime_ns) of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _current_entry(self, dataset_id):
+        """Loaded entry for dataset_id if it is still up to date with its file"""
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+        if entry is None:
+            return None
+        if entry["path"] is not None and self._file_stamp(entry["path"]) != entry["stamp"]:
+            return None
+        return entry
+
+    def _load(self, dataset_id):
+        """Entry for dataset_id, parsing its file if it is not loaded or has changed"""
+        entry = self._current_entry(dataset_id)
+        if entry is not None:
+            return entry
+        if dataset_id not in self.paths:
+            return None
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(dataset_id, threading.Lock())
+        with load_lock:
+            # Another request may have finished loading while we waited
+            entry = self._current_entry(dataset_id)
+            if entry is not None:
+                return entry
+
+            path = self.paths[dataset_id]
+            stamp = self._file_stamp(path)
+            if stamp is None:
+                logger.error(f"Dataset file not found: {path}")
+                return None
+            with self._lock:
+                if self._failures.get(dataset_id) == stamp:
+                    return None
+
+            start_time = time.time()
+            session = PuzzleSession(dataset_id)
+            try:
+                self.loader(path, session)
+            except Exception as e:
+                logger.error(f"Failed to load dataset {dataset_id}: {e}")
+            if not len(session):
+                logger.error(f"Dataset {dataset_id} loaded no puzzles")
+                with self._lock:
+                    self._failures[dataset_id] = stamp
+                return None
+            entry = self._make_entry(session, path, stamp)
+            with self._lock:
+                self._entries[dataset_id] = entry
+                self._failures.pop(dataset_id, None)
+            logger.info(f"Parsed dataset {dataset_id}: {entry['puzzle_count']} puzzles "
+                        f"in {time.time() - start_time:.3f} seconds")
+            return entry
+
+    @staticmethod
+    def _make_entry(session, path, stamp):
+        return {
+            "session": session,
+            "path": path,
+            "stamp": stamp,
+            "size_bytes": stamp[0] if stamp else 0,
+            "mtime": stamp[1] / 1e9 if stamp else None,
+            "puzzle_count": len(session),
+            "loaded_at": time.time()
+        }
+
+    def get(self, dataset_id):
+        """Session holding the dataset, loading it on first use or after a file change
+
+        Returns None if the dataset is unknown, missing or holds no puzzles.
+        """
+        entry = self._load(dataset_id)
+        return entry["session"] if entry is not None else None
+
+    def put(self, dataset_id, session):
+        """Register an in-memory session that is not backed by a dataset file"""
+        with self._lock:
+            self._entries[dataset_id] = self._make_entry(session, None, None)
+        logger.info(f"Registered dataset {dataset_id} with {len(session)} puzzles")
+
+    def drop(self, dataset_id):
+        """Unload a dataset; returns True if it was loaded"""
+        with self._lock:
+            return self._entries.pop(dataset_id, None) is not None
+
+    def info(self, dataset_id):
+        """Metadata of a dataset without parsing it
+
+        Datasets that are not loaded only report their file's size and
+        mtime. The piece count and content hash are only given once the
+        dataset has been selected and loaded.
+        """
+        entry = self._current_entry(dataset_id)
+        if entry is None:
+            path = self.paths.get(dataset_id)
+            stamp = self._file_stamp(path) if path is not None else None
+            return {
+                "path": str(path) if path is not None else None,
+                "exists": stamp is not None,
+                "loaded": False,
+                "size_bytes": stamp[0] if stamp else 0,
+                "mtime": stamp[1] / 1e9 if stamp else None,
+                "puzzle_count": None
+            }
+        return {
+            "path": str(entry["path"]) if entry["path"] is not None else None,
+            "exists": True,
+            "loaded": True,
+            "size_bytes": entry["size_bytes"],
+            "mtime": entry["mtime"],
+            # Pieces can be added and removed after loading
+            "puzzle_count": len(entry["session"]),
+            # Computed on first request and then cached by the graph
+            "content_hash": entry["session"].graph.content_hash()
+        }
+
+    def dataset_ids(self):
+        """Known dataset IDs: configured files first, then in-memory datasets"""
+        with self._lock:
+            extra = [dataset_id for dataset_id in self._entries if dataset_id not in self.paths]
+        return list(self.paths) + extra
+
+    def preload(self):
+        """Parse every configured dataset that exists"""
+        for dataset_id in self.paths:
+            self._load(dataset_id)
@@ -0,0 +1,157 @@
+# backend/src/graph_reduction.py
+import logging
+
+from puzzle_graph import VALUE_COUNT
+from trail_solver import ValueMultigraph, solve_components
+
+logger = logging.getLogger(__name__)
+
+
+class GraphReduction:
+    """Value multigraph with its forced runs contracted into weighted super-edges
+
+    A value with exactly one incoming and one outgoing edge, neither of them a
+    self-loop, can only be passed by taking its in-edge directly followed by
+    its out-edge. Any trail that uses only one of the two can be extended by
+    the other, and a closed trail through the value can be rotated to start
+    just after it, so replacing the pair with a single edge of their combined
+    weight keeps the longest trail length. Runs of such values collapse into
+    one super-edge, which the search then takes in a single step.
+
+    Super-edges get negative IDs; expand() turns a reduced chain back into
+    puzzle IDs. The input multigraph must be unweighted.
+    """
+
+    def __init__(self, multigraph):
+        self.original = multigraph
+        # Super-edge ID -> puzzle IDs of its run, in chain order
+        self.runs = {}
+        self.multigraph = self._contract(multigraph)
+        logger.info(f"Contracted {len(self.runs)} forced runs: {multigraph.edge_count} edges "
+                    f"reduced to {self.multigraph.edge_count}")
+
+    def _contract(self, multigraph):
+        # Edge ID -> [takes, gives, pieces], with the edges entering and leaving each value
+        edges = {}
+        in_edges = [set() for _ in range(VALUE_COUNT)]
+        out_edges = [set() for _ in range(VALUE_COUNT)]
+        for (takes, gives), ids in multigraph.edges.items():
+            for puzzle_id in ids:
+                edges[puzzle_id] = [takes, gives, [puzzle_id]]
+                out_edges[takes].add(puzzle_id)
+                in_edges[gives].add(puzzle_id)
+
+        next_id = -1
+        for v in range(VALUE_COUNT):
+            if len(in_edges[v]) != 1 or len(out_edges[v]) != 1:
+                continue
+            (incoming,), (outgoing,) = in_edges[v], out_edges[v]
+            if incoming == outgoing:
+                continue
+            takes, _, first = edges.pop(incoming)
+            _, gives, second = edges.pop(outgoing)
+            in_edges[v].clear()
+            out_edges[v].clear()
+            out_edges[takes].discard(incoming)
+            in_edges[gives].discard(outgoing)
+
+            edges[next_id] = [takes, gives, first + second]
+            out_edges[takes].add(next_id)
+            in_edges[gives].add(next_id)
+            next_id -= 1
+
+        reduced = ValueMultigraph()
+        # Add edges in the original insertion order so the search stays deterministic
+        order = {puzzle_id: position for position, puzzle_id in
+                 enumerate(puzzle_id for ids in multigraph.edges.values() for puzzle_id in ids)}
+        for edge_id, (takes, gives, pieces) in sorted(edges.items(), key=lambda e: order[e[1][2][0]]):
+            if len(pieces) > 1:
+                self.runs[edge_id] = pieces
+            reduced.add_edge(edge_id, takes, gives, len(pieces))
+        return reduced
+
+    def expand(self, chain):
+        """Puzzle IDs of a chain of reduced edge IDs"""
+        runs = self.runs
+        expanded = []
+        for edge_id in chain:
+            if edge_id in runs:
+                expanded.extend(runs[edge_id])
+            else:
+                expanded.append(edge_id)
+        return expanded
+
+
+def forced_run_heads(graph):
+    """Puzzle IDs of a PuzzleGraph that a chain search has to start from
+
+    A piece whose only predecessor has it as its only successor sits inside a
+    forced run: the best chain starting at the predecessor is at least as
+    long as any starting at the piece, so only the first piece of each run is
+    returned. A run that closes into a cycle keeps its lowest ID.
+    """
+    takes, gives = graph.takes, graph.gives
+    givers = [0] * VALUE_COUNT
+    takers = [0] * VALUE_COUNT
+    only_giver = [None] * VALUE_COUNT
+    for puzzle_id in graph.nodes():
+        givers[gives[puzzle_id]] += 1
+        takers[takes[puzzle_id]] += 1
+        only_giver[gives[puzzle_id]] = puzzle_id
+
+    def forced_predecessor(puzzle_id):
+        value = takes[puzzle_id]
+        if givers[value] != 1 or takers[value] != 1 or only_giver[value] == puzzle_id:
+            return None
+        return only_giver[value]
+
+    # Pieces known to be inside a run, and the heads of closed runs
+    interior = set()
+    cycle_heads = set()
+    heads = []
+    for puzzle_id in graph.nodes():
+        if puzzle_id in interior or puzzle_id in cycle_heads:
+            if puzzle_id in cycle_heads:
+                heads.append(puzzle_id)
+            continue
+        current = forced_predecessor(puzzle_id)
+        if current is None:
+            heads.append(puzzle_id)
+            continue
+
+        # Walk back to the head of the run, or around it if it is a cycle
+        walked = [puzzle_id]
+        while current is not None and current != puzzle_id and current not in interior:
+            walked.append(current)
+            current = forced_predecessor(current)
+        if current == puzzle_id:
+            head = min(walked)
+            cycle_heads.add(head)
+            interior.update(walked)
+            interior.discard(head)
+            if head == puzzle_id:
+                heads.append(puzzle_id)
+        else:
+            # The last walked piece is the head unless the walk joined a known run
+            if current is None:
+                walked.pop()
+            interior.update(walked)
+    return heads
+
+
+def solve_reduced(multigraph, timeout_seconds=600, workers=1, seed=None, progress_callback=None,
+                  stop_event=None):
+    """solve_components on the contracted multigraph, with chains expanded to puzzle IDs"""
+    reduction = GraphReduction(multigraph)
+
+    def relay(event, data):
+        if event == "best":
+            data = dict(data, chain=reduction.expand(data["chain"]))
+        progress_callback(event, data)
+
+    result = solve_components(reduction.multigraph, timeout_seconds, workers=workers, seed=seed,
+                              progress_callback=relay if progress_callback is not None else None,
+                              stop_event=stop_event)
+    result["chain"] = reduction.expand(result["chain"])
+    result["reduced_edges"] = reduction.multigraph.edge_count
+    return result
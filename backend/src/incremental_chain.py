@@ -0,0 +1,161 @@
+# backend/src/incremental_chain.py
+import time
+import logging
+import threading
+
+from trail_solver import ValueMultigraph, TrailSearch, solve_exact
+from graph_reduction import solve_reduced
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalChain:
+    """Longest chain of a puzzle graph kept up to date as pieces come and go
+
+    The first request solves the whole value multigraph. After that an added
+    piece is spliced onto an end of the chain or, when it takes and gives the
+    same value, into the chain at that value. Unless that reaches the upper
+    bound, only the weak component holding the new piece is searched again,
+    starting from the spliced chain. A removed piece that is not in the chain changes
+    nothing, one with an unused parallel piece is swapped for it, and
+    otherwise the longer half of the cut chain is the incumbent for searching
+    the components that could still beat it.
+    """
+
+    def __init__(self, graph, timeout_seconds=10, graph_lock=None):
+        self.graph = graph
+        # Held while reading the whole graph, so a rebuild sees no half-done mutation
+        self.graph_lock = graph_lock or threading.Lock()
+        self.timeout_seconds = timeout_seconds
+        self.multigraph = None
+        self.chain = []
+        self.optimal = False
+        self.last_update = None
+        self._lock = threading.Lock()
+
+    def _rebuild(self):
+        start_time = time.time()
+        with self.graph_lock:
+            self.multigraph = ValueMultigraph.from_puzzle_graph(self.graph)
+        result = solve_reduced(self.multigraph, self.timeout_seconds)
+        self.chain = result["chain"]
+        self.optimal = result["optimal"]
+        self.last_update = "solved"
+        logger.info(f"Incremental chain solved from scratch: {len(self.chain)} puzzles "
+                    f"in {time.time() - start_time:.3f} seconds")
+
+    def _ensure(self):
+        if self.multigraph is None:
+            self._rebuild()
+
+    def invalidate(self):
+        """Forget the chain, e.g. after a bulk load; the next request solves again"""
+        with self._lock:
+            self.multigraph = None
+
+    def _upper_bound(self):
+        return TrailSearch(self.multigraph).global_upper_bound()
+
+    def _splice(self, puzzle_id, takes, gives):
+        """Insert a new piece into the chain without searching; returns False if it does not fit"""
+        chain = self.chain
+        graph = self.graph
+        if not chain:
+            chain.append(puzzle_id)
+        elif graph.gives[chain[-1]] == takes:
+            chain.append(puzzle_id)
+        elif graph.takes[chain[0]] == gives:
+            chain.insert(0, puzzle_id)
+        elif takes == gives:
+            # A piece taking and giving the same value fits wherever the chain passes that value
+            position = next((i + 1 for i, chain_id in enumerate(chain) if graph.gives[chain_id] == takes), None)
+            if position is None:
+                return False
+            chain.insert(position, puzzle_id)
+        else:
+            return False
+        return True
+
+    def _resolve(self, incumbent, affected, others_bound):
+        """Search components again, starting from an incumbent chain
+
+        affected holds the values whose components changed; those are always
+        searched. Trails in other components are known to be at most
+        others_bound long, or unknown if it is None, and are only searched
+        when that bound exceeds the incumbent.
+        """
+        graph = self.graph
+        best = incumbent
+        optimal = True
+        for vertices, edge_count in self.multigraph.weak_components():
+            if edge_count <= len(best):
+                continue
+            if vertices.isdisjoint(affected) and (others_bound is None or others_bound <= len(best)):
+                # Not searched: fine when bounded, unproven when nothing is known
+                optimal = optimal and others_bound is not None
+                continue
+            sub = self.multigraph.subgraph(vertices)
+            start = best if best and graph.takes[best[0]] in vertices else None
+            result = solve_exact(sub, self.timeout_seconds, incumbent=start)
+            if len(result["chain"]) > len(best):
+                best = result["chain"]
+            if not result["optimal"] and result["upper_bound"] > len(best):
+                optimal = False
+        self.chain = list(best)
+        self.optimal = optimal
+
+    def added(self, puzzle_id):
+        """Update the chain after a piece was added to the graph"""
+        with self._lock:
+            if self.multigraph is None:
+                return
+            takes, gives = self.graph.takes[puzzle_id], self.graph.gives[puzzle_id]
+            if puzzle_id in self.multigraph.edges.get((takes, gives), ()):
+                # A rebuild since the piece was added already holds it
+                return
+            self.multigraph.add_edge(puzzle_id, takes, gives)
+            previous_length = len(self.chain)
+            spliced = self._splice(puzzle_id, takes, gives)
+            if spliced and len(self.chain) >= self._upper_bound():
+                self.optimal = True
+                self.last_update = "spliced"
+                return
+            # A new piece can join trails, so the longest chain may grow by more
+            # than one; the spliced chain is a strong incumbent for the search
+            self._resolve(self.chain, {takes, gives}, previous_length if self.optimal else None)
+            self.last_update = "searched"
+
+    def removed(self, puzzle_id, takes, gives):
+        """Update the chain after a piece was removed from the graph"""
+        with self._lock:
+            if self.multigraph is None or not self.multigraph.remove_edge(puzzle_id, takes, gives):
+                return
+            if puzzle_id not in self.chain:
+                # The chain is still there and nothing longer can have appeared
+                self.last_update = "unchanged"
+                return
+
+            position = self.chain.index(puzzle_id)
+            used = set(self.chain)
+            spare = next((i for i in self.multigraph.edges.get((takes, gives), []) if i not in used), None)
+            if spare is not None:
+                self.chain[position] = spare
+                self.last_update = "substituted"
+                return
+
+            previous_length = len(self.chain)
+            before, after = self.chain[:position], self.chain[position + 1:]
+            incumbent = before if len(before) >= len(after) else after
+            self._resolve(incumbent, {takes, gives}, previous_length if self.optimal else None)
+            self.last_update = "searched"
+
+    def state(self):
+        """Current chain as a dict, solving first if needed"""
+        with self._lock:
+            self._ensure()
+            return {
+                "chain": list(self.chain),
+                "chain_length": len(self.chain),
+                "optimal": self.optimal,
+                "update": self.last_update
+            }
@@ -0,0 +1,224 @@
+# backend/src/jobs.py
+import time
+import uuid
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from puzzle import PuzzleSession
+
+logger = logging.getLogger(__name__)
+
+# A child sends at most one best chain per this many seconds; each can hold every piece
+BEST_EVENT_INTERVAL = 1.0
+
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _solve_worker(snapshot, dataset_id, solve_args, events, stop_event):
+    """Child process: rebuild the session and solve it, sending its events to the parent
+
+    Progress events are sent as they come. Best chains are sent at most once
+    per BEST_EVENT_INTERVAL, and the last one held back just before the
+    result, so a search that keeps improving does not pickle every chain.
+    """
+    session = PuzzleSession.from_snapshot(snapshot, dataset_id)
+    pending = None
+    last_sent = 0.0
+
+    def relay(event, data):
+        nonlocal pending, last_sent
+        if event != "best":
+            events.put(("event", event, data))
+            return
+        now = time.time()
+        if now - last_sent >= BEST_EVENT_INTERVAL:
+            events.put(("event", event, data))
+            pending, last_sent = None, now
+        else:
+            pending = data
+
+    try:
+        result = session.solve_longest_chain(progress_callback=relay, stop_event=stop_event, **solve_args)
+        if pending is not None:
+            events.put(("event", "best", pending))
+        events.put(("result", result))
+    except Exception as e:
+        events.put(("error", e))
+
+
+def solve_in_process(session, progress_callback=None, stop_event=None, **solve_args):
+    """session.solve_longest_chain in a child process, so concurrent solves do not share the GIL
+
+    The child works on a copy of the session's pieces with the same puzzle
+    IDs. Its progress and best-chain events are relayed to progress_callback
+    in this thread, and setting stop_event stops the child's search, which
+    then still returns its best chain. solve_args are passed through to
+    solve_longest_chain; errors raised there are raised here.
+
+    The child is started with forkserver (spawn where that is missing)
+    rather than forked, as forking the threaded server can copy locks
+    other threads hold.
+    """
+    context = multiprocessing.get_context(START_METHOD)
+    events = context.Queue()
+    child_stop = context.Event()
+    # Not a daemon, so the exact mode can still start its own worker processes
+    process = context.Process(target=_solve_worker, name="solve-job",
+                              args=(session.snapshot(), session.dataset_id, solve_args, events, child_stop))
+    process.start()
+    try:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                child_stop.set()
+            try:
+                message = events.get(timeout=0.2 if process.is_alive() else 1)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                raise RuntimeError(f"Solve process exited with code {process.exitcode}")
+            if message[0] == "event":
+                if progress_callback is not None:
+                    progress_callback(message[1], message[2])
+            elif message[0] == "result":
+                return message[1]
+            else:
+                raise message[1]
+    finally:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+class SolveJob:
+    """State of a longest-chain solve running in the background"""
+
+    def __init__(self, params, session=None):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        # Puzzle session the job solves on, used to render its chains
+        self.session = session
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.best_length = 0
+        self.best_chain = []
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.stop_event = threading.Event()
+        self._done = threading.Event()
+        # Bumped on every update so event streams can wait for the next one.
+        # Only the latest progress snapshot and best chain are kept, so a slow
+        # subscriber skips intermediate updates instead of queueing them.
+        self.version = 0
+        self.progress_version = 0
+        self.best_version = 0
+        self._changed = threading.Condition()
+
+    def report(self, event, data):
+        """Progress callback handed to the solver"""
+        with self._changed:
+            self.version += 1
+            if event == "best":
+                if data.get("best_length", 0) > self.best_length or not self.best_version:
+                    self.best_chain = data.get("chain", [])
+                    self.best_version = self.version
+            else:
+                self.progress = data
+                self.progress_version = self.version
+            self.best_length = max(self.best_length, data.get("best_length", 0))
+            self._changed.notify_all()
+
+    def wait_for_update(self, version, timeout=None):
+        """Block until the job changes after version or finishes; returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version or self.finished, timeout)
+            return self.version
+
+    def cancel(self):
+        """Ask the search to stop; the job finishes with the best chain so far"""
+        self.stop_event.set()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def to_dict(self):
+        """Job status as a JSON-serializable dict"""
+        now = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "best_length": self.best_length,
+            "progress": self.progress,
+            "elapsed_seconds": now - self.started_at if self.started_at else 0.0,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """Runs solve jobs in the background and keeps recent jobs addressable by ID
+
+    The thread pool only bounds how many jobs run at once; targets do their
+    CPU-bound work in a child process with solve_in_process.
+    """
+
+    def __init__(self, max_workers=4, max_jobs=100):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solve-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, target, params, session=None):
+        """Queue target(job) in the background and return the job immediately
+
+        target receives the SolveJob and returns the JSON-serializable result.
+        """
+        job = SolveJob(params, session)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job, target)
+        logger.info(f"Submitted solve job {job.id} with params {params}")
+        return job
+
+    def get(self, job_id):
+        """Job with the given ID, or None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict(self):
+        """Forget the oldest finished jobs beyond max_jobs"""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job, target):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = target(job)
+            job.status = "cancelled" if job.stop_event.is_set() else "done"
+        except Exception as e:
+            logger.error(f"Solve job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            with job._changed:
+                job.version += 1
+                job._done.set()
+                job._changed.notify_all()
+            logger.info(f"Solve job {job.id} finished with status {job.status}")
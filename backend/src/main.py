@@ -3,12 +3,25 @@ import os
 from flask import Flask, jsonify, request, send_from_directory, Response
 from flask_cors import CORS
 import config  # Import the config module
-from puzzle import Puzzle
+from puzzle import Puzzle, PuzzleSession
+from chain_cache import ChainCache, chain_from_numbers
+from chain_extender import chain_numbers, parse_chain_text, extend_numbers
+from chain_validator import validate_chain, validate_numbers, validation_errors, MAX_REPORTED_ERRORS
+from chain_counter import format_count
+from chain_export import (chunked, iter_chain_text, iter_json_document, chain_json_entries,
+                          iter_merged_digits, iter_id_bytes, compressed, COMPRESSIONS)
+from jobs import JobManager, solve_in_process
+from dataset_registry import DatasetRegistry
+from puzzle_loader import read_puzzle_file, read_binary_dataset, PuzzleStreamParser
 import logging
 import time
 import traceback
 import json
+import re
+import uuid
+import threading
 from datetime import datetime
+from functools import partial
 
 # Configure logging
 logging.basicConfig(
@@ -30,8 +43,13 @@ for key, path in config.DATASET_PATHS.items():
 app = Flask(__name__, static_folder=config.STATIC_FOLDER)
 CORS(app)  # Enable CORS for all routes
 
-def load_puzzles_from_file(file_path, force_reset=True):
-    """Load puzzles from file with proper error handling"""
+def load_puzzles_from_file(file_path, force_reset=True, session=None):
+    """Load puzzles from file with proper error handling
+
+    Puzzles go into session, or into the default session (reset first when
+    force_reset is set) if none is given. The file is parsed in bulk into
+    byte columns rather than line by line.
+    """
     try:
         logger.info(f"Loading puzzles from {file_path}")
         
@@ -39,39 +57,172 @@ def load_puzzles_from_file(file_path, force_reset=True):
             logger.error(f"File not found: {file_path}")
             return 0
             
-        if force_reset:
-            Puzzle.reset()
-            
-        puzzle_count = 0
-        skipped_count = 0
+        if session is None:
+            if force_reset:
+                Puzzle.reset()
+            session = Puzzle.get_session()
         
-        with open(file_path, 'r') as file:
-            for line in file:
-                line = line.strip()
-                if not line or len(line) != 6:
-                    skipped_count += 1
-                    continue
-                    
-                try:
-                    Puzzle.add_puzzle_direct(line)
-                    puzzle_count += 1
-                except ValueError as e:
-                    logger.warning(f"Skipping invalid puzzle {line}: {e}")
-                    skipped_count += 1
+        start_time = time.time()
+        if str(file_path).endswith(".pzb"):
+            takes, middle, gives, bucket_index, content_hash = read_binary_dataset(file_path)
+            puzzle_count = session.add_columns(takes, middle, gives, bucket_index, content_hash)
+            skipped_count = 0
+        else:
+            takes, middle, gives, skipped_count = read_puzzle_file(file_path)
+            puzzle_count = session.add_columns(takes, middle, gives)
                     
-        logger.info(f"Loaded {puzzle_count} puzzles, skipped {skipped_count} invalid entries")
+        logger.info(f"Loaded {puzzle_count} puzzles, skipped {skipped_count} invalid entries "
+                    f"in {time.time() - start_time:.3f} seconds")
         return puzzle_count
         
-    except UnicodeDecodeError:
-        logger.error(f"File encoding error: {file_path}")
-        return 0
     except Exception as e:
         logger.error(f"Error loading puzzles: {e}")
         return 0
 
+def parse_workers(value):
+    """Parse a worker count, capped at the number of available CPUs"""
+    workers = int(value)
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    return min(workers, os.cpu_count() or 1)
+
+# Parsed datasets, each in its own session, reparsed only when their file changes
+datasets = DatasetRegistry(config.DATASET_PATHS,
+                           lambda file_path, session: load_puzzles_from_file(file_path, session=session))
+
+def load_dataset(dataset):
+    """Session holding the named dataset, loading it on first use; None if it cannot be loaded"""
+    if dataset not in datasets.dataset_ids():
+        raise ValueError(f"Invalid dataset: {dataset}")
+    return datasets.get(dataset)
+
+def request_session(args):
+    """Session named by the 'dataset' argument, or the default session"""
+    dataset = args.get('dataset')
+    if dataset is None:
+        return Puzzle.get_session()
+    session = load_dataset(dataset)
+    if session is None:
+        raise ValueError(f"Failed to load dataset: {dataset}")
+    return session
+
+# Longest-chain results shared by the solve and export endpoints
+chain_cache = ChainCache(max_entries=config.CHAIN_CACHE_SIZE, cache_dir=config.CHAIN_CACHE_DIR)
+
+# Background executor for solve jobs
+job_manager = JobManager(max_workers=config.JOB_WORKERS, max_jobs=config.JOB_HISTORY)
+
+def solve_chain(timeout, mode='dfs', workers=1, seed=None, progress_callback=None, stop_event=None, session=None,
+                in_process=False):
+    """Find the longest chain, reusing a cached result for the same dataset and mode
+
+    With in_process a search that is not cached runs in a child process, as
+    solve jobs do so that several of them can run at the same time.
+    """
+    if mode not in Puzzle.SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: '{mode}', expected one of {', '.join(Puzzle.SEARCH_MODES)}")
+    if session is None:
+        session = Puzzle.get_session()
+    
+    graph = session.graph
+    dataset_hash = graph.content_hash()
+    entry = chain_cache.get(dataset_hash, mode, timeout)
+    if entry is not None:
+        chain_ids = chain_from_numbers(graph, entry["numbers"])
+        if chain_ids is not None:
+            logger.info(f"Using cached {mode} chain of length {len(chain_ids)} for dataset {dataset_hash[:12]}")
+            if progress_callback is not None:
+                progress_callback("best", {"best_length": len(chain_ids), "chain": chain_ids, "elapsed_seconds": 0.0})
+            return {
+                "chain": chain_ids,
+                "optimal": entry["optimal"],
+                "operations": entry["operations"],
+                "search_time_seconds": entry["search_time_seconds"],
+                "mode": mode,
+                "cached": True
+            }
+    
+    solve = partial(solve_in_process, session) if in_process else session.solve_longest_chain
+    result = solve(timeout_seconds=timeout, mode=mode, workers=workers, seed=seed,
+                   progress_callback=progress_callback, stop_event=stop_event)
+    # A cancelled search did not get its full timeout, so it must not be reused
+    if stop_event is None or not stop_event.is_set():
+        numbers = [graph.store.number(puzzle_id) for puzzle_id in result["chain"]]
+        chain_cache.put(dataset_hash, mode, timeout, result, numbers)
+    result["cached"] = False
+    return result
+
+def parse_solve_params(args):
+    """Validate timeout, mode, workers and seed from request arguments"""
+    timeout = int(args.get('timeout', 60))
+    if timeout <= 0 or timeout > 600:  # Cap at 10 minutes
+        timeout = 60
+        logger.warning(f"Invalid timeout value, using default: {timeout}")
+    
+    mode = args.get('mode', 'dfs')
+    if mode not in Puzzle.SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: '{mode}', expected one of {', '.join(Puzzle.SEARCH_MODES)}")
+    
+    workers = parse_workers(args.get('workers', 1))
+    seed = args.get('seed')
+    seed = int(seed) if seed is not None else None
+    return {"timeout": timeout, "mode": mode, "workers": workers, "seed": seed, "dataset": args.get('dataset')}
+
+def submit_solve_job(args):
+    """Validate solve arguments and queue a job on the session they name"""
+    params = parse_solve_params(args)
+    return job_manager.submit(run_solve_job, params, session=request_session(args))
+
+def run_solve_job(job):
+    """Job target: solve with the job's parameters and render the chain"""
+    params = job.params
+    session = job.session
+    logger.info(f"Finding longest chain with {params['timeout']} second timeout "
+                f"({params['mode']} mode, {params['workers']} workers)")
+    
+    start_time = time.time()
+    result = solve_chain(params["timeout"], mode=params["mode"], workers=params["workers"], seed=params["seed"],
+                         progress_callback=job.report, stop_event=job.stop_event, session=session, in_process=True)
+    chain_ids = result["chain"]
+    elapsed = time.time() - start_time
+    logger.info(f"Found chain of length {len(chain_ids)} in {elapsed:.2f} seconds")
+    
+    # Convert chain IDs to puzzle objects
+    chain = []
+    for id in chain_ids:
+        matching_puzzle = session.get_puzzle(id)
+        if matching_puzzle:
+            chain.append(matching_puzzle.get_puzzle_info())
+        else:
+            logger.error(f"Puzzle with ID {id} not found in puzzle collection")
+    
+    # Log detailed chain info for debugging
+    try:
+        Puzzle.debug_chain(chain_ids, session=session)
+    except Exception as e:
+        logger.error(f"Error in debug_chain: {e}")
+        # Continue despite error in debug function
+    
+    job.best_length = max(job.best_length, len(chain))
+    return {
+        "chain": chain,
+        "chain_length": len(chain),
+        "processing_time_seconds": elapsed,
+        "timeout_seconds": params["timeout"],
+        "mode": params["mode"],
+        "workers": params["workers"],
+        "optimal": result["optimal"],
+        "cached": result["cached"],
+        "dataset": params["dataset"]
+    }
+
 # Load default dataset on startup if exists
+if config.PRELOAD_DATASETS:
+    datasets.preload()
 if os.path.exists(config.DATASET_PATHS["default"]):
-    load_puzzles_from_file(config.DATASET_PATHS["default"])
+    default_session = load_dataset("default")
+    if default_session is not None:
+        Puzzle.use_session(default_session)
 else:
     logger.warning(f"Default dataset not found at {config.DATASET_PATHS['default']}")
 
@@ -86,62 +237,102 @@ def ensure_puzzles_exist():
 def get_datasets():
     """Return information about available datasets"""
     try:
-        results = {}
-        for name, path in config.DATASET_PATHS.items():
-            exists = os.path.exists(path)
-            size = os.path.getsize(path) if exists else 0
-            puzzle_count = 0
-            
-            if exists:
-                with open(path, 'r', encoding='utf-8-sig') as f:
-                    puzzle_count = sum(1 for line in f if line.strip() and len(line.strip()) == 6 and line.strip().isdigit())
-            
-            results[name] = {
-                "path": path,
-                "exists": exists,
-                "size_bytes": size,
-                "puzzle_count": puzzle_count
-            }
-        
+        # Metadata comes from the registry, which parses each file only once
+        results = {name: datasets.info(name) for name in datasets.dataset_ids()}
         return jsonify(results)
     except Exception as e:
         logger.error(f"Error getting dataset info: {str(e)}")
         logger.error(traceback.format_exc())
         return jsonify({"error": str(e)}), 500
 
+# Uploaded dataset IDs, oldest first
+uploaded_datasets = []
+upload_lock = threading.Lock()
+
+@app.route('/api/datasets/upload', methods=['POST'])
+def upload_dataset():
+    """Load a puzzle file sent as the raw request body
+
+    The body is parsed in chunks as it arrives, so only the compact puzzle
+    columns are kept in memory. The result is registered as a new dataset
+    that the other endpoints accept as their 'dataset' argument.
+    """
+    name = request.args.get('name', default='upload')
+    dataset = f"upload_{re.sub(r'[^A-Za-z0-9_.-]', '_', name)[:64]}_{uuid.uuid4().hex[:8]}"
+    
+    if request.content_length is not None and request.content_length > config.UPLOAD_MAX_BYTES:
+        return jsonify({"error": f"Upload exceeds {config.UPLOAD_MAX_BYTES} bytes"}), 413
+    
+    try:
+        start_time = time.time()
+        session = PuzzleSession(dataset)
+        parser = PuzzleStreamParser()
+        received = 0
+        while True:
+            chunk = request.stream.read(config.UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            received += len(chunk)
+            if received > config.UPLOAD_MAX_BYTES:
+                return jsonify({"error": f"Upload exceeds {config.UPLOAD_MAX_BYTES} bytes"}), 413
+            session.add_columns(*parser.feed(chunk))
+        session.add_columns(*parser.finish())
+        
+        if not len(session):
+            return jsonify({"error": "No valid puzzles found. Puzzles must be 6-digit numbers, one per line.",
+                            "skipped": parser.skipped}), 400
+        
+        datasets.put(dataset, session)
+        with upload_lock:
+            uploaded_datasets.append(dataset)
+            while len(uploaded_datasets) > config.UPLOAD_LIMIT:
+                datasets.drop(uploaded_datasets.pop(0))
+        
+        elapsed = time.time() - start_time
+        logger.info(f"Uploaded dataset {dataset}: {parser.puzzle_count} puzzles, skipped {parser.skipped} "
+                    f"invalid entries, {received} bytes in {elapsed:.2f} seconds")
+        return jsonify({
+            "dataset": dataset,
+            "puzzle_count": parser.puzzle_count,
+            "skipped": parser.skipped,
+            "size_bytes": received,
+            "processing_time_seconds": elapsed
+        }), 201
+    except Exception as e:
+        logger.error(f"Error uploading dataset: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/puzzles', methods=['GET'])
 def get_puzzles():
     """Get all puzzles or load a specific dataset"""
     logger.info("API endpoint /api/puzzles hit!")
     dataset = request.args.get('dataset', default='default')
     
-    if dataset not in config.DATASET_PATHS:
+    if dataset not in datasets.dataset_ids():
         logger.error(f"Invalid dataset requested: {dataset}")
         return jsonify({
             "error": f"Invalid dataset: {dataset}",
-            "available_datasets": list(config.DATASET_PATHS.keys())
+            "available_datasets": datasets.dataset_ids()
         }), 400
     
     logger.info(f"Request for dataset: {dataset}")
     
     try:
-        # Switch to requested dataset
-        if (dataset in config.DATASET_PATHS):
-            file_path = config.DATASET_PATHS[dataset]
-            
-            if os.path.exists(file_path):
-                # Reset is now handled within load_puzzles_from_file
-                puzzle_count = load_puzzles_from_file(file_path)
-                if puzzle_count == 0:
-                    logger.error(f"Failed to load dataset: {dataset}")
-                    return jsonify({"error": f"Failed to load dataset: {dataset}"}), 500
-                logger.info(f"Loaded {puzzle_count} puzzles from dataset: {dataset}")
-            else:
-                logger.error(f"Dataset file not found: {file_path}")
-                return jsonify({"error": f"Dataset file not found: {file_path}"}), 404
-                
+        file_path = config.DATASET_PATHS.get(dataset)
+        if file_path is not None and not os.path.exists(file_path):
+            logger.error(f"Dataset file not found: {file_path}")
+            return jsonify({"error": f"Dataset file not found: {file_path}"}), 404
+        
+        # The registry parses each dataset once and keeps it resident
+        session = load_dataset(dataset)
+        if session is None:
+            logger.error(f"Failed to load dataset: {dataset}")
+            return jsonify({"error": f"Failed to load dataset: {dataset}"}), 500
+        logger.info(f"Using {len(session)} puzzles from dataset: {dataset}")
+        
         # Return all puzzles
-        puzzles = Puzzle.get_all_puzzles()
+        puzzles = session.puzzles
         result = [p.get_puzzle_info() for p in puzzles]
         return jsonify(result)
     except Exception as e:
@@ -149,175 +340,382 @@ def get_puzzles():
         logger.error(traceback.format_exc())
         return jsonify({"error": str(e)}), 500
 
+def incremental_summary(session):
+    """Chain kept by the session's incremental engine, without the chain itself"""
+    state = session.incremental_chain(config.INCREMENTAL_TIMEOUT).state()
+    return {
+        "chain_length": state["chain_length"],
+        "optimal": state["optimal"],
+        "update": state["update"]
+    }
+
+@app.route('/api/puzzles/add', methods=['POST'])
+def add_puzzle():
+    """Add a single puzzle and update the incremental longest chain"""
+    data = request.get_json(silent=True) or {}
+    try:
+        session = request_session(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    puzzle = session.add_puzzle(str(data.get('puzzle_number', '')))
+    if puzzle is None:
+        return jsonify({"error": f"Invalid puzzle number: {data.get('puzzle_number')}"}), 400
+    logger.info(f"Added puzzle {puzzle.puzzle_number} as ID {puzzle.id}")
+    return jsonify({"puzzle": puzzle.get_puzzle_info(), "chain": incremental_summary(session)}), 201
+
+@app.route('/api/puzzles/<int:puzzle_id>', methods=['DELETE'])
+def remove_puzzle(puzzle_id):
+    """Remove a single puzzle and update the incremental longest chain"""
+    try:
+        session = request_session(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    puzzle = session.remove_puzzle(puzzle_id)
+    if puzzle is None:
+        return jsonify({"error": f"Puzzle not found: {puzzle_id}"}), 404
+    logger.info(f"Removed puzzle {puzzle.puzzle_number} with ID {puzzle_id}")
+    return jsonify({"puzzle": puzzle.get_puzzle_info(), "chain": incremental_summary(session)})
+
+@app.route('/api/puzzles/incremental_chain', methods=['GET'])
+def get_incremental_chain():
+    """Longest chain maintained across single-piece additions and removals"""
+    try:
+        session = request_session(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    state = session.incremental_chain(config.INCREMENTAL_TIMEOUT).state()
+    lookup = session.get_puzzle
+    state["chain"] = [lookup(puzzle_id).get_puzzle_info() for puzzle_id in state["chain"]]
+    return jsonify(state)
+
+@app.route('/api/puzzles/chain_count', methods=['GET'])
+def get_chain_count():
+    """Number of distinct longest chains, counted rather than enumerated
+
+    Counts are decimal strings, in scientific notation when they are huge.
+    count is only set when it is exact; count_lower and count_upper bound it
+    otherwise.
+    """
+    try:
+        session = request_session(request.args)
+        timeout = min(max(float(request.args.get('timeout', 0.5)), 0.0), 60.0)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = session.count_longest_chains(timeout)
+    exact_log10 = result["count_log10_lower"] if result["exact"] else None
+    return jsonify({
+        "longest_length": result["longest_length"],
+        "optimal": result["optimal"],
+        "exact": result["exact"],
+        "count": format_count(result["count"], exact_log10),
+        "count_lower": format_count(log10=result["count_log10_lower"]),
+        "count_upper": format_count(log10=result["count_log10_upper"]),
+        "components": result["components"],
+        "search_time_seconds": result["search_time_seconds"]
+    })
+
 @app.route('/api/puzzles/longest_chain', methods=['GET'])
 def get_longest_chain():
-    """Find and return the longest chain of puzzles"""
+    """Find and return the longest chain of puzzles
+
+    Runs as a background job and waits for it, so the search does not hold
+    up other requests' solves.
+    """
     try:
-        # Set timeout from request parameter or default
-        timeout = int(request.args.get('timeout', default=60))
-        if timeout <= 0 or timeout > 600:  # Cap at 10 minutes
-            timeout = 60
-            logger.warning(f"Invalid timeout value, using default: {timeout}")
-        
-        logger.info(f"Finding longest chain with {timeout} second timeout")
-        
-        # Find the longest chain
-        start_time = time.time()
-        chain_ids = Puzzle.find_longest_chain(timeout_seconds=timeout)
-        elapsed = time.time() - start_time
-        
-        logger.info(f"Found chain of length {len(chain_ids)} in {elapsed:.2f} seconds")
-        
-        # Convert chain IDs to puzzle objects
-        puzzles = Puzzle.get_all_puzzles()
-        
-        try:
-            chain = []
-            for id in chain_ids:
-                matching_puzzle = next((p.get_puzzle_info() for p in puzzles if p.id == id), None)
-                if matching_puzzle:
-                    chain.append(matching_puzzle)
-                else:
-                    logger.error(f"Puzzle with ID {id} not found in puzzle collection")
-        except Exception as e:
-            logger.error(f"Error processing chain data: {e}")
-            return jsonify({"error": f"Error processing chain data: {e}"}), 500
-        
-        # Log detailed chain info for debugging
+        job = submit_solve_job(request.args)
+    except ValueError as e:
+        logger.error(f"Invalid parameter: {str(e)}")
+        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
+    
+    job.wait()
+    if job.status == "failed":
+        return jsonify({"error": job.error}), 500
+    return jsonify(job.result)
+
+@app.route('/api/chains/extend', methods=['POST'])
+def extend_chain_endpoint():
+    """Grow a chain with unused pieces instead of solving again
+
+    The body holds the chain in any exported shape. Without one, the cached
+    chain of the dataset for the given mode is extended and cached again.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        session = request_session(request.args)
+        graph = session.graph
+        mode = request.args.get('mode', 'dfs')
+        entry = None
+        if data:
+            numbers = chain_numbers(data)
+        else:
+            entry = chain_cache.get(graph.content_hash(), mode, 0)
+            if entry is None:
+                return jsonify({"error": f"No cached {mode} chain for this dataset"}), 404
+            numbers = entry["numbers"]
+        result = extend_numbers(graph, numbers)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if entry is not None and result["added"]:
+        extended_numbers = [graph.store.number(puzzle_id) for puzzle_id in result["chain"]]
+        chain_cache.put(graph.content_hash(), mode, entry["timeout_seconds"], entry, extended_numbers)
+    lookup = session.get_puzzle
+    result["chain"] = [lookup(puzzle_id).get_puzzle_info() for puzzle_id in result["chain"]]
+    result["cached"] = entry is not None
+    return jsonify(result)
+
+@app.route('/api/chains/validate', methods=['POST'])
+def validate_chain_endpoint():
+    """Check uploaded chains against the dataset without solving anything
+
+    The body is one chain as JSON in any exported shape or as a chain.txt
+    export, or {"chains": [...]} to check many chains in one request.
+    """
+    text = request.get_data(as_text=True)
+    if not text.strip():
+        return jsonify({"error": "No chain given"}), 400
+    try:
+        session = request_session(request.args)
+        max_errors = int(request.args.get('max_errors', MAX_REPORTED_ERRORS))
+        if max_errors < 0:
+            raise ValueError(f"max_errors must be at least 0, got {max_errors}")
         try:
-            Puzzle.debug_chain(chain_ids)
-        except Exception as e:
-            logger.error(f"Error in debug_chain: {e}")
-            # Continue despite error in debug function
-        
-        return jsonify({
-            "chain": chain,
-            "chain_length": len(chain),
-            "processing_time_seconds": elapsed,
-            "timeout_seconds": timeout
-        })
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and "chains" in data:
+            if not isinstance(data["chains"], list):
+                raise ValueError("Expected 'chains' to be a list of chains")
+            results = [validate_numbers(session.graph, chain_numbers(chain), max_errors) for chain in data["chains"]]
+            return jsonify({
+                "chain_count": len(results),
+                "valid_count": sum(1 for result in results if result["valid"]),
+                "results": results
+            })
+        numbers = chain_numbers(data) if data is not None else parse_chain_text(text)
+        return jsonify(validate_numbers(session.graph, numbers, max_errors))
     except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Start a longest-chain solve in the background and return its job ID"""
+    try:
+        job = submit_solve_job(request.get_json(silent=True) or request.args)
+    except (ValueError, TypeError) as e:
         logger.error(f"Invalid parameter: {str(e)}")
         return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
-    except Exception as e:
-        logger.error(f"Error finding longest chain: {str(e)}")
-        logger.error(traceback.format_exc())
-        return jsonify({"error": str(e)}), 500
+    
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, best-so-far length and, once done, the chain of a solve job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Stop a running solve job early; it finishes with the best chain found so far"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    job.cancel()
+    logger.info(f"Cancellation requested for solve job {job_id}")
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+def sse_event(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream progress snapshots and new best chains of a solve job as Server-Sent Events
+
+    Emits "progress" and "best" events while the search runs and a final
+    "done" event with the job status and result.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    
+    def generate():
+        version = None
+        sent_progress = 0
+        sent_best = 0
+        while True:
+            previous = version
+            version = job.wait_for_update(version, timeout=15)
+            if version == previous and not job.finished:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            if job.progress_version != sent_progress:
+                sent_progress = job.progress_version
+                yield sse_event("progress", dict(job.progress, status=job.status))
+            if job.best_version != sent_best:
+                sent_best = job.best_version
+                chain = job.best_chain
+                store = job.session.store
+                yield sse_event("best", {
+                    "best_length": len(chain),
+                    "chain": [store.number(puzzle_id) for puzzle_id in chain]
+                })
+            if job.finished:
+                yield sse_event("done", job.to_dict())
+                return
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def export_job(args):
+    """Finished solve job whose chain an export request renders
+
+    With a 'job' argument that job's chain is exported, waiting for it if it
+    is still running. Otherwise the export is solved as a job of its own, so
+    it runs in a child process and can be cancelled like any other.
+    Raises ValueError for invalid arguments and RuntimeError if the solve fails.
+    """
+    job_id = args.get('job')
+    if job_id is not None:
+        job = job_manager.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job: {job_id}")
+    else:
+        job = submit_solve_job(args)
+    job.wait()
+    if job.status == "failed":
+        raise RuntimeError(job.error)
+    return job
 
 @app.route('/api/puzzles/export/chain.txt')
 def export_chain_txt():
-    """Export the current chain as plaintext"""
+    """Export the current chain as plaintext, streamed as it is rendered"""
     try:
         # Get the latest chain data
-        chain_ids = Puzzle.find_longest_chain(timeout_seconds=int(request.args.get('timeout', 60)))
-        puzzles = Puzzle.get_all_puzzles()
+        job = export_job(request.args)
+        session = job.session
+        chain_ids = [entry["id"] for entry in job.result["chain"]]
         
         if not chain_ids:
             return "No chain found", 404
             
-        # Generate plain text content
-        content = []
-        content.append(f"Puzzle Chain Export")
-        content.append(f"=================")
-        content.append(f"")
-        content.append(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        content.append(f"Chain Length: {len(chain_ids)} puzzles")
-        content.append(f"")
-        content.append(f"Chain:")
-        content.append(f"")
-        
-        # Add each puzzle
-        for i, puzzle_id in enumerate(chain_ids):
-            puzzle = next((p for p in puzzles if p.id == puzzle_id), None)
-            if puzzle:
-                content.append(f"{i+1}. Puzzle #{puzzle.puzzle_number} - Takes: {puzzle.puzzle_sides['takes']}, Gives: {puzzle.puzzle_sides['gives']}")
-                
-                # Add connection for all but first
-                if i > 0:
-                    prev_puzzle = next((p for p in puzzles if p.id == chain_ids[i-1]), None)
-                    if prev_puzzle:
-                        content.append(f"   Connection: {prev_puzzle.puzzle_sides['gives']} → {puzzle.puzzle_sides['takes']}")
-            
         # Generate response
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"puzzle-chain-{timestamp}.txt"
         
         return Response(
-            "\n".join(content),
+            chunked(iter_chain_text(chain_ids, session.get_puzzle)),
             mimetype="text/plain",
             headers={"Content-Disposition": f"attachment;filename={filename}"}
         )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error exporting chain as text: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/puzzles/export/chain.json')
 def export_chain_json():
-    """Export the current chain as JSON with metadata"""
+    """Export the current chain as JSON with metadata, streamed as it is rendered"""
     try:
-        # Get the latest chain data with timeout validation
-        timeout = min(max(int(request.args.get('timeout', 60)), 1), 600)
-        start_time = time.time()
-        chain_ids = Puzzle.find_longest_chain(timeout_seconds=timeout)
+        # Get the latest chain data
+        job = export_job(request.args)
+        session = job.session
+        chain_ids = [entry["id"] for entry in job.result["chain"]]
         if not chain_ids:
             logger.warning("No chain found or chain computation timed out")
             return jsonify({"error": "No valid chain found"}), 404
-        processing_time = time.time() - start_time
-        puzzles = Puzzle.get_all_puzzles()
+        processing_time = job.result["processing_time_seconds"]
         
-        if not chain_ids:
-            return jsonify({"error": "No chain found"}), 404
-            
-        # Generate JSON content
-        result = {
-            "metadata": {
-                "timestamp": datetime.now().isoformat(),
-                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "processing_time_seconds": round(processing_time, 2),
-                "puzzle_count": len(puzzles),
-                "chain_length": len(chain_ids)
-            },
-            "chain": []
+        metadata = {
+            "timestamp": datetime.now().isoformat(),
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "processing_time_seconds": round(processing_time, 2),
+            "puzzle_count": len(session),
+            "chain_length": len(chain_ids)
         }
-        
-        # Add each puzzle
-        for i, puzzle_id in enumerate(chain_ids):
-            puzzle = next((p for p in puzzles if p.id == puzzle_id), None)
-            if puzzle:
-                puzzle_data = {
-                    "position": i + 1,
-                    "id": puzzle.id,
-                    "puzzle_number": puzzle.puzzle_number,
-                    "takes": puzzle.puzzle_sides["takes"],
-                    "gives": puzzle.puzzle_sides["gives"]
-                }
-                
-                # Add connection info
-                if i > 0:
-                    prev_puzzle = next((p for p in puzzles if p.id == chain_ids[i-1]), None)
-                    if prev_puzzle:
-                        puzzle_data["connection"] = {
-                            "from_puzzle": prev_puzzle.puzzle_number,
-                            "gives": prev_puzzle.puzzle_sides["gives"],
-                            "takes": puzzle.puzzle_sides["takes"],
-                            "is_valid": prev_puzzle.puzzle_sides["gives"] == puzzle.puzzle_sides["takes"]
-                        }
-                        
-                result["chain"].append(puzzle_data)
+        document = iter_json_document({"metadata": metadata}, "chain",
+                                      chain_json_entries(chain_ids, session.get_puzzle))
         
         # Generate response
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"puzzle-chain-{timestamp}.json"
         
         return Response(
-            json.dumps(result, indent=2),
+            chunked(document),
             mimetype="application/json",
             headers={"Content-Disposition": f"attachment;filename={filename}"}
         )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error exporting chain as JSON: {e}")
         return jsonify({"error": str(e)}), 500
 
+def check_export_chain(session, chain_ids):
+    """Raise ValueError for a chain that cannot be exported, before its response starts streaming"""
+    result = validate_chain(session.graph, chain_ids, max_errors=1)
+    if not result["valid"]:
+        raise ValueError(f"Chain cannot be exported: {validation_errors(result)[0]}")
+
+def compact_download(chunks, filename, mimetype):
+    """Stream a compact export, compressed when the compress parameter asks for it"""
+    method = request.args.get('compress')
+    if method:
+        # Raises ValueError before anything is sent for an unknown or unavailable method
+        chunks = compressed(chunks, method)
+        filename += COMPRESSIONS[method]
+        mimetype = "application/gzip" if method == "gzip" else "application/zstd"
+    return Response(chunks, mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment;filename={filename}"})
+
+@app.route('/api/puzzles/export/chain.seq')
+def export_chain_sequence():
+    """Export the current chain as its merged digit sequence, optionally gzip or zstd compressed"""
+    try:
+        job = export_job(request.args)
+        session = job.session
+        chain_ids = [entry["id"] for entry in job.result["chain"]]
+        if not chain_ids:
+            return jsonify({"error": "No valid chain found"}), 404
+        check_export_chain(session, chain_ids)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return compact_download(iter_merged_digits(chain_ids, session.graph.store),
+                                f"puzzle-chain-{timestamp}.txt", "text/plain")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting chain sequence: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/puzzles/export/chain.bin')
+def export_chain_binary():
+    """Export the current chain's puzzle IDs as little-endian uint32 values, optionally compressed"""
+    try:
+        job = export_job(request.args)
+        session = job.session
+        chain_ids = [entry["id"] for entry in job.result["chain"]]
+        if not chain_ids:
+            return jsonify({"error": "No valid chain found"}), 404
+        check_export_chain(session, chain_ids)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return compact_download(iter_id_bytes(chain_ids), f"puzzle-chain-{timestamp}.bin",
+                                "application/octet-stream")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting chain IDs: {e}")
+        return jsonify({"error": str(e)}), 500
+
 # Add security headers
 @app.after_request
 def add_security_headers(response):
@@ -366,4 +764,4 @@ if __name__ == '__main__':
     host = '0.0.0.0' if os.environ.get('IN_DOCKER') else 'localhost'
     
     logger.info(f"Starting Flask application on {host}:{port} (debug={debug})")
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    app.run(host=host, port=port, debug=debug, threaded=True)
\ No newline at end of file
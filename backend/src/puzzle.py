@@ -4,8 +4,22 @@ import random
 import time
 import os
 import json
+import shutil
+import tempfile
 from datetime import datetime
 import logging
+import threading
+from array import array
+from puzzle_graph import PuzzleGraph
+from puzzle_store import PuzzleStore
+from trail_solver import ValueMultigraph, TrailSearch, solve_eulerian
+from graph_reduction import forced_run_heads, solve_reduced
+from anytime_solver import solve_anytime
+from chain_enumerator import longest_chains
+from chain_counter import count_longest_chains
+from chain_export import chunked, iter_json_document, iter_path_text, path_entries
+from chain_validator import validate_chain, validation_errors
+from incremental_chain import IncrementalChain
 
 # Configure logging
 log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
@@ -20,27 +34,63 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class Puzzle:
-    _puzzles = []
-    _next_id = 0
+    """A single puzzle piece
 
-    def __init__(self, puzzle_number):
-        """Initialize a puzzle with validation"""
+    Pieces are thin views over a PuzzleStore: an instance only holds its ID
+    and a reference to the store, and reads its values from the store columns.
+
+    Loaded pieces belong to a PuzzleSession. The collection classmethods act
+    on the default session; pass session= to work on another one.
+    """
+
+    __slots__ = ("id", "store")
+
+    _session = None
+
+    # Available solver modes for find_longest_chain
+    SEARCH_MODES = ("dfs", "euler", "exact", "anytime")
+
+    def __init__(self, puzzle_number, store=None):
+        """Initialize a puzzle with validation, storing it in the default session's store"""
         try:
             if not isinstance(puzzle_number, str) or len(puzzle_number) != 6 or not puzzle_number.isdigit():
                 raise ValueError(f"Puzzle number must be a 6-digit string, got: '{puzzle_number}'")
             
-            self.id = Puzzle._next_id
-            Puzzle._next_id += 1
-            
-            self.puzzle_number = puzzle_number
-            self.puzzle_sides = {
-                "takes": puzzle_number[:2],
-                "gives": puzzle_number[4:]
-            }
+            self.store = store if store is not None else Puzzle._session.store
+            self.id = self.store.append_number(puzzle_number)
         except Exception as e:
             logger.error(f"Error creating puzzle: {e}")
             raise
 
+    @classmethod
+    def view(cls, store, puzzle_id):
+        """Create a puzzle view over an already stored piece"""
+        puzzle = object.__new__(cls)
+        puzzle.store = store
+        puzzle.id = puzzle_id
+        return puzzle
+
+    @property
+    def takes(self):
+        """Takes value as an integer"""
+        return self.store.takes[self.id]
+
+    @property
+    def gives(self):
+        """Gives value as an integer"""
+        return self.store.gives[self.id]
+
+    @property
+    def puzzle_number(self):
+        return self.store.number(self.id)
+
+    @property
+    def puzzle_sides(self):
+        return {
+            "takes": f"{self.store.takes[self.id]:02d}",
+            "gives": f"{self.store.gives[self.id]:02d}"
+        }
+
     def get_puzzle_info(self):
         """Get puzzle information as a dictionary"""
         return {
@@ -51,46 +101,127 @@ class Puzzle:
 
     @classmethod
     def reset(cls):
-        """Reset the puzzle collection and ID counter"""
-        cls._puzzles = []
-        cls._next_id = 0
+        """Replace the default session with an empty one"""
+        cls._session = PuzzleSession()
         logger.info("Puzzle collection and ID counter reset")
 
+    @classmethod
+    def get_session(cls):
+        """The default session used by the collection classmethods"""
+        return cls._session
+
+    @classmethod
+    def use_session(cls, session):
+        """Make session the default session"""
+        cls._session = session
+
     @classmethod
     def add_puzzle_direct(cls, puzzle_number):
         """Add a puzzle directly to the collection"""
-        try:
-            puzzle = cls(puzzle_number)
-            cls._puzzles.append(puzzle)
-            return puzzle
-        except ValueError as e:
-            logger.error(f"Failed to add puzzle: {e}")
-            return None
+        return cls._session.add_puzzle(puzzle_number)
         
     @classmethod
     def get_all_puzzles(cls):
         """Get all puzzles in the collection"""
-        return cls._puzzles
+        return cls._session.puzzles
+
+    @classmethod
+    def get_puzzle(cls, puzzle_id):
+        """Get a puzzle in the collection by ID in O(1), or None"""
+        return cls._session.get_puzzle(puzzle_id)
+
+    @classmethod
+    def get_graph(cls):
+        """Get the value-bucket connection graph for the collection"""
+        return cls._session.graph
     
     @classmethod
-    def find_longest_chain(cls, timeout_seconds=600, export_paths=True):
-        """Find longest chain - optimized to find maximum depth first, then a single path"""
-        puzzles = cls.get_all_puzzles()
-        if not puzzles:
+    def find_longest_chain(cls, timeout_seconds=600, export_paths=True, mode="dfs", workers=1, seed=None,
+                           session=None):
+        """Find longest chain and return it as a list of puzzle IDs"""
+        return cls.solve_longest_chain(timeout_seconds, export_paths, mode, workers, seed, session=session)["chain"]
+
+    @classmethod
+    def iter_longest_chains(cls, limit=None, slack=0, timeout_seconds=60, session=None):
+        """Lazily yield every distinct longest chain as a list of puzzle IDs
+
+        Chains differing only by swapping pieces with identical takes/gives
+        values are yielded once. slack also yields maximal chains up to that
+        many pieces shorter; limit caps the number of chains.
+        """
+        if session is None:
+            session = cls._session
+        multigraph = ValueMultigraph.from_puzzle_graph(session.graph)
+        return longest_chains(multigraph, limit, slack, timeout_seconds)
+
+    @classmethod
+    def count_longest_chains(cls, timeout_seconds=0.5, session=None):
+        """Count the distinct longest chains without enumerating them
+
+        Exact for Eulerian components and small searches, bounded otherwise;
+        see chain_counter.count_longest_chains for the returned dict.
+        """
+        if session is None:
+            session = cls._session
+        return count_longest_chains(ValueMultigraph.from_puzzle_graph(session.graph), timeout_seconds)
+
+    @classmethod
+    def solve_longest_chain(cls, timeout_seconds=600, export_paths=True, mode="dfs", workers=1, seed=None,
+                            progress_callback=None, stop_event=None, session=None):
+        """Find longest chain with the given solver mode
+
+        Returns a dict with the chain of puzzle IDs, whether it is proven
+        optimal, the operation count and the search time. The exact mode
+        splits its start values across `workers` processes; `seed` shuffles
+        the start order reproducibly. The anytime mode improves a greedy
+        chain by local search until the timeout, seeded by `seed`.
+
+        progress_callback(event, data) receives "progress" snapshots and
+        "best" events for every longer chain; setting stop_event ends the
+        search early with the best chain found so far. The search runs on
+        session, or the default session if none is given.
+        """
+        if mode not in cls.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: '{mode}', expected one of {', '.join(cls.SEARCH_MODES)}")
+        if session is None:
+            session = cls._session
+
+        if not session.puzzles:
             logger.warning("No puzzles to process")
-            return []
+            return {"chain": [], "optimal": True, "operations": 0, "search_time_seconds": 0.0, "mode": mode}
+
+        logger.info(f"Searching for longest chain using '{mode}' mode")
+        if mode == "euler":
+            result = cls._search_euler(session, timeout_seconds, progress_callback, stop_event)
+        elif mode == "anytime":
+            multigraph = ValueMultigraph.from_puzzle_graph(session.graph)
+            result = solve_anytime(multigraph, timeout_seconds, seed=seed,
+                                   progress_callback=progress_callback, stop_event=stop_event)
+        elif mode == "exact":
+            multigraph = ValueMultigraph.from_puzzle_graph(session.graph)
+            result = solve_reduced(multigraph, timeout_seconds, workers=workers, seed=seed,
+                                   progress_callback=progress_callback, stop_event=stop_event)
+        else:
+            result = cls._search_dfs(session, timeout_seconds, progress_callback, stop_event)
+        result["mode"] = mode
 
-        # Build graph of puzzle connections
-        logger.info("Building puzzle connection graph...")
-        graph = {p.id: [] for p in puzzles}
+        if export_paths and result["chain"]:
+            json_filepath = cls._export_longest_chain(session, result["chain"], result["search_time_seconds"],
+                                                      result["operations"])
+            if json_filepath:
+                logger.info(f"Results exported to: {json_filepath}")
+
+        return result
+
+    @classmethod
+    def _search_dfs(cls, session, timeout_seconds, progress_callback=None, stop_event=None):
+        """Find longest chain - optimized to find maximum depth first, then a single path"""
+        puzzles = session.puzzles
 
-        # Add connections based on gives->takes matching
-        connection_count = 0
-        for p1 in puzzles:
-            for p2 in puzzles:
-                if p1.id != p2.id and p1.puzzle_sides['gives'] == p2.puzzle_sides['takes']:
-                    graph[p1.id].append(p2.id)
-                    connection_count += 1
+        # Build graph of puzzle connections from the value-bucket index
+        logger.info("Building puzzle connection graph...")
+        graph = session.graph.to_adjacency()
+        connection_count = sum(len(neighbors) for neighbors in graph.values())
 
         # Set up tracking variables
         start_time = time.time()
@@ -134,76 +265,135 @@ class Puzzle:
         # Implement memoization to avoid recomputing paths
         memo = {}
 
+        # Successor lists are sorted once up front instead of on every step
+        successors = {node: sorted(neighbors) for node, neighbors in graph.items()}
+
+        # Single mutable path with an O(1) membership bitmap; the search
+        # extends and backtracks it in place instead of copying it per step
+        in_path = bytearray(max(graph) + 1)
+        path = []
+        perfect_found = False
+
+        # A chain never leaves the weak component of the value multigraph it
+        # starts in, so start nodes are taken component by component, best
+        # bound first, until no remaining component can beat the best chain.
+        # Pieces inside forced runs are never better starts than their run's head.
+        bounds = TrailSearch(ValueMultigraph.from_puzzle_graph(session.graph)).component_bounds()
+        takes = session.graph.takes
+        start_nodes = sorted(forced_run_heads(session.graph), key=lambda node: -bounds[takes[node]])
+        upper_bound = max(bounds)
+
         # Attempt to find longest path from each starting node
-        for start_node in graph:
+        for start_node in start_nodes:
+            if perfect_found:
+                break
+            if bounds[takes[start_node]] <= max_path_length:
+                logger.info(f"No remaining component can beat {max_path_length} puzzles")
+                break
             if time.time() - start_time >= timeout_seconds:
                 logger.info(f"Timeout reached after {timeout_seconds:.2f} seconds")
                 break
+            if stop_event is not None and stop_event.is_set():
+                logger.info("Search stopped on request")
+                break
 
             processed_nodes += 1
 
-            # Use stack-based iterative DFS with cycle detection
-            stack = [(start_node, [start_node])]
+            # Iterative DFS: one successor iterator per node on the path
             visited = set()
+            iterators = []
+            pending = start_node
+
+            while pending is not None:
+                current = pending
+                pending = None
+                depth = len(path) + 1
 
-            while stack and time.time() - start_time < timeout_seconds:     
-                current, path = stack.pop()
-                
                 # Skip if we've seen this node in a better context
-                if current in visited and len(path) <= memo.get(current, 0):
-                    continue
-                
-                visited.add(current)
-                memo[current] = max(memo.get(current, 0), len(path))
-
-                operation_count += 1
-                current_time = time.time()
-
-                # Log progress every 5 seconds only
-                if current_time - last_update_time > 5:
-                    elapsed = current_time - start_time
-                    ops_per_second = operation_count / elapsed if elapsed > 0 else 0
-
-                    # Track ops rate history for smoothing
-                    ops_history.append(ops_per_second)
-                    if len(ops_history) > 5:
-                        ops_history.pop(0)
-
-                    # Calculate average rate
-                    avg_ops_per_second = sum(ops_history) / len(ops_history) if ops_history else ops_per_second
-
-                    # Progress info
-                    logger.info(f"Operations: {operation_count:,}")
-                    logger.info(f"Performance: {avg_ops_per_second:,.0f} ops/sec")
-                    logger.info(f"Best chain length: {max_path_length} puzzles (found {max_length_count} times)")
-                    logger.info(f"Time: {elapsed:.1f}s elapsed, {elapsed/timeout_seconds*100:.1f}% of timeout used")
-                    logger.info(f"Processed {processed_nodes}/{len(graph)} starting nodes")
-                    logger.info("")  # Add new line for readability
-
-                    last_update_time = current_time
-
-                # Update max path length if we found a longer path
-                if len(path) > max_path_length:
-                    max_path_length = len(path)
-                    max_path = path.copy()  # Store this path for reference 
-                    max_length_count = 1  # Reset counter when we find a longer path
-                elif len(path) == max_path_length:
-                    max_length_count += 1  # Increment for paths of same max length
-
-                # Optimization: Early termination if we found a perfect chain
-                if max_path_length == len(puzzles):
-                    logger.info("Perfect chain found! Ending search early.")
-                    break
-
-                # Push unvisited neighbors to stack in reverse order (to simulate DFS)
-                for neighbor in sorted(graph[current], reverse=True):
-                    if neighbor not in path:  # Avoid cycles
-                        # Skip if this path won't beat our current max
-                        remaining_nodes = len(puzzles) - len(path)
-                        if len(path) + remaining_nodes <= max_path_length:
-                            continue
-                            
-                        stack.append((neighbor, path + [neighbor]))
+                if not (current in visited and depth <= memo.get(current, 0)):
+                    visited.add(current)
+                    memo[current] = max(memo.get(current, 0), depth)
+
+                    operation_count += 1
+                    current_time = time.time()
+                    if current_time - start_time >= timeout_seconds:
+                        break
+                    if stop_event is not None and stop_event.is_set():
+                        break
+
+                    # Log progress every 5 seconds only
+                    if current_time - last_update_time > 5:
+                        elapsed = current_time - start_time
+                        ops_per_second = operation_count / elapsed if elapsed > 0 else 0
+
+                        # Track ops rate history for smoothing
+                        ops_history.append(ops_per_second)
+                        if len(ops_history) > 5:
+                            ops_history.pop(0)
+
+                        # Calculate average rate
+                        avg_ops_per_second = sum(ops_history) / len(ops_history) if ops_history else ops_per_second
+
+                        # Progress info
+                        logger.info(f"Operations: {operation_count:,}")
+                        logger.info(f"Performance: {avg_ops_per_second:,.0f} ops/sec")
+                        logger.info(f"Best chain length: {max_path_length} puzzles (found {max_length_count} times)")
+                        logger.info(f"Time: {elapsed:.1f}s elapsed, {elapsed/timeout_seconds*100:.1f}% of timeout used")
+                        logger.info(f"Processed {processed_nodes}/{len(start_nodes)} starting nodes")
+                        logger.info("")  # Add new line for readability
+
+                        if progress_callback is not None:
+                            progress_callback("progress", {
+                                "operations": operation_count,
+                                "ops_per_second": avg_ops_per_second,
+                                "best_length": max_path_length,
+                                "elapsed_seconds": elapsed,
+                                "processed_starts": processed_nodes,
+                                "total_starts": len(start_nodes)
+                            })
+
+                        last_update_time = current_time
+
+                    path.append(current)
+                    in_path[current] = 1
+
+                    # Update max path length if we found a longer path
+                    if depth > max_path_length:
+                        max_path_length = depth
+                        max_path = path.copy()  # Store this path for reference
+                        max_length_count = 1  # Reset counter when we find a longer path
+                        if progress_callback is not None:
+                            progress_callback("best", {
+                                "best_length": max_path_length,
+                                "chain": max_path,
+                                "elapsed_seconds": current_time - start_time
+                            })
+                    elif depth == max_path_length:
+                        max_length_count += 1  # Increment for paths of same max length
+
+                    # Optimization: Early termination if we found a perfect chain
+                    if max_path_length >= upper_bound:
+                        logger.info("Chain reaches the upper bound! Ending search early.")
+                        perfect_found = True
+                        break
+
+                    iterators.append(iter(successors[current]))
+
+                # Advance to the next unvisited successor, backtracking as needed
+                while iterators:
+                    for neighbor in iterators[-1]:
+                        if not in_path[neighbor]:  # Avoid cycles
+                            pending = neighbor
+                            break
+                    if pending is not None:
+                        break
+                    iterators.pop()
+                    in_path[path.pop()] = 0
+
+            # Unwind whatever is left of the path before the next start node
+            for node in path:
+                in_path[node] = 0
+            path.clear()
 
         # Final report for Phase 1
         total_time = time.time() - start_time
@@ -222,50 +412,77 @@ class Puzzle:
             logger.info("\n==== PHASE 2: Verifying chain ====")
 
             # Verify chain connections
-            is_valid = True
-            for i in range(len(max_path) - 1):
-                p1 = next((p for p in puzzles if p.id == max_path[i]), None)
-                p2 = next((p for p in puzzles if p.id == max_path[i+1]), None)
-                
-                if not p1 or not p2:
-                    logger.error(f"Invalid puzzle reference at position {i}")
-                    is_valid = False
-                    break
-                    
-                if p1.puzzle_sides['gives'] != p2.puzzle_sides['takes']:    
-                    logger.error(f"Invalid connection at position {i}: {p1.puzzle_number} gives {p1.puzzle_sides['gives']} but {p2.puzzle_number} takes {p2.puzzle_sides['takes']}")
-                    is_valid = False
+            validation = validate_chain(session.graph, max_path)
+            for message in validation_errors(validation):
+                logger.error(message)
+            is_valid = validation["valid"]
 
             if is_valid:
                 logger.info("Chain is valid! All connections verified.")
             else:
                 logger.warning("Chain has invalid connections! Attempting to find a valid chain...")
 
-        # Export the single result to JSON
+        logger.info(f"\nSearch complete after {total_time:.2f} seconds")
+        logger.info(f"Processed {processed_nodes}/{len(start_nodes)} starting nodes")
+        logger.info(f"Total operations: {operation_count:,}")
+        logger.info(f"Found longest chain with {max_path_length} puzzles (found {max_length_count} times)")
+
+        if C > 1 and N * (C ** min(D, 30)) <= 100_000_000:
+            logger.info(f"Formula used: N*(C^min(D,30)) = {N}*({C:.2f}^{min(D,30)}) = {estimated_max_ops:,}")
+        
+        return {
+            "chain": max_path,
+            "optimal": max_path_length >= upper_bound,
+            "operations": operation_count,
+            "search_time_seconds": total_time
+        }
+
+    @classmethod
+    def _search_euler(cls, session, timeout_seconds, progress_callback=None, stop_event=None):
+        """Solve on the value multigraph, falling back to DFS when no Eulerian trail is optimal"""
+        multigraph = ValueMultigraph.from_puzzle_graph(session.graph)
+        logger.info(f"Built value multigraph with {multigraph.edge_count} edges")
+
+        result = solve_eulerian(multigraph)
+        if progress_callback is not None and result["chain"]:
+            progress_callback("best", {
+                "best_length": len(result["chain"]),
+                "chain": result["chain"],
+                "elapsed_seconds": result["search_time_seconds"]
+            })
+        if result["optimal"]:
+            logger.info(f"Eulerian trail of {len(result['chain'])} puzzles is optimal "
+                        f"(found in {result['search_time_seconds']:.4f} seconds)")
+            result["operations"] = len(result["chain"])
+            return result
+
+        logger.info(f"No optimal Eulerian trail (best {len(result['chain'])}, "
+                    f"upper bound {result['upper_bound']}), falling back to DFS search")
+        remaining = max(timeout_seconds - result["search_time_seconds"], 0)
+        dfs_result = cls._search_dfs(session, remaining, progress_callback, stop_event)
+        if len(dfs_result["chain"]) > len(result["chain"]):
+            dfs_result["upper_bound"] = result["upper_bound"]
+            dfs_result["optimal"] = len(dfs_result["chain"]) == result["upper_bound"]
+            return dfs_result
+
+        result["operations"] = dfs_result["operations"]
+        result["search_time_seconds"] += dfs_result["search_time_seconds"]
+        return result
+
+    @classmethod
+    def _export_longest_chain(cls, session, max_path, total_time, operation_count):
+        """Export a search result to a timestamped JSON file, written as it is rendered"""
+        max_path_length = len(max_path)
         json_filepath = None
-        if export_paths and max_path_length > 0:
+        if max_path_length > 0:
             try:
-                result_data = {
+                fields = {
                     "timestamp": time.strftime("%Y%m%d_%H%M%S"),
                     "search_time_seconds": total_time,
                     "operations": operation_count,
-                    "max_path_length": max_path_length,
-                    "path": []
+                    "max_path_length": max_path_length
                 }
 
-                # Add path details if we have one
-                if max_path:
-                    for i, node_id in enumerate(max_path):
-                        p = next((p for p in puzzles if p.id == node_id), None)
-                        if p:
-                            result_data["path"].append({
-                                "position": i,
-                                "id": p.id,
-                                "number": p.puzzle_number,
-                                "takes": p.puzzle_sides['takes'],
-                                "gives": p.puzzle_sides['gives']
-                            })
-
                 # Create export directory if it doesn't exist
                 export_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
                 os.makedirs(export_dir, exist_ok=True)
@@ -276,29 +493,21 @@ class Puzzle:
                 json_filepath = os.path.join(export_dir, json_filename)
 
                 with open(json_filepath, 'w') as f:
-                    json.dump(result_data, f, indent=2)
+                    f.writelines(chunked(iter_json_document(fields, "path",
+                                                            path_entries(max_path, session.get_puzzle))))
 
                 logger.info(f"\nExported result to: {json_filepath}")
             except Exception as e:
                 logger.error(f"Error exporting results: {e}")
 
-        logger.info(f"\nSearch complete after {total_time:.2f} seconds")
-        logger.info(f"Processed {processed_nodes}/{len(graph)} starting nodes")
-        logger.info(f"Total operations: {operation_count:,}")
-        logger.info(f"Found longest chain with {max_path_length} puzzles (found {max_length_count} times)")
-
-        if export_paths and json_filepath:
-            logger.info(f"Results exported to: {json_filepath}")
-
-        if C > 1 and N * (C ** min(D, 30)) <= 100_000_000:
-            logger.info(f"Formula used: N*(C^min(D,30)) = {N}*({C:.2f}^{min(D,30)}) = {estimated_max_ops:,}")
-        
-        return max_path
+        return json_filepath
 
     @classmethod
     def export_path(cls, path, puzzles, first_found=False):
-        """Export a single path to a text file"""
+        """Export a single path to a text file, written as it is rendered"""
         try:
+            lookup = puzzle_lookup(puzzles)
+
             # Create export directory if it doesn't exist
             export_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
             os.makedirs(export_dir, exist_ok=True)
@@ -311,14 +520,7 @@ class Puzzle:
 
             # Write path to file
             with open(filepath, 'w') as f:
-                f.write(f"Path length: {len(path)} puzzles\n")
-                f.write("----------------------------\n")
-                for i, node_id in enumerate(path):
-                    p = next((p for p in puzzles if p.id == node_id), None)
-                    if not p:
-                        f.write(f"{i+1}. ERROR: Puzzle with ID {node_id} not found\n")
-                        continue
-                    f.write(f"{i+1}. Puzzle #{p.puzzle_number} - Takes: {p.puzzle_sides['takes']}, Gives: {p.puzzle_sides['gives']}\n")
+                f.writelines(chunked(iter_path_text(path, lookup)))
 
             logger.info(f"Exported path to {filepath}")
             return filepath
@@ -328,8 +530,15 @@ class Puzzle:
 
     @classmethod
     def export_all_paths(cls, paths, puzzles):
-        """Export all longest paths to JSON and summary TXT"""
+        """Export all longest paths to JSON and summary TXT
+
+        paths may be any iterable, such as iter_longest_chains(). The paths
+        are spooled to temporary files as they arrive, so they are never all
+        in memory, and copied in behind the totals once they are counted.
+        """
         try:
+            lookup = puzzle_lookup(puzzles)
+
             # Create export directory if it doesn't exist
             export_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
             os.makedirs(export_dir, exist_ok=True)
@@ -341,20 +550,10 @@ class Puzzle:
             json_filepath = os.path.join(export_dir, json_filename)
             txt_filepath = os.path.join(export_dir, txt_filename)
 
-            # Prepare data for JSON
-            path_data = {
-                "timestamp": timestamp,
-                "total_paths": len(paths),
-                "path_length": len(paths[0]) if paths else 0,
-                "paths": []
-            }
-
-            # Write TXT file with just the paths
-            with open(txt_filepath, 'w') as f:
-                f.write(f"All longest paths - {len(paths)} paths of {len(paths[0]) if paths else 0} puzzles each\n")
-                f.write("======================================================\n\n")
-
-                # Process each path
+            total_paths = 0
+            path_length = None
+            with tempfile.TemporaryFile('w+') as json_spool, tempfile.TemporaryFile('w+') as f:
+                # One path per spooled JSON line
                 for path_index, path in enumerate(paths):
                     path_info = {
                         "path_index": path_index,
@@ -366,29 +565,41 @@ class Puzzle:
 
                     # Process each puzzle in the path
                     for i, node_id in enumerate(path):
-                        p = next((p for p in puzzles if p.id == node_id), None)
+                        p = lookup(node_id)
                         if not p:
                             f.write(f"{i+1}. ERROR: Puzzle with ID {node_id} not found\n")
                             continue
-                            
-                        puzzle_info = {
+
+                        path_info["puzzles"].append({
                             "position": i,
                             "id": p.id,
                             "number": p.puzzle_number,
                             "takes": p.puzzle_sides['takes'],
                             "gives": p.puzzle_sides['gives']
-                        }
-                        path_info["puzzles"].append(puzzle_info)
-
-                        # Add to text file
+                        })
                         f.write(f"{i+1}. #{p.puzzle_number} - Takes: {p.puzzle_sides['takes']}, Gives: {p.puzzle_sides['gives']}\n")
 
-                    path_data["paths"].append(path_info)
                     f.write("\n\n")
-            
-            # Write JSON file with complete info
-            with open(json_filepath, 'w') as f:
-                json.dump(path_data, f, indent=2)
+                    json_spool.write(json.dumps(path_info) + "\n")
+                    total_paths += 1
+                    if path_length is None:
+                        path_length = len(path)
+                path_length = path_length or 0
+
+                with open(txt_filepath, 'w') as txt_file:
+                    txt_file.write(f"All longest paths - {total_paths} paths of {path_length} puzzles each\n")
+                    txt_file.write("======================================================\n\n")
+                    f.seek(0)
+                    shutil.copyfileobj(f, txt_file)
+
+                json_spool.seek(0)
+                path_data = {
+                    "timestamp": timestamp,
+                    "total_paths": total_paths,
+                    "path_length": path_length
+                }
+                with open(json_filepath, 'w') as json_file:
+                    json_file.writelines(chunked(iter_json_document(path_data, "paths", map(json.loads, json_spool))))
 
             logger.info(f"Exported all paths to:")
             logger.info(f"  - JSON: {json_filepath}")
@@ -400,18 +611,19 @@ class Puzzle:
             return (None, None)
 
     @classmethod
-    def debug_chain(cls, chain_ids):
+    def debug_chain(cls, chain_ids, session=None):
         """Print detailed information about a chain for debugging"""        
+        if session is None:
+            session = cls._session
         if not chain_ids:
             logger.warning("Empty chain, nothing to debug")
             return
 
-        puzzles = cls.get_all_puzzles()
         logger.info(f"\nDebug Chain ({len(chain_ids)} puzzles):")
         logger.info("-" * 50)
 
         for i, node_id in enumerate(chain_ids):
-            p = next((p for p in puzzles if p.id == node_id), None)
+            p = session.get_puzzle(node_id)
             if not p:
                 logger.error(f"ERROR: Puzzle with ID {node_id} not found!")        
                 continue
@@ -422,7 +634,7 @@ class Puzzle:
             # Show connection to next puzzle
             if i < len(chain_ids) - 1:
                 next_id = chain_ids[i+1]
-                next_p = next((p for p in puzzles if p.id == next_id), None)
+                next_p = session.get_puzzle(next_id)
                 if next_p:
                     if p.puzzle_sides['gives'] == next_p.puzzle_sides['takes']:
                         logger.info(f"   ✓ Connects to next: {p.puzzle_sides['gives']} → {next_p.puzzle_sides['takes']}")
@@ -431,4 +643,149 @@ class Puzzle:
                 else:
                     logger.error(f"   ✗ Next puzzle with ID {next_id} not found!")
 
-            logger.info("-" * 50)
\ No newline at end of file
+            logger.info("-" * 50)
+
+
+class PuzzleCollection:
+    """Read-only sequence of the puzzles indexed by a PuzzleGraph
+
+    Puzzle views are created on access, so the collection itself costs only
+    the ID array kept by the graph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        return len(self.graph.members)
+
+    def __iter__(self):
+        store = self.graph.store
+        for puzzle_id in self.graph.members:
+            yield Puzzle.view(store, puzzle_id)
+
+    def get(self, puzzle_id, default=None):
+        """Puzzle with the given ID, or default if it is not in the collection"""
+        if puzzle_id in self.graph:
+            return Puzzle.view(self.graph.store, puzzle_id)
+        return default
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Puzzle.view(self.graph.store, puzzle_id) for puzzle_id in self.graph.members[index]]
+        return Puzzle.view(self.graph.store, self.graph.members[index])
+
+
+def puzzle_lookup(puzzles):
+    """O(1) ID -> puzzle lookup for a collection or any iterable of puzzles"""
+    if isinstance(puzzles, PuzzleCollection):
+        return puzzles.get
+    return {p.id: p for p in puzzles}.get
+
+
+class PuzzleSession:
+    """Workspace owning the store, graph and collection of one loaded dataset
+
+    Sessions share no state, so several datasets can stay loaded at once and
+    be solved concurrently. Pieces are only ever appended to the store, under
+    the session lock, so searches can read a session while it is in use
+    elsewhere; a removed piece is only dropped from the graph.
+    """
+
+    def __init__(self, dataset_id=None):
+        self.dataset_id = dataset_id
+        self.store = PuzzleStore()
+        self.graph = PuzzleGraph(self.store)
+        self.puzzles = PuzzleCollection(self.graph)
+        self._lock = threading.Lock()
+        self._incremental = None
+
+    def __len__(self):
+        return len(self.graph)
+
+    def add_puzzle(self, puzzle_number):
+        """Validate and add a puzzle; returns its view, or None if it is invalid"""
+        try:
+            with self._lock:
+                puzzle = Puzzle(puzzle_number, self.store)
+                self.graph.add(puzzle.id)
+        except ValueError as e:
+            logger.error(f"Failed to add puzzle: {e}")
+            return None
+        if self._incremental is not None:
+            self._incremental.added(puzzle.id)
+        return puzzle
+
+    def remove_puzzle(self, puzzle_id):
+        """Remove a puzzle from the session; returns its view, or None if it is not in the session"""
+        with self._lock:
+            if not self.graph.remove(puzzle_id):
+                return None
+        if self._incremental is not None:
+            self._incremental.removed(puzzle_id, self.store.takes[puzzle_id], self.store.gives[puzzle_id])
+        return Puzzle.view(self.store, puzzle_id)
+
+    def incremental_chain(self, timeout_seconds=10):
+        """IncrementalChain following this session's additions and removals, created on first use"""
+        with self._lock:
+            if self._incremental is None:
+                self._incremental = IncrementalChain(self.graph, timeout_seconds, graph_lock=self._lock)
+            return self._incremental
+
+    def add_columns(self, takes, middle, gives, bucket_index=None, content_hash=None):
+        """Add many already validated pieces given as byte columns; returns how many were added
+
+        bucket_index and content_hash may carry precomputed values for the
+        pieces, and are only used when the session is empty.
+        """
+        with self._lock:
+            first_id = self.store.extend(takes, middle, gives)
+            self.graph.add_range(first_id, len(self.store), bucket_index, content_hash)
+        if self._incremental is not None:
+            self._incremental.invalidate()
+        return len(takes)
+
+    def snapshot(self):
+        """The session's pieces as picklable columns and member IDs, to rebuild it in another process"""
+        with self._lock:
+            return (bytes(self.store.takes), bytes(self.store.middle), bytes(self.store.gives),
+                    array('I', self.graph.nodes()))
+
+    @classmethod
+    def from_snapshot(cls, snapshot, dataset_id=None):
+        """A session holding the pieces of snapshot() under the same puzzle IDs"""
+        takes, middle, gives, members = snapshot
+        session = cls(dataset_id)
+        session.store.extend(takes, middle, gives)
+        if members == array('I', range(len(takes))):
+            session.graph.add_range(0, len(takes))
+        else:
+            # Removed pieces stay in the store but not in the graph
+            for puzzle_id in members:
+                session.graph.add(puzzle_id)
+        return session
+
+    def get_puzzle(self, puzzle_id):
+        """Puzzle in the session by ID in O(1), or None"""
+        return self.puzzles.get(puzzle_id)
+
+    def solve_longest_chain(self, timeout_seconds=600, export_paths=True, mode="dfs", workers=1, seed=None,
+                            progress_callback=None, stop_event=None):
+        """Puzzle.solve_longest_chain on this session"""
+        return Puzzle.solve_longest_chain(timeout_seconds, export_paths, mode, workers, seed,
+                                          progress_callback, stop_event, session=self)
+
+    def find_longest_chain(self, timeout_seconds=600, export_paths=True, mode="dfs", workers=1, seed=None):
+        """Puzzle.find_longest_chain on this session"""
+        return self.solve_longest_chain(timeout_seconds, export_paths, mode, workers, seed)["chain"]
+
+    def iter_longest_chains(self, limit=None, slack=0, timeout_seconds=60):
+        """Puzzle.iter_longest_chains on this session"""
+        return Puzzle.iter_longest_chains(limit, slack, timeout_seconds, session=self)
+
+    def count_longest_chains(self, timeout_seconds=0.5):
+        """Puzzle.count_longest_chains on this session"""
+        return Puzzle.count_longest_chains(timeout_seconds, session=self)
+
+
+Puzzle._session = PuzzleSession()
@@ -0,0 +1,212 @@
+# backend/src/puzzle_graph.py
+import hashlib
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Every side of a puzzle is a two-digit value, so there are exactly 100 buckets
+VALUE_COUNT = 100
+
+
+def content_hash_of(store, puzzle_ids):
+    """SHA-256 of the multiset of puzzle numbers, independent of their order"""
+    numbers = array('I', sorted(
+        store.takes[i] * 10000 + store.middle[i] * 100 + store.gives[i] for i in puzzle_ids
+    ))
+    return hashlib.sha256(numbers.tobytes()).hexdigest()
+
+
+class PuzzleGraph:
+    """Puzzle connection graph backed by a value-bucket index
+
+    Instead of comparing every pair of puzzles, each puzzle ID is filed under
+    the two-digit value it takes. The successors of a puzzle are then simply
+    the bucket of its gives value, so building the graph costs O(N + E).
+
+    The takes/gives values are read straight from the PuzzleStore columns.
+    Puzzles are filed into their buckets on the first query after they were
+    added, so bulk loads do not pay for the index until it is used.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._takes_buckets = [array('I') for _ in range(VALUE_COUNT)]
+        # Number of members already filed into _takes_buckets
+        self._indexed = 0
+        self._index_lock = threading.Lock()
+        self.members = array('I')
+        self._present = bytearray()
+        # Position of each puzzle ID in members and in its takes bucket, so
+        # removal is O(1); only kept from the first removal on
+        self._member_positions = None
+        self._bucket_positions = None
+        self._content_hash = None
+
+    @property
+    def takes(self):
+        """Takes column of the store"""
+        return self.store.takes
+
+    @property
+    def gives(self):
+        """Gives column of the store"""
+        return self.store.gives
+
+    @property
+    def takes_buckets(self):
+        """Puzzle IDs filed by takes value"""
+        if self._indexed < len(self.members):
+            with self._index_lock:
+                self._file_pending()
+        return self._takes_buckets
+
+    def _file_pending(self):
+        """File the members added since the last query into their buckets; needs _index_lock"""
+        buckets = self._takes_buckets
+        takes = self.takes
+        pending = self.members[self._indexed:]
+        if self._bucket_positions is None:
+            for puzzle_id in pending:
+                buckets[takes[puzzle_id]].append(puzzle_id)
+        else:
+            bucket_positions = self._bucket_positions
+            for puzzle_id in pending:
+                bucket = buckets[takes[puzzle_id]]
+                bucket_positions[puzzle_id] = len(bucket)
+                bucket.append(puzzle_id)
+        self._indexed += len(pending)
+
+    def _grow_present(self, size):
+        """Make room for puzzle IDs below size in _present and the position maps"""
+        if size <= len(self._present):
+            return
+        extra = size - len(self._present)
+        self._present.extend(bytes(extra))
+        if self._member_positions is not None:
+            self._member_positions.frombytes(bytes(4 * extra))
+            self._bucket_positions.frombytes(bytes(4 * extra))
+
+    def _track_positions(self):
+        """Build the position maps from members and the filed buckets; needs _index_lock"""
+        size = len(self._present)
+        self._member_positions = member_positions = array('I', bytes(4 * size))
+        self._bucket_positions = bucket_positions = array('I', bytes(4 * size))
+        for position, puzzle_id in enumerate(self.members):
+            member_positions[puzzle_id] = position
+        for bucket in self._takes_buckets:
+            for position, puzzle_id in enumerate(bucket):
+                bucket_positions[puzzle_id] = position
+
+    def add(self, puzzle_id):
+        """Index a stored puzzle by its takes/gives values"""
+        self._grow_present(puzzle_id + 1)
+        if self._member_positions is not None:
+            self._member_positions[puzzle_id] = len(self.members)
+        self.members.append(puzzle_id)
+        self._present[puzzle_id] = 1
+        self._content_hash = None
+
+    def add_range(self, first_id, stop_id, bucket_index=None, content_hash=None):
+        """Index the stored puzzles with IDs first_id .. stop_id - 1
+
+        bucket_index is an optional precomputed (offsets, ids) index of these
+        puzzles, where ids[offsets[v]:offsets[v + 1]] take value v. It is
+        only used when the graph is still empty and the IDs start at 0.
+        content_hash is an optional precomputed content_hash() of these
+        puzzles, adopted only when the graph is still empty.
+        """
+        if stop_id <= first_id:
+            return
+        empty = not self.members
+        if empty:
+            # Nothing to keep positions of; they are built again on the next removal
+            self._member_positions = self._bucket_positions = None
+        if bucket_index is not None and first_id == 0 and empty:
+            offsets, ids = bucket_index
+            for value in range(VALUE_COUNT):
+                # Buckets must stay appendable, so each is copied once into its array
+                self._takes_buckets[value].frombytes(memoryview(ids[offsets[value]:offsets[value + 1]]).cast('B'))
+            self._indexed = stop_id - first_id
+        self._grow_present(stop_id)
+        if self._member_positions is not None:
+            self._member_positions[first_id:stop_id] = array('I', range(len(self.members),
+                                                                        len(self.members) + stop_id - first_id))
+        self.members.extend(range(first_id, stop_id))
+        self._present[first_id:stop_id] = b'\x01' * (stop_id - first_id)
+        self._content_hash = content_hash if empty else None
+
+    def remove(self, puzzle_id):
+        """Drop a puzzle from the index in O(1); returns False if it is not indexed
+
+        The last member and the last puzzle of its bucket move into the
+        removed puzzle's places. The puzzle stays in the store, so the IDs
+        of other puzzles do not change.
+        """
+        if puzzle_id not in self:
+            return False
+        with self._index_lock:
+            self._file_pending()
+            if self._member_positions is None:
+                self._track_positions()
+            member_positions, bucket_positions = self._member_positions, self._bucket_positions
+
+            bucket = self._takes_buckets[self.takes[puzzle_id]]
+            position, last = bucket_positions[puzzle_id], bucket.pop()
+            if last != puzzle_id:
+                bucket[position] = last
+                bucket_positions[last] = position
+
+            members = self.members
+            position, last = member_positions[puzzle_id], members.pop()
+            if last != puzzle_id:
+                members[position] = last
+                member_positions[last] = position
+            self._indexed -= 1
+            self._present[puzzle_id] = 0
+        self._content_hash = None
+        return True
+
+    def content_hash(self):
+        """SHA-256 of the multiset of puzzle numbers, independent of load order"""
+        if self._content_hash is None:
+            self._content_hash = content_hash_of(self.store, self.members)
+        return self._content_hash
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, puzzle_id):
+        return 0 <= puzzle_id < len(self._present) and self._present[puzzle_id] == 1
+
+    def membership(self, puzzle_ids):
+        """One byte per ID in puzzle_ids: 1 where the puzzle is in the graph, 0 where it is not"""
+        present = self._present
+        if puzzle_ids and (min(puzzle_ids) < 0 or max(puzzle_ids) >= len(present)):
+            return bytes(puzzle_id in self for puzzle_id in puzzle_ids)
+        return bytes(map(present.__getitem__, puzzle_ids))
+
+    def nodes(self):
+        """Puzzle IDs in insertion order, except where a removal moved the last one forward"""
+        return self.members
+
+    def neighbors(self, puzzle_id):
+        """IDs of puzzles whose takes value matches this puzzle's gives value"""
+        bucket = self.takes_buckets[self.gives[puzzle_id]]
+        return [n for n in bucket if n != puzzle_id]
+
+    def out_degree(self, puzzle_id):
+        """Number of puzzles that can follow this puzzle"""
+        gives = self.gives[puzzle_id]
+        bucket = self.takes_buckets[gives]
+        # A puzzle taking its own gives value sits in its own bucket
+        return len(bucket) - (1 if self.takes[puzzle_id] == gives else 0)
+
+    def connection_count(self):
+        """Total number of gives -> takes connections between distinct puzzles"""
+        return sum(self.out_degree(puzzle_id) for puzzle_id in self.members)
+
+    def to_adjacency(self):
+        """Materialize the graph as {puzzle_id: [successor ids]}"""
+        return {puzzle_id: self.neighbors(puzzle_id) for puzzle_id in self.members}
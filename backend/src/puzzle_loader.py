@@ -0,0 +1,225 @@
+# backend/src/puzzle_loader.py
+import os
+import re
+import sys
+import mmap
+import struct
+import zlib
+from array import array
+
+from puzzle_graph import VALUE_COUNT
+
+# Whitespace that str.strip() removes around a puzzle number
+PADDING = b' \t\f\v\x1c\x1d\x1e\x1f'
+
+# A line that is not a 6-digit puzzle number once its padding is stripped
+INVALID_LINE = re.compile(rb'^(?![ \t\f\v\x1c-\x1f]*\d{6}[ \t\f\v\x1c-\x1f]*\n).*\n', re.MULTILINE)
+
+# Translation tables turning an ASCII digit into its tens or ones value
+_TENS = bytes.maketrans(b'0123456789', bytes(range(0, 100, 10)))
+_ONES = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+
+def _normalize_newlines(data):
+    """Split lines like text mode does: \\r\\n and lone \\r become \\n"""
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    if data and not data.endswith(b'\n'):
+        data += b'\n'
+    return data
+
+
+def _column(digits, offset, count):
+    """Two-digit values at offset of every 6-digit record in digits
+
+    The tens and ones bytes are added as two big integers. No byte sum
+    exceeds 99, so there are no carries and the sum's bytes are the values.
+    """
+    tens = int.from_bytes(digits[offset::6].translate(_TENS), 'little')
+    ones = int.from_bytes(digits[offset + 1::6].translate(_ONES), 'little')
+    return (tens + ones).to_bytes(count, 'little')
+
+
+def parse_puzzle_bytes(data):
+    """Parse a puzzle file's bytes into takes, middle and gives byte columns
+
+    Returns (takes, middle, gives, skipped) where skipped counts the lines
+    that are blank or are not a 6-digit puzzle number after stripping
+    whitespace, as load_puzzles_from_file always has.
+    """
+    data = _normalize_newlines(data)
+    line_count = data.count(b'\n')
+
+    # Unless every line already is exactly six digits, drop the invalid lines
+    # and then the padding, which can only be left around valid numbers
+    if not (len(data) == 7 * line_count and data[6::7] == b'\n' * line_count
+            and not data.translate(None, b'0123456789\n')):
+        data = INVALID_LINE.sub(b'', data).translate(None, PADDING)
+
+    digits = data.replace(b'\n', b'')
+    count = len(digits) // 6
+    return (_column(digits, 0, count), _column(digits, 2, count), _column(digits, 4, count),
+            line_count - count)
+
+
+class PuzzleStreamParser:
+    """Incremental parse_puzzle_bytes for data arriving in chunks
+
+    Only whole lines are parsed; a trailing partial line is held back until
+    the next chunk completes it, so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self):
+        self._pending = b''
+        self.puzzle_count = 0
+        self.skipped = 0
+
+    def _parse(self, data):
+        takes, middle, gives, skipped = parse_puzzle_bytes(data)
+        self.puzzle_count += len(takes)
+        self.skipped += skipped
+        return takes, middle, gives
+
+    def feed(self, chunk):
+        """Parse the lines completed by chunk; returns their (takes, middle, gives) columns"""
+        data = self._pending + chunk
+        # A final \r may be the first half of a \r\n split across chunks
+        end = max(data.rfind(b'\n'), data.rfind(b'\r', 0, len(data) - 1)) + 1
+        self._pending = data[end:]
+        return self._parse(data[:end])
+
+    def finish(self):
+        """Parse the last, unterminated line, if any"""
+        data, self._pending = self._pending, b''
+        return self._parse(data)
+
+
+def read_puzzle_file(file_path):
+    """Read and parse a puzzle text file; returns parse_puzzle_bytes' result"""
+    with open(file_path, 'rb') as f:
+        return parse_puzzle_bytes(f.read())
+
+
+# Binary dataset format (.pzb), all integers little-endian:
+#   header   magic, version, flags, piece count, CRC-32 of everything after
+#            the header, SHA-256 content hash (see content_hash_of), padding
+#   columns  takes, middle and gives values, one byte per piece each
+#   index    (FLAG_BUCKET_INDEX) zero padding to a 4-byte boundary, 101
+#            uint32 bucket offsets and one uint32 puzzle ID per piece,
+#            grouped by takes value
+BINARY_MAGIC = b'PZB1'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHQI32s12x')
+FLAG_BUCKET_INDEX = 1
+# A column byte of 100 or more, which no two-digit side value can be
+OUT_OF_RANGE_VALUE = re.compile(rb'[\x64-\xff]')
+
+
+def _bucket_index(takes):
+    """(offsets, ids) arrays grouping puzzle IDs by takes value"""
+    counts = [takes.count(value) for value in range(VALUE_COUNT)]
+    offsets = array('I', [0] * (VALUE_COUNT + 1))
+    for value in range(VALUE_COUNT):
+        offsets[value + 1] = offsets[value] + counts[value]
+    ids = array('I', bytes(4 * len(takes)))
+    position = list(offsets[:VALUE_COUNT])
+    for puzzle_id, value in enumerate(takes):
+        ids[position[value]] = puzzle_id
+        position[value] += 1
+    return offsets, ids
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_binary_dataset(file_path, takes, middle, gives, content_hash, with_index=True):
+    """Write byte columns of puzzle values as a .pzb binary dataset
+
+    content_hash is the dataset's PuzzleGraph.content_hash(), stored so a
+    loader does not have to recompute it.
+    """
+    takes, middle, gives = bytes(takes), bytes(middle), bytes(gives)
+    count = len(takes)
+    body = [takes, middle, gives]
+    flags = 0
+    if with_index:
+        flags |= FLAG_BUCKET_INDEX
+        offsets, ids = _bucket_index(takes)
+        body.append(bytes(-3 * count % 4))
+        body.append(_little_endian(offsets))
+        body.append(_little_endian(ids))
+
+    crc = 0
+    for chunk in body:
+        crc = zlib.crc32(chunk, crc)
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags, count, crc,
+                                   bytes.fromhex(content_hash)))
+        for chunk in body:
+            f.write(chunk)
+    os.replace(tmp_path, file_path)
+
+
+def read_binary_dataset(file_path, verify=True):
+    """Memory-map a .pzb binary dataset
+
+    Returns (takes, middle, gives, bucket_index, content_hash). The columns
+    and the (offsets, ids) bucket index, or None if the file has none, are
+    read-only memoryviews of the mapping, so nothing is copied and processes
+    mapping the same file share its pages. Raises ValueError if the file is
+    malformed, holds a value of 100 or more or a bucket index entry out of
+    range, or, with verify, fails its checksum.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < BINARY_HEADER.size:
+            raise ValueError(f"Not a binary puzzle dataset: {file_path}")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    magic, version, flags, count, crc, digest = BINARY_HEADER.unpack_from(view)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"Not a binary puzzle dataset: {file_path}")
+
+    start = BINARY_HEADER.size
+    index_start = start + 3 * count + (-3 * count % 4)
+    expected = start + 3 * count
+    if flags & FLAG_BUCKET_INDEX:
+        expected = index_start + 4 * (VALUE_COUNT + 1) + 4 * count
+    if size != expected:
+        raise ValueError(f"Truncated binary puzzle dataset: {file_path}")
+    if verify and zlib.crc32(view[start:]) != crc:
+        raise ValueError(f"Checksum mismatch in binary puzzle dataset: {file_path}")
+
+    if OUT_OF_RANGE_VALUE.search(view, start, start + 3 * count):
+        raise ValueError(f"Puzzle value out of range in binary puzzle dataset: {file_path}")
+    takes = view[start:start + count]
+    middle = view[start + count:start + 2 * count]
+    gives = view[start + 2 * count:start + 3 * count]
+
+    bucket_index = None
+    if flags & FLAG_BUCKET_INDEX:
+        offsets_end = index_start + 4 * (VALUE_COUNT + 1)
+        if sys.byteorder == 'little':
+            offsets = view[index_start:offsets_end].cast('I')
+            ids = view[offsets_end:].cast('I')
+        else:
+            offsets = array('I')
+            offsets.frombytes(view[index_start:offsets_end])
+            offsets.byteswap()
+            ids = array('I')
+            ids.frombytes(view[offsets_end:])
+            ids.byteswap()
+        if offsets[0] != 0 or offsets[VALUE_COUNT] != count \
+                or any(offsets[value] > offsets[value + 1] for value in range(VALUE_COUNT)) \
+                or (count and max(ids) >= count):
+            raise ValueError(f"Bucket index out of range in binary puzzle dataset: {file_path}")
+        bucket_index = (offsets, ids)
+
+    return takes, middle, gives, bucket_index, digest.hex()
@@ -0,0 +1,59 @@
+# backend/src/puzzle_store.py
+from array import array
+
+
+class PuzzleStore:
+    """Compact column storage for puzzle pieces
+
+    The takes, middle and gives values of every piece are kept as small
+    integers in parallel byte arrays indexed by puzzle ID, which costs three
+    bytes per piece instead of a dict and several strings.
+
+    An empty store can also adopt read-only byte buffers, such as memoryviews
+    of a memory-mapped dataset, without copying them. They are copied into
+    arrays only if more pieces are appended later.
+    """
+
+    def __init__(self):
+        self.takes = array('B')
+        self.middle = array('B')
+        self.gives = array('B')
+
+    def __len__(self):
+        return len(self.takes)
+
+    def _make_writable(self):
+        """Copy adopted read-only columns into arrays before appending"""
+        if not isinstance(self.takes, array):
+            self.takes = array('B', self.takes)
+            self.middle = array('B', self.middle)
+            self.gives = array('B', self.gives)
+
+    def append(self, takes, middle, gives):
+        """Store one piece and return its puzzle ID"""
+        self._make_writable()
+        self.takes.append(takes)
+        self.middle.append(middle)
+        self.gives.append(gives)
+        return len(self.takes) - 1
+
+    def extend(self, takes, middle, gives):
+        """Store many pieces given as equal-length byte columns; returns the first new ID"""
+        first_id = len(self.takes)
+        if first_id == 0 and isinstance(takes, memoryview):
+            # Adopt the buffers as they are
+            self.takes, self.middle, self.gives = takes, middle, gives
+            return first_id
+        self._make_writable()
+        self.takes.frombytes(takes)
+        self.middle.frombytes(middle)
+        self.gives.frombytes(gives)
+        return first_id
+
+    def append_number(self, puzzle_number):
+        """Store a piece given as a validated 6-digit string"""
+        return self.append(int(puzzle_number[:2]), int(puzzle_number[2:4]), int(puzzle_number[4:]))
+
+    def number(self, puzzle_id):
+        """The 6-digit puzzle number of a stored piece"""
+        return f"{self.takes[puzzle_id]:02d}{self.middle[puzzle_id]:02d}{self.gives[puzzle_id]:02d}"
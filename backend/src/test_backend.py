@@ -3,6 +3,7 @@ from puzzle import Puzzle
 from main import load_puzzles_from_file
 import os
 import tempfile
+import time
 
 @pytest.fixture
 def setup_puzzles():
@@ -28,6 +29,58 @@ def test_load_puzzles(setup_puzzles):
     finally:
         os.unlink(temp_path)
 
+def test_bulk_parse_matches_line_semantics():
+    from puzzle_loader import parse_puzzle_bytes
+    
+    data = b"123456\r\n  654321 \n\n12a456\n1234567\n99\n\t000001"
+    takes, middle, gives, skipped = parse_puzzle_bytes(data)
+    assert list(takes) == [12, 65, 0]
+    assert list(middle) == [34, 43, 0]
+    assert list(gives) == [56, 21, 1]
+    assert skipped == 4
+    
+    takes, _, gives, skipped = parse_puzzle_bytes(b"104211\n114212\n")
+    assert (list(takes), list(gives), skipped) == ([10, 11], [11, 12], 0)
+    assert parse_puzzle_bytes(b"")[3] == 0
+
+def test_binary_dataset_round_trip(setup_puzzles, tmp_path):
+    from puzzle import PuzzleSession
+    import zlib
+    from puzzle_loader import write_binary_dataset, read_binary_dataset, BINARY_HEADER
+    
+    source = PuzzleSession()
+    for puzzle in ["104211", "114212", "124213", "134210"]:
+        source.add_puzzle(puzzle)
+    store = source.store
+    file_path = tmp_path / "chain.pzb"
+    write_binary_dataset(file_path, store.takes, store.middle, store.gives, source.graph.content_hash())
+    
+    assert load_puzzles_from_file(file_path) == 4
+    graph = Puzzle.get_graph()
+    assert [Puzzle.get_puzzle(i).puzzle_number for i in range(4)] == ["104211", "114212", "124213", "134210"]
+    assert graph.to_adjacency() == source.graph.to_adjacency()
+    assert graph.content_hash() == source.graph.content_hash()
+    assert len(Puzzle.find_longest_chain(timeout_seconds=5, export_paths=False)) == 4
+    
+    # A corrupted file fails its checksum and loads nothing
+    data = bytearray(file_path.read_bytes())
+    data[-1] ^= 1
+    file_path.write_bytes(bytes(data))
+    assert load_puzzles_from_file(file_path) == 0
+    
+    # Out of range values or bucket IDs are rejected even with a matching checksum
+    write_binary_dataset(file_path, b"\x0a\x96", b"\x01\x02", b"\x0b\x0c", source.graph.content_hash(),
+                         with_index=False)
+    with pytest.raises(ValueError, match="value out of range"):
+        read_binary_dataset(file_path)
+    write_binary_dataset(file_path, store.takes, store.middle, store.gives, source.graph.content_hash())
+    data = bytearray(file_path.read_bytes())
+    data[-4:] = (4).to_bytes(4, "little")
+    data[16:20] = zlib.crc32(data[BINARY_HEADER.size:]).to_bytes(4, "little")
+    file_path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Bucket index out of range"):
+        read_binary_dataset(file_path)
+
 def test_find_longest_chain(setup_puzzles):
     # Create a chain: 1->2->3->4
     test_chain = [
@@ -47,6 +100,339 @@ def test_find_longest_chain(setup_puzzles):
     chain = Puzzle.find_longest_chain(timeout_seconds=5)
     assert len(chain) == 4
 
+def test_longest_chain_endpoint(setup_puzzles):
+    from main import app
+    
+    for puzzle in ["104211", "114212", "124213", "114299"]:
+        Puzzle.add_puzzle_direct(puzzle)
+    
+    client = app.test_client()
+    r = client.get("/api/puzzles/longest_chain?timeout=5&mode=exact")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["chain_length"] == 3
+    assert data["optimal"] is True
+    
+    r = client.get("/api/puzzles/longest_chain?mode=unknown")
+    assert r.status_code == 400
+
+def test_chain_cache_reuses_results(setup_puzzles, tmp_path, monkeypatch):
+    from chain_cache import ChainCache
+    import main
+    
+    for puzzle in ["104211", "114212", "124213"]:
+        Puzzle.add_puzzle_direct(puzzle)
+    
+    monkeypatch.setattr(main, "chain_cache", ChainCache(max_entries=2, cache_dir=tmp_path))
+    first = main.solve_chain(5, mode="exact")
+    assert first["cached"] is False
+    assert main.solve_chain(5, mode="exact")["cached"] is True
+    
+    # Same pieces in a different order hit the on-disk tier of a fresh cache
+    Puzzle.reset()
+    for puzzle in ["124213", "104211", "114212"]:
+        Puzzle.add_puzzle_direct(puzzle)
+    monkeypatch.setattr(main, "chain_cache", ChainCache(max_entries=2, cache_dir=tmp_path))
+    cached = main.solve_chain(5, mode="exact")
+    assert cached["cached"] is True
+    assert [Puzzle.get_puzzle(i).puzzle_number for i in cached["chain"]] == ["104211", "114212", "124213"]
+
+def test_chain_cache_keeps_stronger_results(tmp_path):
+    from chain_cache import ChainCache
+
+    cache = ChainCache(max_entries=1, cache_dir=tmp_path)
+    weak = {"optimal": False}
+    cache.put("a", "dfs", 5, weak, ["104211", "114212"])
+    # Evict the longer chain from memory; a shorter one must not overwrite it on disk
+    cache.put("b", "dfs", 5, weak, ["104211"])
+    kept = cache.put("a", "dfs", 30, weak, ["104211"])
+    assert kept["numbers"] == ["104211", "114212"] and kept["timeout_seconds"] == 30
+
+    # The longer timeout now hits, also from disk
+    assert ChainCache(cache_dir=tmp_path).get("a", "dfs", 30)["numbers"] == ["104211", "114212"]
+
+def test_solve_job_api(setup_puzzles):
+    from main import app
+    
+    for puzzle in ["104211", "114212", "124213", "114299"]:
+        Puzzle.add_puzzle_direct(puzzle)
+    
+    client = app.test_client()
+    r = client.post("/api/jobs", json={"timeout": 5, "mode": "dfs"})
+    assert r.status_code == 202
+    job_id = r.get_json()["job_id"]
+    
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        data = client.get(f"/api/jobs/{job_id}").get_json()
+        if data["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    assert data["status"] == "done"
+    assert data["best_length"] == 3
+    assert data["result"]["chain_length"] == 3
+    
+    assert client.post("/api/jobs", json={"mode": "unknown"}).status_code == 400
+    assert client.get("/api/jobs/missing").status_code == 404
+
+def test_solve_job_events_and_cancel(setup_puzzles):
+    import main
+    
+    for puzzle in ["104211", "114212", "124213", "114299"]:
+        Puzzle.add_puzzle_direct(puzzle)
+    
+    client = main.app.test_client()
+    job_id = client.post("/api/jobs", json={"timeout": 5, "mode": "dfs"}).get_json()["job_id"]
+    main.job_manager.get(job_id).wait(10)
+    
+    body = client.get(f"/api/jobs/{job_id}/events").get_data(as_text=True)
+    assert "event: best" in body
+    done = [line for line in body.split("\n\n") if line.startswith("event: done")]
+    assert len(done) == 1
+    assert '"status": "done"' in done[0]
+    
+    # A job that runs until it is told to stop
+    job = main.job_manager.submit(lambda job: {"stopped": job.stop_event.wait(10)}, {})
+    assert client.delete(f"/api/jobs/{job.id}").status_code == 202
+    assert job.wait(10)
+    assert job.status == "cancelled"
+    assert job.result == {"stopped": True}
+    assert client.delete("/api/jobs/missing").status_code == 404
+
+def test_solve_in_process_keeps_puzzle_ids(setup_puzzles):
+    from jobs import solve_in_process
+
+    for puzzle in ["994299", "104211", "114212", "124213"]:
+        Puzzle.add_puzzle_direct(puzzle)
+    session = Puzzle.get_session()
+    session.remove_puzzle(0)
+
+    events = []
+    result = solve_in_process(session, lambda event, data: events.append(event), timeout_seconds=5,
+                              mode="exact", export_paths=False)
+    assert result["chain"] == [1, 2, 3] and "best" in events
+    with pytest.raises(ValueError):
+        solve_in_process(session, timeout_seconds=5, mode="unknown")
+
+def test_dataset_registry_keeps_sessions_resident(setup_puzzles, tmp_path, monkeypatch):
+    import main
+    from dataset_registry import DatasetRegistry
+    
+    (tmp_path / "a.txt").write_text("104211\n114212\n")
+    (tmp_path / "b.txt").write_text("104211\n114212\n124213\n")
+    paths = {"a": tmp_path / "a.txt", "b": tmp_path / "b.txt"}
+    monkeypatch.setattr(main.config, "DATASET_PATHS", paths)
+    monkeypatch.setattr(main, "datasets", DatasetRegistry(paths, lambda path, session: load_puzzles_from_file(path, session=session)))
+    
+    client = main.app.test_client()
+    default_session = Puzzle.get_session()
+    assert len(client.get("/api/puzzles?dataset=a").get_json()) == 2
+    session_a = main.load_dataset("a")
+    assert len(client.get("/api/puzzles?dataset=b").get_json()) == 3
+    
+    # Loading b neither reloads nor clobbers a, nor changes the default for other clients
+    assert main.load_dataset("a") is session_a
+    assert len(session_a) == 2
+    assert Puzzle.get_session() is default_session
+    
+    r = client.get("/api/puzzles/longest_chain?timeout=5&dataset=a")
+    assert r.get_json()["chain_length"] == 2
+    r = client.get("/api/puzzles/longest_chain?timeout=5&dataset=b")
+    assert r.get_json()["chain_length"] == 3
+    assert client.get("/api/puzzles/longest_chain?dataset=missing").status_code == 400
+    
+    info = client.get("/api/datasets").get_json()
+    assert info["a"]["puzzle_count"] == 2
+    assert info["a"]["content_hash"] == session_a.graph.content_hash()
+    
+    # A changed file is reparsed on the next lookup
+    (tmp_path / "a.txt").write_text("104211\n114212\n124213\n134214\n")
+    assert len(main.load_dataset("a")) == 4
+
+def test_dataset_info_does_not_parse(tmp_path):
+    from dataset_registry import DatasetRegistry
+    
+    (tmp_path / "a.txt").write_text("104211\n114212\n")
+    (tmp_path / "empty.txt").write_text("")
+    loads = []
+    def loader(path, session):
+        loads.append(path.name)
+        load_puzzles_from_file(path, session=session)
+    registry = DatasetRegistry({"a": tmp_path / "a.txt", "empty": tmp_path / "empty.txt"}, loader)
+    
+    info = registry.info("a")
+    assert (info["exists"], info["loaded"], info["size_bytes"], info["puzzle_count"]) == (True, False, 14, None)
+    assert loads == []
+    registry.get("a")
+    assert registry.info("a")["puzzle_count"] == 2
+    
+    # A failed load is not retried until the file changes
+    assert registry.get("empty") is None and registry.get("empty") is None
+    assert loads == ["a.txt", "empty.txt"]
+    (tmp_path / "empty.txt").write_text("104211\n")
+    assert len(registry.get("empty")) == 1
+
+def test_upload_dataset_streams_body(setup_puzzles, monkeypatch):
+    import io
+    import main
+    
+    # Tiny chunks make lines straddle chunk boundaries
+    monkeypatch.setattr(main.config, "UPLOAD_CHUNK_BYTES", 5)
+    client = main.app.test_client()
+    body = b"104211\r\n114212\nbad\n124213\r\n134210"
+    r = client.post("/api/datasets/upload?name=my file.txt", data=io.BytesIO(body),
+                    content_type="application/octet-stream")
+    assert r.status_code == 201
+    data = r.get_json()
+    assert data["puzzle_count"] == 4
+    assert data["skipped"] == 1
+    assert data["dataset"].startswith("upload_my_file.txt_")
+    
+    r = client.get(f"/api/puzzles/longest_chain?timeout=5&dataset={data['dataset']}")
+    assert r.get_json()["chain_length"] == 4
+    
+    r = client.post("/api/datasets/upload", data=b"not puzzles\n")
+    assert r.status_code == 400
+    monkeypatch.setattr(main.config, "UPLOAD_MAX_BYTES", 10)
+    assert client.post("/api/datasets/upload", data=body).status_code == 413
+
+def test_add_and_remove_puzzle_endpoints(setup_puzzles):
+    import main
+    
+    for number in ["104211", "114212"]:
+        Puzzle.add_puzzle_direct(number)
+    client = main.app.test_client()
+    assert client.get("/api/puzzles/incremental_chain").get_json()["chain_length"] == 2
+    
+    r = client.post("/api/puzzles/add", json={"puzzle_number": "124213"})
+    assert r.status_code == 201
+    data = r.get_json()
+    assert data["chain"] == {"chain_length": 3, "optimal": True, "update": "spliced"}
+    
+    r = client.delete(f"/api/puzzles/{data['puzzle']['id']}")
+    assert r.get_json()["chain"]["chain_length"] == 2
+    assert client.delete(f"/api/puzzles/{data['puzzle']['id']}").status_code == 404
+    assert client.post("/api/puzzles/add", json={"puzzle_number": "12x"}).status_code == 400
+
+def test_export_endpoints_stream(setup_puzzles, tmp_path, monkeypatch):
+    from chain_cache import ChainCache
+    import json
+    import main
+
+    for number in ["104211", "114212", "124213"]:
+        Puzzle.add_puzzle_direct(number)
+    monkeypatch.setattr(main, "chain_cache", ChainCache(max_entries=2, cache_dir=tmp_path))
+    client = main.app.test_client()
+
+    r = client.get("/api/puzzles/export/chain.json?mode=exact&timeout=5")
+    assert r.status_code == 200 and r.is_streamed
+    data = json.loads(r.get_data(as_text=True))
+    assert data["metadata"]["chain_length"] == 3
+    assert [p["puzzle_number"] for p in data["chain"]] == ["104211", "114212", "124213"]
+    assert data["chain"][2]["connection"] == {"from_puzzle": "114212", "gives": "12", "takes": "12", "is_valid": True}
+
+    r = client.get("/api/puzzles/export/chain.txt?mode=exact&timeout=5")
+    assert r.is_streamed
+    lines = r.get_data(as_text=True).split("\n")
+    assert lines[:3] == ["Puzzle Chain Export", "=================", ""]
+    assert lines[-2:] == ["3. Puzzle #124213 - Takes: 12, Gives: 13", "   Connection: 12 → 12"]
+
+def test_compact_chain_exports(setup_puzzles, tmp_path, monkeypatch):
+    from array import array
+    from chain_cache import ChainCache
+    import gzip
+    import main
+
+    for number in ["104211", "114212", "124213"]:
+        Puzzle.add_puzzle_direct(number)
+    monkeypatch.setattr(main, "chain_cache", ChainCache(max_entries=2, cache_dir=tmp_path))
+    client = main.app.test_client()
+
+    r = client.get("/api/puzzles/export/chain.seq?mode=exact&timeout=5")
+    assert r.is_streamed and r.get_data(as_text=True) == "10421142124213"
+
+    r = client.get("/api/puzzles/export/chain.seq?mode=exact&timeout=5&compress=gzip")
+    assert r.mimetype == "application/gzip" and ".txt.gz" in r.headers["Content-Disposition"]
+    assert gzip.decompress(r.get_data()) == b"10421142124213"
+
+    r = client.get("/api/puzzles/export/chain.bin?mode=exact&timeout=5")
+    ids = array('I', r.get_data())
+    assert [Puzzle.get_puzzle(i).puzzle_number for i in ids] == ["104211", "114212", "124213"]
+
+    assert client.get("/api/puzzles/export/chain.bin?mode=exact&timeout=5&compress=rar").status_code == 400
+
+    # A finished job's chain is exported without solving again
+    job_id = client.post("/api/jobs", json={"mode": "exact", "timeout": 5}).get_json()["job_id"]
+    r = client.get(f"/api/puzzles/export/chain.seq?job={job_id}")
+    assert r.get_data(as_text=True) == "10421142124213"
+    assert client.get("/api/puzzles/export/chain.seq?job=missing").status_code == 400
+
+    # A piece removed since the job makes its chain fail before anything is streamed
+    client.delete(f"/api/puzzles/{ids[1]}")
+    r = client.get(f"/api/puzzles/export/chain.seq?job={job_id}")
+    assert r.status_code == 400 and "not loaded" in r.get_json()["error"]
+
+def test_extend_chain_endpoint(setup_puzzles, tmp_path, monkeypatch):
+    from chain_cache import ChainCache
+    import main
+
+    # 13 -> 99 goes onto the end, the 11 -> 12 -> 11 loop is spliced in at 11
+    for number in ["104211", "114212", "124211", "114213", "134299"]:
+        Puzzle.add_puzzle_direct(number)
+    client = main.app.test_client()
+
+    r = client.post("/api/chains/extend", json={"chain": [{"puzzle_number": "104211"}, {"puzzle_number": "114213"}]})
+    data = r.get_json()
+    assert (data["original_length"], data["chain_length"], data["added"]) == (2, 5, 3)
+    numbers = [p["puzzle_number"] for p in data["chain"]]
+    assert numbers[0] == "104211" and numbers.index("114213") > numbers.index("124211")
+    assert numbers[-1] == "134299"
+
+    assert client.post("/api/chains/extend", json=["104211", "134299"]).status_code == 400
+    assert client.post("/api/chains/extend", json=["999999"]).status_code == 400
+
+    # Without a chain the cached one is upgraded in place
+    monkeypatch.setattr(main, "chain_cache", ChainCache(max_entries=2, cache_dir=tmp_path))
+    assert client.post("/api/chains/extend").status_code == 404
+    dataset_hash = Puzzle.get_graph().content_hash()
+    main.chain_cache.put(dataset_hash, "dfs", 5, {"optimal": False}, ["114212", "124211"])
+    data = client.post("/api/chains/extend").get_json()
+    assert data["cached"] is True and data["chain_length"] == 5
+    assert len(main.chain_cache.get(dataset_hash, "dfs", 5)["numbers"]) == 5
+
+def test_validate_chains(setup_puzzles):
+    from chain_validator import validate_chain, validation_errors
+    import main
+
+    for number in ["104211", "114212", "124213", "114212"]:
+        Puzzle.add_puzzle_direct(number)
+    graph = Puzzle.get_graph()
+
+    assert validate_chain(graph, [0, 1, 2])["valid"]
+    result = validate_chain(graph, [0, 2, 0, 7])
+    assert (result["all_loaded"], result["unique"], result["connected"]) == (False, False, False)
+    assert validation_errors(result) == ["Puzzle ID 7 at position 4 is not loaded", "Puzzle ID 0 is used 2 times",
+                                         "Chain breaks at position 2: 11 given but 12 taken",
+                                         "Chain breaks at position 3: 13 given but 10 taken"]
+
+    client = main.app.test_client()
+    data = client.post("/api/chains/validate", data="1. Puzzle #104211\n2. Puzzle #114212\n").get_json()
+    assert data["valid"] and data["chain_length"] == 2
+
+    # 114212 is loaded twice, so it may be used twice but not three times
+    data = client.post("/api/chains/validate", json={"chains": [
+        ["104211", "114212", "124213"],
+        ["114212", "124211", "114212"],
+        ["114212", "124213", "114212", "124211", "114212"],
+    ]}).get_json()
+    assert data["valid_count"] == 1
+    assert data["results"][1]["unknown"] == [{"position": 2, "number": "124211"}]
+    assert data["results"][2]["duplicates"] == [{"number": "114212", "count": 3, "loaded": 2}]
+    assert [b["position"] for b in data["results"][2]["breaks"]] == [3]
+
+    assert client.post("/api/chains/validate", json={"chains": ["bogus"]}).status_code == 400
+    assert client.post("/api/chains/validate?max_errors=-1", json=["104211"]).status_code == 400
+
 @pytest.mark.integration
 def test_api(setup_puzzles):
     import requests
@@ -37,7 +37,7 @@ def test_simple_chain():
     
     # Verify order
     puzzles = Puzzle.get_all_puzzles()
-    chain_numbers = [next((p.puzzle_number for p in puzzles if p.id == i), "INVALID") for i in chain]
+    chain_numbers = [getattr(Puzzle.get_puzzle(i), "puzzle_number", "INVALID") for i in chain]
     expected = ["104211", "114212", "124213", "134214", "144215"]
     logger.info(f"Expected order: {expected}")
     logger.info(f"Actual order: {chain_numbers}")
@@ -118,6 +118,329 @@ def test_cycle_detection():
     
     logger.info("Cycle detection test passed!")
 
+def assert_valid_chain(chain):
+    """Check that a chain connects and uses each puzzle at most once"""
+    puzzles = {p.id: p for p in Puzzle.get_all_puzzles()}
+    assert len(set(chain)) == len(chain), "Chain reuses a puzzle"
+    for a, b in zip(chain, chain[1:]):
+        assert puzzles[a].puzzle_sides['gives'] == puzzles[b].puzzle_sides['takes']
+
+def test_euler_mode():
+    """Test that euler mode solves a multi-cycle dataset exactly"""
+    Puzzle.reset()
+    
+    # Two cycles through value 10 plus a tail: an Eulerian trail using all 7 pieces
+    for number in ["104211", "114212", "124210", "104213", "134210", "104299", "994288"]:
+        Puzzle.add_puzzle_direct(number)
+    
+    result = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="euler")
+    logger.info(f"\nEuler mode found {len(result['chain'])} puzzles (optimal: {result['optimal']})")
+    assert len(result["chain"]) == 7
+    assert result["optimal"]
+    assert_valid_chain(result["chain"])
+
+def test_euler_mode_fallback():
+    """Test that euler mode falls back to DFS when no Eulerian trail exists"""
+    Puzzle.reset()
+    
+    # Value 11 branches three ways, so no trail can use every piece
+    for number in ["104211", "114212", "114213", "114214", "124215"]:
+        Puzzle.add_puzzle_direct(number)
+    
+    chain = Puzzle.find_longest_chain(timeout_seconds=10, export_paths=False, mode="euler")
+    assert len(chain) == 3
+    assert_valid_chain(chain)
+
+def test_exact_mode():
+    """Test that exact mode proves optimality where no Eulerian trail exists"""
+    Puzzle.reset()
+    
+    # Value 11 branches three ways; the best trail loops 11 -> 12 -> 11 first
+    for number in ["104211", "114212", "124211", "114213", "114214", "144299", "134215"]:
+        Puzzle.add_puzzle_direct(number)
+    
+    result = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="exact")
+    logger.info(f"\nExact mode found {len(result['chain'])} puzzles (upper bound {result['upper_bound']})")
+    assert len(result["chain"]) == 5
+    assert result["optimal"]
+    assert result["upper_bound"] >= 5
+    assert_valid_chain(result["chain"])
+
+def test_exact_mode_parallel():
+    """Test that a parallel exact search matches the sequential one"""
+    Puzzle.reset()
+    
+    for number in ["104211", "114212", "124211", "114213", "114214", "144299", "134215", "554256", "564257"]:
+        Puzzle.add_puzzle_direct(number)
+    
+    sequential = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="exact", seed=7)
+    parallel = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="exact", workers=2, seed=7)
+    repeated = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="exact", workers=2, seed=7)
+    
+    assert parallel["optimal"]
+    assert len(parallel["chain"]) == len(sequential["chain"])
+    assert parallel["chain"] == repeated["chain"]
+    assert_valid_chain(parallel["chain"])
+
+def test_exact_mode_parallel_progress(monkeypatch):
+    """Test that the component pool reports operations like a single search does"""
+    from trail_solver import TrailSearch, ValueMultigraph, solve_components
+    multigraph = ValueMultigraph()
+    # Three equal components, none of them Eulerian
+    edges = [(base + takes, base + gives) for base in (10, 30, 50)
+             for takes, gives in [(0, 1), (1, 2), (1, 3), (2, 0), (1, 4)]]
+    for puzzle_id, (takes, gives) in enumerate(edges):
+        multigraph.add_edge(puzzle_id, takes, gives)
+    monkeypatch.setattr(TrailSearch, "PROGRESS_INTERVAL", 0)
+    progress = []
+    result = solve_components(multigraph, 10, workers=2,
+                              progress_callback=lambda event, data: event == "progress" and progress.append(data))
+    
+    assert progress and all("ops_per_second" in data for data in progress)
+    assert progress[-1]["components_done"] == progress[-1]["components_total"] == 3
+    assert progress[-1]["operations"] == result["operations"]
+
+def test_component_decomposition():
+    """Test that disjoint components are solved separately and bounded by their strong components"""
+    from trail_solver import ValueMultigraph, TrailSearch
+    Puzzle.reset()
+    
+    # Three disjoint pieces of the dataset: a 3-chain, a 2-cycle feeding a tail, and a 4-chain
+    numbers = ["104211", "114212", "124213",
+               "204221", "214220", "214222", "224223",
+               "304231", "314232", "324233", "334234"]
+    for number in numbers:
+        Puzzle.add_puzzle_direct(number)
+    
+    multigraph = ValueMultigraph.from_puzzle_graph(Puzzle.get_graph())
+    assert len(multigraph.weak_components()) == 3
+    strong = multigraph.strong_components()
+    assert {20, 21} in strong and {22} in strong
+    # The 20 <-> 21 cycle can be left only once, so its trails use at most 2 + 2 edges
+    assert multigraph.condensation_bounds()[20] == 4
+    assert TrailSearch(multigraph).global_upper_bound() == 4
+    
+    for workers in (1, 2):
+        result = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="exact", workers=workers)
+        assert result["components"] == 3
+        assert result["optimal"]
+        assert len(result["chain"]) == 4
+        assert_valid_chain(result["chain"])
+    assert Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False)["optimal"]
+
+def test_forced_run_contraction():
+    """Test that forced runs collapse into super-edges and expand back to valid chains"""
+    from trail_solver import ValueMultigraph, solve_exact
+    from graph_reduction import GraphReduction, forced_run_heads
+    Puzzle.reset()
+    
+    # 11, 12 and 13 each have one way in and one way out; 10 branches to a dead end
+    numbers = ["104211", "114212", "124213", "134210", "104299", "994210", "104277"]
+    for number in numbers:
+        Puzzle.add_puzzle_direct(number)
+    multigraph = ValueMultigraph.from_puzzle_graph(Puzzle.get_graph())
+    
+    reduction = GraphReduction(multigraph)
+    assert list(reduction.runs.values()) == [[0, 1, 2, 3], [4, 5]]
+    assert reduction.multigraph.edge_count == 3
+    assert reduction.expand(list(reduction.runs) + [6]) == [0, 1, 2, 3, 4, 5, 6]
+    # Only the heads of the two runs and the dead end are worth starting from
+    assert forced_run_heads(Puzzle.get_graph()) == [0, 4, 6]
+    
+    result = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="exact")
+    assert result["reduced_edges"] == 3
+    assert result["optimal"]
+    assert len(result["chain"]) == len(solve_exact(multigraph, 10)["chain"]) == 7
+    assert_valid_chain(result["chain"])
+    assert len(Puzzle.find_longest_chain(timeout_seconds=10, export_paths=False)) == 7
+
+def test_anytime_mode():
+    """Test that anytime mode improves a greedy chain and stops at the upper bound"""
+    Puzzle.reset()
+    
+    # A greedy walk from 10 can take 11 -> 13 -> 14 -> 99 and miss the 11 -> 12 -> 11 loop
+    for number in ["104211", "114212", "124211", "114213", "134214", "144299", "134215"]:
+        Puzzle.add_puzzle_direct(number)
+    
+    events = []
+    start_time = time.time()
+    result = Puzzle.solve_longest_chain(timeout_seconds=10, export_paths=False, mode="anytime", seed=3,
+                                        progress_callback=lambda event, data: events.append((event, data)))
+    assert time.time() - start_time < 5, "Should stop as soon as the upper bound is reached"
+    assert len(result["chain"]) == 6
+    assert result["optimal"]
+    assert_valid_chain(result["chain"])
+    best_lengths = [data["best_length"] for event, data in events if event == "best"]
+    assert best_lengths == sorted(best_lengths) and best_lengths[-1] == 6
+
+def test_anytime_mode_progress(monkeypatch):
+    """Test that anytime progress carries the same operation fields as the other searches"""
+    from trail_solver import TrailSearch
+    Puzzle.reset()
+    
+    # No chain reaches the upper bound here, so the search runs until the timeout
+    for number in ["144211", "124211", "104214", "124214", "144211", "124210"]:
+        Puzzle.add_puzzle_direct(number)
+    monkeypatch.setattr(TrailSearch, "PROGRESS_INTERVAL", 0)
+    progress = []
+    Puzzle.solve_longest_chain(timeout_seconds=0.05, export_paths=False, mode="anytime", seed=1,
+                               progress_callback=lambda event, data: event == "progress" and progress.append(data))
+    
+    assert progress
+    assert all(data["operations"] >= 0 and data["ops_per_second"] >= 0 for data in progress)
+
+def test_incremental_chain_matches_full_solve():
+    """Test that single-piece updates keep the chain as long as a full re-solve"""
+    import random
+    from trail_solver import ValueMultigraph, solve_exact
+    Puzzle.reset()
+    session = Puzzle.get_session()
+    rng = random.Random(16)
+    for _ in range(8):
+        session.add_puzzle(f"{rng.randint(10, 15)}42{rng.randint(10, 15)}")
+    engine = session.incremental_chain(timeout_seconds=10)
+    assert engine.state()["update"] == "solved"
+    
+    updates = set()
+    for step in range(60):
+        members = list(session.graph.nodes())
+        if members and rng.random() < 0.4:
+            session.remove_puzzle(rng.choice(members))
+        else:
+            session.add_puzzle(f"{rng.randint(10, 15)}42{rng.randint(10, 15)}")
+        state = engine.state()
+        updates.add(state["update"])
+        expected = solve_exact(ValueMultigraph.from_puzzle_graph(session.graph), 10)["chain"]
+        assert_valid_chain(state["chain"])
+        assert all(puzzle_id in session.graph for puzzle_id in state["chain"])
+        assert state["optimal"]
+        assert state["chain_length"] == len(expected), f"Step {step}"
+    
+    assert {"spliced", "searched"} <= updates
+
+def test_incremental_chain_skips_piece_seen_by_rebuild():
+    """Test that a piece a concurrent rebuild already picked up is not added twice"""
+    Puzzle.reset()
+    session = Puzzle.get_session()
+    session.add_puzzle("104211")
+    engine = session.incremental_chain(timeout_seconds=10)
+    engine.state()
+    
+    # The piece reaches the graph, and a rebuild runs before added() does
+    puzzle = Puzzle("114212", session.store)
+    session.graph.add(puzzle.id)
+    engine.invalidate()
+    engine.state()
+    engine.added(puzzle.id)
+    assert engine.multigraph.edges[(11, 12)] == [puzzle.id]
+    assert engine.state()["chain_length"] == 2
+
+def test_enumerate_longest_chains():
+    """Test that longest chains are enumerated lazily, once per takes/gives sequence"""
+    import json
+    Puzzle.reset()
+
+    # The two 10 -> 11 pieces are interchangeable, so only the 12 or 13 ending differs
+    for number in ["104211", "104311", "114210", "114212", "114213", "994298"]:
+        Puzzle.add_puzzle_direct(number)
+
+    chains = list(Puzzle.iter_longest_chains(timeout_seconds=10))
+    assert len(chains) == 2
+    for chain in chains:
+        assert len(chain) == 4
+        assert_valid_chain(chain)
+    assert sorted(Puzzle.get_puzzle(chain[-1]).puzzle_number for chain in chains) == ["114212", "114213"]
+    assert len(list(Puzzle.iter_longest_chains(limit=1, timeout_seconds=10))) == 1
+    # With slack, shorter chains that cannot be extended at either end count too
+    assert len(list(Puzzle.iter_longest_chains(slack=3, timeout_seconds=10))) == 3
+
+    json_path, txt_path = Puzzle.export_all_paths(Puzzle.iter_longest_chains(timeout_seconds=10),
+                                                  Puzzle.get_all_puzzles())
+    try:
+        with open(json_path) as f:
+            data = json.load(f)
+        assert list(data) == ["timestamp", "total_paths", "path_length", "paths"]
+        assert data["total_paths"] == 2 and data["path_length"] == 4
+        assert [len(path["puzzles"]) for path in data["paths"]] == [4, 4]
+        with open(txt_path) as f:
+            assert f.readline() == "All longest paths - 2 paths of 4 puzzles each\n"
+    finally:
+        os.unlink(json_path)
+        os.unlink(txt_path)
+
+def test_count_longest_chains():
+    """Test that counted longest chains match the enumerated ones"""
+    from chain_counter import count_eulerian_trails, determinant
+    from trail_solver import ValueMultigraph
+    Puzzle.reset()
+
+    # Eulerian: counted by the BEST theorem, with the parallel 10 -> 11 and 11 -> 10 pieces counted once
+    for number in ["104211", "104311", "114210", "114310", "104213", "134210", "104299"]:
+        Puzzle.add_puzzle_direct(number)
+    result = Puzzle.count_longest_chains()
+    assert result["exact"] and result["longest_length"] == 7
+    assert result["count"] == len(list(Puzzle.iter_longest_chains(timeout_seconds=10)))
+
+    # Not Eulerian: solved and enumerated within the timeout
+    Puzzle.reset()
+    for number in ["104211", "104311", "114210", "114212", "114213"]:
+        Puzzle.add_puzzle_direct(number)
+    result = Puzzle.count_longest_chains(timeout_seconds=5)
+    assert result["exact"] and result["count"] == 2 and result["optimal"]
+
+    assert determinant([[2, -1, 0], [-1, 2, -1], [0, -1, 2]]) == 4
+    # A single cycle of 3 is one circuit, cut at each of its 3 pieces
+    cycle = ValueMultigraph()
+    for puzzle_id, (takes, gives) in enumerate([(10, 11), (11, 12), (12, 10)]):
+        cycle.add_edge(puzzle_id, takes, gives)
+    assert count_eulerian_trails(cycle) == 3
+
+def test_value_index_matches_pairwise():
+    """Test that the value-bucket index matches the pairwise comparison graph"""
+    Puzzle.reset()
+    
+    for number in ["104211", "114212", "114299", "124210", "104210", "994211", "124212"]:
+        Puzzle.add_puzzle_direct(number)
+    
+    puzzles = Puzzle.get_all_puzzles()
+    expected = {p.id: [] for p in puzzles}
+    for p1 in puzzles:
+        for p2 in puzzles:
+            if p1.id != p2.id and p1.puzzle_sides['gives'] == p2.puzzle_sides['takes']:
+                expected[p1.id].append(p2.id)
+    
+    graph = Puzzle.get_graph()
+    assert graph.to_adjacency() == expected
+    assert graph.connection_count() == sum(len(n) for n in expected.values())
+    
+    logger.info("Value index test passed!")
+
+def test_value_index_after_removals():
+    """Test that swap-removals keep members and buckets consistent with the remaining puzzles"""
+    import random
+    Puzzle.reset()
+    session = Puzzle.get_session()
+    rng = random.Random(98)
+    session.add_columns(bytes(rng.randint(10, 14) for _ in range(200)), bytes([42]) * 200,
+                        bytes(rng.randint(10, 14) for _ in range(200)))
+    graph = session.graph
+    alive = set(range(200))
+    for step in range(400):
+        if alive and rng.random() < 0.6:
+            puzzle_id = rng.choice(sorted(alive))
+            assert session.remove_puzzle(puzzle_id) is not None
+            alive.discard(puzzle_id)
+        else:
+            alive.add(session.add_puzzle(f"{rng.randint(10, 14)}42{rng.randint(10, 14)}").id)
+        if step % 50 == 0:
+            graph.takes_buckets
+    
+    assert sorted(graph.nodes()) == sorted(alive)
+    for value, bucket in enumerate(graph.takes_buckets):
+        assert sorted(bucket) == sorted(i for i in alive if graph.takes[i] == value)
+    assert session.remove_puzzle(next(iter(alive))) is not None
+    assert not graph.remove(-1) and len(graph) == len(alive) - 1
+
 def test_performance():
     """Test performance with isolated dataset"""
     Puzzle.reset()
@@ -165,13 +488,12 @@ def test_performance():
         # Verify chain properties
         if len(chain) > 0:
             logger.info("Verifying chain connections...")
-            puzzles = Puzzle.get_all_puzzles()
             is_valid = True
             
             # Check connections
             for i in range(len(chain)-1):
-                p1 = next((p for p in puzzles if p.id == chain[i]), None)
-                p2 = next((p for p in puzzles if p.id == chain[i+1]), None)
+                p1 = Puzzle.get_puzzle(chain[i])
+                p2 = Puzzle.get_puzzle(chain[i+1])
                 
                 if not p1 or not p2:
                     logger.error(f"Invalid puzzle reference at position {i}")
@@ -211,6 +533,11 @@ def run_all_tests():
         test_branch_chain() 
         test_complex_structure()
         test_cycle_detection()
+        test_value_index_matches_pairwise()
+        test_euler_mode()
+        test_euler_mode_fallback()
+        test_exact_mode()
+        test_exact_mode_parallel()
         test_performance()
         logger.info("\nAll tests completed!")
         return True
@@ -1,5 +1,6 @@
 # src/test_source_optimized.py - Modified for Docker
 from puzzle import Puzzle
+from chain_validator import validate_chain, validation_errors
 from main import load_puzzles_from_file
 from main import app  # Import the Flask app
 import os
@@ -80,17 +81,9 @@ def find_longest_chain_optimized(timeout_seconds=600):
         logger.error("No puzzles to process")
         return []
         
-    # Build graph (silently)
-    graph = {}
-    for p in puzzles:
-        graph[p.id] = []
-        
-    connection_count = 0
-    for p1 in puzzles:
-        for p2 in puzzles:
-            if p1.id != p2.id and p1.puzzle_sides['gives'] == p2.puzzle_sides['takes']:
-                graph[p1.id].append(p2.id)
-                connection_count += 1
+    # Build graph (silently) from the shared value-bucket index
+    graph = Puzzle.get_graph().to_adjacency()
+    connection_count = sum(len(neighbors) for neighbors in graph.values())
     
     # Track variables
     start_time = time.time()
@@ -181,19 +174,10 @@ def find_longest_chain_optimized(timeout_seconds=600):
     logger.info(f"\nDONE: Found chain with {max_path_length} puzzles out of {len(puzzles)} total, in {total_time:.2f} seconds")
     
     # Verify chain validity
-    is_valid = True
-    for i in range(len(max_path) - 1):
-        p1 = next((p for p in puzzles if p.id == max_path[i]), None)
-        p2 = next((p for p in puzzles if p.id == max_path[i+1]), None)
-        
-        if not p1 or not p2:
-            logger.error(f"Invalid puzzle reference at position {i}")
-            is_valid = False
-            continue
-            
-        if p1.puzzle_sides['gives'] != p2.puzzle_sides['takes']:
-            logger.error(f"INVALID CONNECTION at position {i}: {p1.puzzle_number} gives {p1.puzzle_sides['gives']} but {p2.puzzle_number} takes {p2.puzzle_sides['takes']}")
-            is_valid = False
+    validation = validate_chain(Puzzle.get_graph(), max_path)
+    for message in validation_errors(validation):
+        logger.error(message)
+    is_valid = validation["valid"]
     
     if is_valid:
         logger.info("Chain validation: VALID ✓")
@@ -244,7 +228,7 @@ try:
     # Add chain details
     puzzles = Puzzle.get_all_puzzles()
     for i, puzzle_id in enumerate(chain):
-        puzzle = next((p for p in puzzles if p.id == puzzle_id), None)
+        puzzle = Puzzle.get_puzzle(puzzle_id)
         if not puzzle:
             logger.error(f"Puzzle with ID {puzzle_id} not found")
             continue
@@ -253,7 +237,7 @@ try:
         connection = ""
         if i > 0:
             prev_id = chain[i-1]
-            prev = next((p for p in puzzles if p.id == prev_id), None)
+            prev = Puzzle.get_puzzle(prev_id)
             if prev:
                 connection = f"{prev.puzzle_sides['gives']} → {puzzle.puzzle_sides['takes']}"
         
@@ -286,14 +270,14 @@ try:
         f.write("------------\n")
         
         for i, puzzle_id in enumerate(chain):
-            puzzle = next((p for p in puzzles if p.id == puzzle_id), None)
+            puzzle = Puzzle.get_puzzle(puzzle_id)
             if not puzzle:
                 f.write(f"{i+1}. ERROR: Puzzle with ID {puzzle_id} not found\n")
                 continue
             
             if i > 0:
                 prev_id = chain[i-1]
-                prev = next((p for p in puzzles if p.id == prev_id), None)
+                prev = Puzzle.get_puzzle(prev_id)
                 if prev:
                     connection = f"({prev.puzzle_sides['gives']} → {puzzle.puzzle_sides['takes']})"
                     f.write(f"  {connection}\n")
@@ -0,0 +1,833 @@
+# backend/src/trail_solver.py
+import logging
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from puzzle_graph import VALUE_COUNT
+
+logger = logging.getLogger(__name__)
+
+
+def edge_key(gives, weight=1):
+    """Search key of an edge: its gives value, offset by VALUE_COUNT per extra unit of weight
+
+    Plain edges keep their gives value as key, so only weighted edges pay
+    for the distinction.
+    """
+    return gives + VALUE_COUNT * (weight - 1)
+
+
+class ValueMultigraph:
+    """Puzzle set modelled as a directed multigraph over the 100 two-digit values
+
+    Every puzzle is an edge from its takes value to its gives value, so a chain
+    that uses each piece at most once is a trail in this multigraph. An edge
+    may carry a weight, the number of pieces it stands for (see
+    graph_reduction); trail lengths count weights.
+    """
+
+    def __init__(self):
+        # (takes, gives) -> puzzle IDs on that edge, in insertion order
+        self.edges = {}
+        # Weights of the edges that do not weigh 1
+        self.weights = {}
+        self.out_degree = [0] * VALUE_COUNT
+        self.in_degree = [0] * VALUE_COUNT
+        self.out_weight = [0] * VALUE_COUNT
+        self.edge_count = 0
+
+    def add_edge(self, puzzle_id, takes, gives, weight=1):
+        """Add a single puzzle as an edge takes -> gives"""
+        self.edges.setdefault((takes, gives), []).append(puzzle_id)
+        if weight != 1:
+            self.weights[puzzle_id] = weight
+        self.out_degree[takes] += 1
+        self.in_degree[gives] += 1
+        self.out_weight[takes] += weight
+        self.edge_count += 1
+
+    def remove_edge(self, puzzle_id, takes, gives):
+        """Remove a single puzzle's edge; returns False if it is not in the multigraph"""
+        ids = self.edges.get((takes, gives))
+        if not ids or puzzle_id not in ids:
+            return False
+        ids.remove(puzzle_id)
+        if not ids:
+            del self.edges[(takes, gives)]
+        self.out_degree[takes] -= 1
+        self.in_degree[gives] -= 1
+        self.out_weight[takes] -= self.weights.pop(puzzle_id, 1)
+        self.edge_count -= 1
+        return True
+
+    def length_of(self, chain):
+        """Length of a chain of edge IDs, counting weights"""
+        if not self.weights:
+            return len(chain)
+        weights = self.weights
+        return sum(weights.get(puzzle_id, 1) for puzzle_id in chain)
+
+    def subgraph(self, vertices):
+        """Multigraph of the edges leaving the given values"""
+        sub = ValueMultigraph()
+        weights = self.weights
+        for (takes, gives), ids in self.edges.items():
+            if takes in vertices:
+                for puzzle_id in ids:
+                    sub.add_edge(puzzle_id, takes, gives, weights.get(puzzle_id, 1))
+        return sub
+
+    @classmethod
+    def from_puzzle_graph(cls, graph):
+        """Build the multigraph from a PuzzleGraph value-bucket index"""
+        multigraph = cls()
+        for puzzle_id in graph.nodes():
+            multigraph.add_edge(puzzle_id, graph.takes[puzzle_id], graph.gives[puzzle_id])
+        return multigraph
+
+    def pairs_of(self, chain):
+        """Convert a chain of puzzle IDs into its (takes, edge_key) pairs"""
+        weights = self.weights
+        pair_of = {puzzle_id: (takes, edge_key(gives, weights.get(puzzle_id, 1)))
+                   for (takes, gives), ids in self.edges.items() for puzzle_id in ids}
+        return [pair_of[puzzle_id] for puzzle_id in chain]
+
+    def imbalance(self, vertex):
+        """Out-degree minus in-degree of a value"""
+        return self.out_degree[vertex] - self.in_degree[vertex]
+
+    def weak_components(self):
+        """Weakly connected components as a list of (vertices, edge_count)
+
+        edge_count is the total weight of the component's edges. Only values
+        that appear on at least one edge are included.
+        """
+        parent = list(range(VALUE_COUNT))
+
+        def find(v):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        for takes, gives in self.edges:
+            root_a, root_b = find(takes), find(gives)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        groups = {}
+        for v in range(VALUE_COUNT):
+            if self.out_degree[v] or self.in_degree[v]:
+                groups.setdefault(find(v), set()).add(v)
+
+        components = []
+        for vertices in groups.values():
+            edge_count = sum(self.out_weight[v] for v in vertices)
+            components.append((vertices, edge_count))
+
+        # Largest components first, ties broken by smallest value for determinism
+        components.sort(key=lambda c: (-c[1], min(c[0])))
+        return components
+
+    def strong_components(self):
+        """Strongly connected components as a list of vertex sets (Tarjan)
+
+        Components come out in reverse topological order: every edge between
+        two components leads to one listed earlier. Only values that appear
+        on at least one edge are included.
+        """
+        successors = [[] for _ in range(VALUE_COUNT)]
+        for takes, gives in self.edges:
+            successors[takes].append(gives)
+
+        index_of = [None] * VALUE_COUNT
+        lowlink = [0] * VALUE_COUNT
+        on_stack = [False] * VALUE_COUNT
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(VALUE_COUNT):
+            if index_of[root] is not None or not (self.out_degree[root] or self.in_degree[root]):
+                continue
+            # Iterative DFS: (vertex, position in its successor list)
+            work = [(root, 0)]
+            while work:
+                v, position = work.pop()
+                if position == 0:
+                    index_of[v] = lowlink[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                elif position <= len(successors[v]):
+                    # Returning from the successor visited at position - 1
+                    lowlink[v] = min(lowlink[v], lowlink[successors[v][position - 1]])
+
+                while position < len(successors[v]):
+                    w = successors[v][position]
+                    position += 1
+                    if index_of[w] is None:
+                        work.append((v, position))
+                        work.append((w, 0))
+                        break
+                    if on_stack[w]:
+                        lowlink[v] = min(lowlink[v], index_of[w])
+                else:
+                    if lowlink[v] == index_of[v]:
+                        component = set()
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            component.add(w)
+                            if w == v:
+                                break
+                        components.append(component)
+
+        return components
+
+    def condensation_bounds(self):
+        """Per value, an upper bound on trails starting in its strong component
+
+        A trail can never return to a strong component it has left, so it
+        visits components along a path of the condensation DAG: it uses at
+        most the internal edges of each component on the path plus one edge
+        per step between them.
+        """
+        components = self.strong_components()
+        component_of = [None] * VALUE_COUNT
+        for number, vertices in enumerate(components):
+            for v in vertices:
+                component_of[v] = number
+
+        weights = self.weights
+        internal = [0] * len(components)
+        # Heaviest edge from each component to each successor component
+        successors = [{} for _ in components]
+        for (takes, gives), ids in self.edges.items():
+            a, b = component_of[takes], component_of[gives]
+            if a == b:
+                internal[a] += self.length_of(ids)
+            else:
+                heaviest = max(weights.get(puzzle_id, 1) for puzzle_id in ids)
+                successors[a][b] = max(successors[a].get(b, 0), heaviest)
+
+        # Successor components are listed earlier, so one pass in list order suffices
+        longest = [0] * len(components)
+        for number in range(len(components)):
+            onward = max((weight + longest[other] for other, weight in successors[number].items()), default=0)
+            longest[number] = internal[number] + onward
+
+        return [longest[component_of[v]] if component_of[v] is not None else 0 for v in range(VALUE_COUNT)]
+
+    def eulerian_start(self, vertices):
+        """Start value of an Eulerian trail through a component, or None
+
+        A weakly connected component has an Eulerian trail when every value is
+        balanced (a circuit, start anywhere) or exactly one value has one more
+        outgoing edge and exactly one has one more incoming edge.
+        """
+        starts = []
+        ends = 0
+        for v in sorted(vertices):
+            diff = self.imbalance(v)
+            if diff == 0:
+                continue
+            if diff == 1:
+                starts.append(v)
+            elif diff == -1:
+                ends += 1
+            else:
+                return None
+
+        if not starts and not ends:
+            return min(v for v in vertices if self.out_degree[v])
+        if len(starts) == 1 and ends == 1:
+            return starts[0]
+        return None
+
+    def eulerian_trail(self, start):
+        """Hierholzer's algorithm from a start value, returning puzzle IDs
+
+        Assumes the component of start satisfies the Eulerian trail condition.
+        """
+        # Outgoing puzzle IDs per value; popped from the end, so reverse to
+        # consume edges in ascending value / insertion order
+        outgoing = [[] for _ in range(VALUE_COUNT)]
+        for (takes, gives), ids in sorted(self.edges.items(), reverse=True):
+            for puzzle_id in reversed(ids):
+                outgoing[takes].append((puzzle_id, gives))
+
+        trail = []
+        stack = [(None, start)]
+        while stack:
+            puzzle_id, vertex = stack[-1]
+            if outgoing[vertex]:
+                stack.append(outgoing[vertex].pop())
+            else:
+                stack.pop()
+                if puzzle_id is not None:
+                    trail.append(puzzle_id)
+
+        trail.reverse()
+        return trail
+
+
+def solve_eulerian(multigraph):
+    """Longest trail from Eulerian components of the value multigraph
+
+    Returns a dict with the chain of puzzle IDs, the upper bound on any chain
+    (the edge count of the largest component) and whether the chain is proven
+    optimal, which holds when an Eulerian component is also a largest one.
+    """
+    start_time = time.time()
+    components = multigraph.weak_components()
+    upper_bound = components[0][1] if components else 0
+
+    chain = []
+    for vertices, edge_count in components:
+        start = multigraph.eulerian_start(vertices)
+        if start is None:
+            logger.info(f"Component with {edge_count} edges has no Eulerian trail "
+                        f"(imbalanced values: {sum(1 for v in vertices if multigraph.imbalance(v))})")
+            continue
+        chain = multigraph.eulerian_trail(start)
+        logger.info(f"Eulerian trail of {len(chain)} edges from value {start:02d}")
+        break
+
+    return {
+        "chain": chain,
+        "optimal": multigraph.length_of(chain) == upper_bound,
+        "upper_bound": upper_bound,
+        "components": len(components),
+        "search_time_seconds": time.time() - start_time
+    }
+
+
+class TrailSearch:
+    """Exact branch-and-bound search for the longest trail in a ValueMultigraph
+
+    Parallel edges with identical takes/gives values and weight are
+    interchangeable, so the search walks over remaining edge counts per
+    (takes, edge_key) pair rather than over individual puzzles, and only
+    assigns puzzle IDs to the final trail.
+    """
+
+    # How many search steps to take between timeout checks
+    CHECK_INTERVAL = 256
+    # Seconds between progress reports
+    PROGRESS_INTERVAL = 5
+
+    def __init__(self, multigraph):
+        self.multigraph = multigraph
+        # Remaining edge counts: out_counts[takes][edge_key] -> count, and the
+        # IDs behind each (takes, edge_key) pair
+        self.out_counts = [{} for _ in range(VALUE_COUNT)]
+        self.edge_ids = {}
+        weights = multigraph.weights
+        max_weight = 1
+        for (takes, gives), ids in multigraph.edges.items():
+            for puzzle_id in ids:
+                weight = weights.get(puzzle_id, 1)
+                max_weight = max(max_weight, weight)
+                key = edge_key(gives, weight)
+                self.out_counts[takes][key] = self.out_counts[takes].get(key, 0) + 1
+                self.edge_ids.setdefault((takes, key), []).append(puzzle_id)
+        # Gives value and weight of every edge key
+        self.vertex_of = [key % VALUE_COUNT for key in range(VALUE_COUNT * max_weight)]
+        self.weight_of = [key // VALUE_COUNT + 1 for key in range(VALUE_COUNT * max_weight)]
+        self.operations = 0
+        self.best_pairs = []
+        # Best length known to all workers of a parallel search (a shared
+        # multiprocessing.Value), or None for a single-process search
+        self.shared_best = None
+        # Optional progress_callback(event, data) and stop event (anything
+        # with is_set(), checked alongside the deadline)
+        self.progress_callback = None
+        self.stop_event = None
+        self.start_time = time.time()
+        self._last_report = self.start_time
+
+    def length(self, pairs):
+        """Length of a trail given as (takes, edge_key) pairs, counting weights"""
+        weight_of = self.weight_of
+        return sum(weight_of[key] for _, key in pairs)
+
+    def _stopped(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def _report_progress(self, now):
+        """Send a progress snapshot at most every PROGRESS_INTERVAL seconds"""
+        if self.progress_callback is None or now - self._last_report < self.PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        elapsed = now - self.start_time
+        self.progress_callback("progress", {
+            "operations": self.operations,
+            "ops_per_second": self.operations / elapsed if elapsed > 0 else 0,
+            "best_length": max(self.length(self.best_pairs), self._shared_floor()),
+            "elapsed_seconds": elapsed
+        })
+
+    def _report_best(self):
+        if self.progress_callback is not None:
+            self.progress_callback("best", {
+                "best_length": self.length(self.best_pairs),
+                "chain": self.expand(self.best_pairs),
+                "elapsed_seconds": time.time() - self.start_time
+            })
+
+    def _shared_floor(self):
+        """Best length found by any worker so far"""
+        return self.shared_best.value if self.shared_best is not None else 0
+
+    def _publish(self, length):
+        """Share a new best length with the other workers"""
+        if self.shared_best is None:
+            return
+        with self.shared_best.get_lock():
+            if length > self.shared_best.value:
+                self.shared_best.value = length
+
+    def upper_bound(self, vertex):
+        """Upper bound on the length of a trail starting at vertex
+
+        Only edges reachable from vertex over unused edges can be used. Within
+        that subgraph every unused edge can fix at most one unit of degree
+        imbalance, so a trail has to leave out at least the positive imbalance
+        minus the one unit the start value is allowed to have. Every left out
+        edge weighs at least 1, so this also holds for weighted edges.
+        """
+        out_counts = self.out_counts
+        vertex_of = self.vertex_of
+        weight_of = self.weight_of
+        out_reach = {}
+        in_reach = {}
+        seen = {vertex}
+        stack = [vertex]
+        edge_count = 0
+        while stack:
+            u = stack.pop()
+            out_total = 0
+            for key, count in out_counts[u].items():
+                if not count:
+                    continue
+                out_total += count
+                edge_count += count * weight_of[key]
+                w = vertex_of[key]
+                in_reach[w] = in_reach.get(w, 0) + count
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+            out_reach[u] = out_total
+
+        excess = 0
+        for u in seen:
+            diff = out_reach.get(u, 0) - in_reach.get(u, 0)
+            if diff > 0:
+                excess += diff
+        if out_reach.get(vertex, 0) - in_reach.get(vertex, 0) > 0:
+            excess -= 1
+        return edge_count - max(excess, 0)
+
+    def component_bounds(self):
+        """Per value, an upper bound on any trail in its weak component
+
+        Each start value is bounded by both its reachability/imbalance bound
+        and the condensation bound of its strong component.
+        """
+        condensation = self.multigraph.condensation_bounds()
+        bounds = [0] * VALUE_COUNT
+        for vertices, _ in self.multigraph.weak_components():
+            component_bound = max(min(self.upper_bound(v), condensation[v])
+                                  for v in vertices if self.multigraph.out_degree[v])
+            for v in vertices:
+                bounds[v] = component_bound
+        return bounds
+
+    def global_upper_bound(self):
+        """Upper bound on any trail: the best bound over all weak components"""
+        return max(self.component_bounds())
+
+    def start_vertices(self):
+        """Values with outgoing edges, most promising start values first"""
+        graph = self.multigraph
+        candidates = [v for v in range(VALUE_COUNT) if graph.out_degree[v]]
+        return sorted(candidates, key=lambda v: (-graph.imbalance(v), -graph.out_degree[v], v))
+
+    def _successors(self, vertex):
+        """Edge keys of vertex with unused edges, most promising first"""
+        out_counts = self.out_counts
+        vertex_of = self.vertex_of
+        weight_of = self.weight_of
+        successors = [key for key, count in out_counts[vertex].items() if count]
+        # Self-loops never hurt, heavy edges are long runs of pieces, and busy
+        # values leave the most options open
+        successors.sort(key=lambda key: (vertex_of[key] != vertex, -weight_of[key],
+                                         -sum(out_counts[vertex_of[key]].values()), key))
+        successors.reverse()
+        return successors
+
+    def search_from(self, start, deadline, target=None):
+        """Depth-first branch-and-bound from one start value
+
+        Improves self.best_pairs in place. Returns False if the deadline fired
+        or the stop event was set before the subtree was exhausted, True
+        otherwise. Stops early once a
+        trail of target length is found.
+        """
+        out_counts = self.out_counts
+        vertex_of = self.vertex_of
+        weight_of = self.weight_of
+        best_length = self.length(self.best_pairs)
+        # Branches that cannot reach another worker's best are cut, but ties
+        # are still explored so each start value returns the same trail
+        # regardless of how the workers were scheduled
+        shared_floor = self._shared_floor()
+        if self.upper_bound(start) <= max(best_length, shared_floor - 1):
+            return True
+
+        path = []
+        length = 0
+        vertices = [start]
+        stack = [self._successors(start)]
+        completed = True
+
+        while stack:
+            self.operations += 1
+            if self.operations % self.CHECK_INTERVAL == 0:
+                now = time.time()
+                if now >= deadline or self._stopped():
+                    completed = False
+                    break
+                self._report_progress(now)
+                shared_floor = self._shared_floor()
+
+            candidates = stack[-1]
+            if not candidates:
+                stack.pop()
+                vertices.pop()
+                if path:
+                    u, key = path.pop()
+                    out_counts[u][key] += 1
+                    length -= weight_of[key]
+                continue
+
+            u = vertices[-1]
+            key = candidates.pop()
+            if not out_counts[u][key]:
+                continue
+
+            out_counts[u][key] -= 1
+            path.append((u, key))
+            length += weight_of[key]
+            w = vertex_of[key]
+
+            if length > best_length:
+                best_length = length
+                self.best_pairs = list(path)
+                self._publish(best_length)
+                self._report_best()
+                if target is not None and best_length >= target:
+                    break
+
+            if length + self.upper_bound(w) <= max(best_length, shared_floor - 1):
+                path.pop()
+                out_counts[u][key] += 1
+                length -= weight_of[key]
+                continue
+
+            vertices.append(w)
+            stack.append(self._successors(w))
+
+        # Restore the remaining counts so the next start sees the full graph
+        for u, key in path:
+            out_counts[u][key] += 1
+        return completed
+
+    def expand(self, pairs):
+        """Assign puzzle IDs to a trail given as (takes, edge_key) pairs"""
+        used = {}
+        chain = []
+        for pair in pairs:
+            index = used.get(pair, 0)
+            chain.append(self.edge_ids[pair][index])
+            used[pair] = index + 1
+        return chain
+
+
+# Per-process search state for parallel workers, set up by _init_worker
+_worker_search = None
+
+
+def _init_worker(multigraph, shared_best, stop_event):
+    """Build the search state once per worker process"""
+    global _worker_search
+    _worker_search = TrailSearch(multigraph)
+    _worker_search.shared_best = shared_best
+    _worker_search.stop_event = stop_event
+
+
+def _search_start(start, deadline, target):
+    """Worker task: exhaust the search from a single start value"""
+    search = _worker_search
+    search.best_pairs = []
+    search.operations = 0
+    completed = search.search_from(start, deadline, target=target)
+    return search.best_pairs, completed, search.operations
+
+
+def _search_parallel(search, starts, upper_bound, deadline, workers):
+    """Split start values across a process pool sharing the best-known length
+
+    Results are combined in start order and only a strictly longer trail
+    replaces the current one, so a completed search is deterministic for a
+    given start order and worker count. While the workers run, the parent
+    relays the search's stop event to them and reports progress.
+    """
+    context = multiprocessing.get_context()
+    best_pairs = search.best_pairs
+    shared_best = context.Value('i', search.length(best_pairs))
+    worker_stop = context.Event()
+    completed = True
+    operations = 0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(search.multigraph, shared_best, worker_stop)) as executor:
+        futures = [executor.submit(_search_start, start, deadline, upper_bound) for start in starts]
+        pending = set(futures)
+        search.shared_best = shared_best
+        while pending:
+            _, pending = wait(pending, timeout=1)
+            if search._stopped():
+                worker_stop.set()
+            search._report_progress(time.time())
+        search.shared_best = None
+
+        for future in futures:
+            pairs, done, worker_operations = future.result()
+            operations += worker_operations
+            completed = completed and done
+            if search.length(pairs) > search.length(best_pairs):
+                best_pairs = pairs
+
+    return best_pairs, completed, operations
+
+
+# Per-process stop event for component workers, set up by _init_component_worker
+_worker_stop = None
+
+
+def _init_component_worker(stop_event):
+    global _worker_stop
+    _worker_stop = stop_event
+
+
+def _solve_component(multigraph, deadline):
+    """Worker task: solve one weak component until the shared deadline"""
+    return solve_exact(multigraph, max(deadline - time.time(), 0), stop_event=_worker_stop)
+
+
+def _solve_components_parallel(candidates, best_length, length_of, deadline, workers, progress_callback,
+                               stop_event, start_time):
+    """Solve components in a process pool, largest bound first
+
+    Components still queued when the best trail already reaches their bound
+    are never started. Returns one result per candidate, None if skipped.
+    """
+    context = multiprocessing.get_context()
+    worker_stop = context.Event()
+    results = [None] * len(candidates)
+    last_report = start_time
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_component_worker,
+                             initargs=(worker_stop,)) as executor:
+        futures = {executor.submit(_solve_component, sub, deadline): index
+                   for index, (_, sub) in enumerate(candidates)}
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, timeout=1)
+            for future in finished:
+                if future.cancelled():
+                    continue
+                result = results[futures[future]] = future.result()
+                if length_of(result["chain"]) > best_length:
+                    best_length = length_of(result["chain"])
+                    if progress_callback is not None:
+                        progress_callback("best", {
+                            "best_length": best_length,
+                            "chain": result["chain"],
+                            "elapsed_seconds": time.time() - start_time
+                        })
+            for future in pending:
+                if candidates[futures[future]][0] <= best_length:
+                    future.cancel()
+            if stop_event is not None and stop_event.is_set():
+                worker_stop.set()
+
+            now = time.time()
+            if progress_callback is not None and now - last_report >= TrailSearch.PROGRESS_INTERVAL:
+                last_report = now
+                done = [result for result in results if result is not None]
+                # Only finished components report their operations
+                operations = sum(result["operations"] for result in done)
+                elapsed = now - start_time
+                progress_callback("progress", {
+                    "operations": operations,
+                    "ops_per_second": operations / elapsed if elapsed > 0 else 0,
+                    "best_length": best_length,
+                    "elapsed_seconds": elapsed,
+                    "components_done": len(done),
+                    "components_total": len(candidates)
+                })
+
+    return results
+
+
+def solve_components(multigraph, timeout_seconds=600, workers=1, seed=None, progress_callback=None,
+                     stop_event=None):
+    """Longest trail found by solving each weakly connected component on its own
+
+    A trail never leaves its weak component, so the components are
+    independent subproblems. They are tried in order of their upper bound,
+    which also uses the strong components, and any component whose bound
+    cannot beat the best trail so far is skipped without building its search.
+    With workers > 1 several components are solved at once in a process
+    pool; a single remaining component gets all workers for its start values.
+    """
+    start_time = time.time()
+    deadline = start_time + timeout_seconds
+    length_of = multigraph.length_of
+
+    components = []
+    for vertices, _ in multigraph.weak_components():
+        sub = multigraph.subgraph(vertices)
+        components.append((TrailSearch(sub).global_upper_bound(), sub))
+    components.sort(key=lambda c: -c[0])
+    upper_bound = components[0][0] if components else 0
+
+    # An Eulerian component is solved for free and often rules out the rest
+    best = solve_eulerian(multigraph)["chain"]
+    if best and progress_callback is not None:
+        progress_callback("best", {"best_length": length_of(best), "chain": best, "elapsed_seconds": 0.0})
+    candidates = [c for c in components if c[0] > length_of(best)]
+    logger.info(f"Component search: {len(components)} weak components, {len(candidates)} can beat "
+                f"the initial trail of {length_of(best)}, upper bound {upper_bound}")
+
+    if workers > 1 and len(candidates) > 1:
+        results = _solve_components_parallel(candidates, length_of(best), length_of, deadline, workers,
+                                             progress_callback, stop_event, start_time)
+    else:
+        results = []
+        for bound, sub in candidates:
+            if bound <= length_of(best) or time.time() >= deadline or (stop_event is not None and stop_event.is_set()):
+                results.append(None)
+                continue
+            result = solve_exact(sub, deadline - time.time(), workers=workers, seed=seed,
+                                 progress_callback=progress_callback, stop_event=stop_event)
+            results.append(result)
+            if length_of(result["chain"]) > length_of(best):
+                best = result["chain"]
+
+    # Ties go to the component listed first, so the answer does not depend on scheduling
+    optimal = True
+    operations = 0
+    for (bound, _), result in zip(candidates, results):
+        if result is not None:
+            operations += result["operations"]
+            if length_of(result["chain"]) > length_of(best):
+                best = result["chain"]
+    for (bound, _), result in zip(candidates, results):
+        if result is None:
+            optimal = optimal and bound <= length_of(best)
+        elif not result["optimal"]:
+            optimal = optimal and result["upper_bound"] <= length_of(best)
+
+    length = length_of(best)
+    elapsed = time.time() - start_time
+    logger.info(f"Component search finished: {length} puzzles, upper bound {upper_bound}, "
+                f"optimal: {optimal}, {operations:,} operations in {elapsed:.2f} seconds")
+    return {
+        "chain": best,
+        "optimal": optimal or length >= upper_bound,
+        "upper_bound": upper_bound,
+        "components": len(components),
+        "operations": operations,
+        "search_time_seconds": elapsed
+    }
+
+
+def solve_exact(multigraph, timeout_seconds=600, workers=1, seed=None, progress_callback=None, stop_event=None,
+                incumbent=None):
+    """Exact longest trail by branch-and-bound over the value multigraph
+
+    Starts from the best Eulerian trail, then searches every start value with
+    reachability and degree-imbalance upper bounds. The result is marked
+    optimal when the search completes or reaches the global upper bound.
+
+    With workers > 1 the start values are searched in a process pool. A seed
+    shuffles the order in which start values are tried.
+
+    progress_callback(event, data) receives periodic "progress" snapshots and
+    "best" events; setting stop_event ends the search with the best trail so far.
+    incumbent is an optional known chain of puzzle IDs in the multigraph to
+    start from when it beats the Eulerian trail.
+    """
+    start_time = time.time()
+    deadline = start_time + timeout_seconds
+
+    search = TrailSearch(multigraph)
+    search.progress_callback = progress_callback
+    search.stop_event = stop_event
+    upper_bound = search.global_upper_bound()
+
+    # An Eulerian component gives a strong incumbent for free
+    eulerian = solve_eulerian(multigraph)
+    search.best_pairs = multigraph.pairs_of(eulerian["chain"])
+    if incumbent is not None and multigraph.length_of(incumbent) > search.length(search.best_pairs):
+        search.best_pairs = multigraph.pairs_of(incumbent)
+    if search.best_pairs:
+        search._report_best()
+    logger.info(f"Exact search: upper bound {upper_bound}, initial trail {search.length(search.best_pairs)}")
+
+    starts = search.start_vertices()
+    if seed is not None:
+        random.Random(seed).shuffle(starts)
+
+    completed = True
+    if search.length(search.best_pairs) < upper_bound:
+        if workers > 1 and len(starts) > 1:
+            logger.info(f"Searching {len(starts)} start values with {workers} worker processes")
+            incumbent_length = search.length(search.best_pairs)
+            search.best_pairs, completed, search.operations = _search_parallel(
+                search, starts, upper_bound, deadline, workers)
+            if search.length(search.best_pairs) > incumbent_length:
+                search._report_best()
+        else:
+            for start in starts:
+                if not search.search_from(start, deadline, target=upper_bound):
+                    completed = False
+                    break
+                if search.length(search.best_pairs) >= upper_bound:
+                    break
+
+    if not completed and search._stopped():
+        logger.info("Search stopped on request")
+    elif not completed:
+        logger.info(f"Timeout reached after {timeout_seconds:.2f} seconds")
+
+    chain = search.expand(search.best_pairs)
+    length = search.length(search.best_pairs)
+    optimal = completed or length >= upper_bound
+    elapsed = time.time() - start_time
+    logger.info(f"Exact search finished: {length} puzzles, upper bound {upper_bound}, "
+                f"optimal: {optimal}, {search.operations:,} operations in {elapsed:.2f} seconds")
+
+    return {
+        "chain": chain,
+        "optimal": optimal,
+        "upper_bound": upper_bound,
+        "operations": search.operations,
+        "search_time_seconds": elapsed
+    }
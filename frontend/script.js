@@ -3,12 +3,17 @@ const API_BASE_URL = window.location.hostname === 'localhost'
     ? (window.location.port === '8080' ? 'http://localhost:5000/api' : 'http://localhost:5000/api') 
     : '/api';
 const DEFAULT_TIMEOUT = 60;
+// Greedy + local search keeps improving until the timeout and always returns its best chain
+const SEARCH_MODE = 'anytime';
 
 // Application state
 let puzzleData = [];
 let chainResult = null;
 let isProcessing = false;
 let currentDataset = null;
+let currentJobId = null;
+// Job that found chainResult, which exports render instead of solving again
+let chainJobId = null;
 
 // Initialize the application when DOM is ready
 document.addEventListener('DOMContentLoaded', () => {
@@ -27,6 +32,7 @@ function setupEventListeners() {
     
     // Chain finding
     document.getElementById('find-chain-btn')?.addEventListener('click', handleFindChain);
+    document.getElementById('stop-chain-btn')?.addEventListener('click', handleStopChain);
     document.getElementById('export-chain-btn')?.addEventListener('click', handleExportChain);
     
     // Input validation
@@ -60,7 +66,10 @@ async function loadAvailableDatasets() {
                 if (info.exists) {
                     const option = document.createElement('option');
                     option.value = name;
-                    option.textContent = `${name} (${info.puzzle_count} puzzles)`;
+                    // Datasets that were not loaded yet only report their file size
+                    option.textContent = info.loaded
+                        ? `${name} (${info.puzzle_count} puzzles)`
+                        : `${name} (${Math.ceil(info.size_bytes / 1024)} KB)`;
                     select.appendChild(option);
                 }
             }
@@ -106,38 +115,36 @@ async function handleLoadDataset() {
     }
     
     try {
-        updateStatus('Reading file...');
+        const file = fileInput.files[0];
+        updateStatus(`Uploading ${file.name}...`);
         isProcessing = true;
         updateUIState();
         
-        const file = fileInput.files[0];
-        const content = await readFileAsync(file);
-        
-        // Validate the file content
-        const lines = content.split(/\r?\n/).filter(line => line.trim());
-        const validLines = lines.filter(line => /^\d{6}$/.test(line.trim()));
+        // The file is streamed as the request body and parsed on the server
+        const response = await fetch(`${API_BASE_URL}/datasets/upload?name=${encodeURIComponent(file.name)}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/octet-stream' },
+            body: file
+        });
+        const result = await response.json();
         
-        if (validLines.length === 0) {
-            throw new Error('No valid puzzles found in file. Puzzles must be 6-digit numbers.');
+        if (!response.ok) {
+            throw new Error(result.error || `HTTP error ${response.status}`);
         }
         
-        // Create form data for upload
-        const formData = new FormData();
-        formData.append('file', file);
-        
-        // Since our backend doesn't have a file upload endpoint yet,
-        // we'll just display the results directly
-        document.getElementById('puzzle-count').textContent = validLines.length;
+        document.getElementById('puzzle-count').textContent = result.puzzle_count;
         document.getElementById('current-dataset').textContent = file.name;
         currentDataset = {
+            id: result.dataset,
             name: file.name,
-            count: validLines.length
+            count: result.puzzle_count
         };
         
         // Enable chain finding
         document.getElementById('find-chain-btn').disabled = false;
         
-        updateStatus(`Loaded ${validLines.length} puzzles from ${file.name}`);
+        const skipped = result.skipped ? `, skipped ${result.skipped} invalid lines` : '';
+        updateStatus(`Loaded ${result.puzzle_count} puzzles from ${file.name}${skipped}`);
     } catch (error) {
         console.error('Error processing file:', error);
         updateStatus(`Error: ${error.message}`, true);
@@ -166,6 +173,7 @@ async function loadPredefinedDataset(datasetName) {
         document.getElementById('puzzle-count').textContent = puzzleData.length;
         document.getElementById('current-dataset').textContent = datasetName;
         currentDataset = {
+            id: datasetName,
             name: datasetName,
             count: puzzleData.length
         };
@@ -197,13 +205,27 @@ async function handleFindChain() {
         updateUIState();
         
         const startTime = Date.now();
-        const response = await fetch(`${API_BASE_URL}/puzzles/longest_chain?timeout=${timeout}`);
+        const response = await fetch(`${API_BASE_URL}/jobs`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ timeout, mode: SEARCH_MODE, dataset: currentDataset?.id })
+        });
         
         if (!response.ok) {
             throw new Error(`HTTP error ${response.status}`);
         }
         
-        chainResult = await response.json();
+        const { job_id } = await response.json();
+        currentJobId = job_id;
+        updateUIState();
+        
+        const job = await followJob(job_id);
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Search failed');
+        }
+        
+        chainResult = job.result;
+        chainJobId = job_id;
         const endTime = Date.now();
         const clientElapsed = (endTime - startTime) / 1000;
         
@@ -218,16 +240,98 @@ async function handleFindChain() {
         // Display the chain
         displayChain(chainResult.chain);
         
-        updateStatus(`Found chain with ${chainResult.chain_length} puzzles in ${chainResult.processing_time_seconds.toFixed(2)} seconds`);
+        const stopped = job.status === 'cancelled' ? ' (stopped early)' : '';
+        updateStatus(`Found chain with ${chainResult.chain_length} puzzles in ${chainResult.processing_time_seconds.toFixed(2)} seconds${stopped}`);
     } catch (error) {
         console.error('Error finding chain:', error);
         updateStatus(`Failed to find chain: ${error.message}`, true);
     } finally {
+        currentJobId = null;
         isProcessing = false;
         updateUIState();
     }
 }
 
+// Follow a solve job over Server-Sent Events until it finishes; resolves with the final job status
+function followJob(jobId) {
+    return new Promise((resolve, reject) => {
+        const progressElement = document.getElementById('search-progress');
+        const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+        
+        source.addEventListener('progress', (e) => {
+            const progress = JSON.parse(e.data);
+            if (progressElement) {
+                const starts = progress.total_starts ? `, ${progress.processed_starts}/${progress.total_starts} starts` : '';
+                const components = progress.components_total
+                    ? `, ${progress.components_done}/${progress.components_total} components` : '';
+                // Searches report different fields, so only show the ones present
+                const operations = progress.operations !== undefined ? `${progress.operations.toLocaleString()} ops` : 'Searching';
+                const rate = progress.ops_per_second !== undefined
+                    ? ` (${Math.round(progress.ops_per_second).toLocaleString()}/s)` : '';
+                progressElement.textContent = `${operations}${rate}${starts}${components}`;
+            }
+            if (progress.elapsed_seconds !== undefined) {
+                document.getElementById('processing-time').textContent = `${progress.elapsed_seconds.toFixed(1)}s`;
+            }
+        });
+        
+        source.addEventListener('best', (e) => {
+            const best = JSON.parse(e.data);
+            document.getElementById('chain-length').textContent = best.best_length;
+            updateStatus(`Best chain so far: ${best.best_length} puzzles`);
+        });
+        
+        source.addEventListener('done', (e) => {
+            source.close();
+            if (progressElement) progressElement.textContent = '-';
+            resolve(JSON.parse(e.data));
+        });
+        
+        source.onerror = async () => {
+            // The stream dropped; fall back to the job's last known status
+            source.close();
+            try {
+                const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+                if (!response.ok) {
+                    throw new Error(`HTTP error ${response.status}`);
+                }
+                const job = await response.json();
+                if (job.status === 'queued' || job.status === 'running') {
+                    resolve(await followJob(jobId));
+                } else {
+                    resolve(job);
+                }
+            } catch (error) {
+                reject(error);
+            }
+        };
+    });
+}
+
+// Query suffix selecting the loaded predefined dataset on the backend
+function datasetQuery() {
+    return currentDataset?.id ? `&dataset=${encodeURIComponent(currentDataset.id)}` : '';
+}
+
+function exportQuery() {
+    return chainJobId ? `&job=${chainJobId}` : datasetQuery();
+}
+
+async function handleStopChain() {
+    if (!currentJobId) return;
+    
+    try {
+        updateStatus('Stopping search...');
+        const response = await fetch(`${API_BASE_URL}/jobs/${currentJobId}`, { method: 'DELETE' });
+        if (!response.ok) {
+            throw new Error(`HTTP error ${response.status}`);
+        }
+    } catch (error) {
+        console.error('Error stopping search:', error);
+        updateStatus(`Failed to stop search: ${error.message}`, true);
+    }
+}
+
 function displayChain(chain) {
     const chainContainer = document.getElementById('chain-container');
     chainContainer.innerHTML = '';
@@ -357,7 +461,7 @@ function addExportButtons() {
     textButton.innerHTML = '<span class="icon">📄</span> Export TXT';
     textButton.addEventListener('click', () => {
         const timeout = document.getElementById('timeout').value || 60;
-        window.open(`${API_BASE_URL}/puzzles/export/chain.txt?timeout=${timeout}`, '_blank');
+        window.open(`${API_BASE_URL}/puzzles/export/chain.txt?timeout=${timeout}&mode=${SEARCH_MODE}${exportQuery()}`, '_blank');
     });
     
     // Add JSON Export Button
@@ -367,12 +471,23 @@ function addExportButtons() {
     jsonButton.innerHTML = '<span class="icon">🔍</span> Export JSON';
     jsonButton.addEventListener('click', () => {
         const timeout = document.getElementById('timeout').value || 60;
-        window.open(`${API_BASE_URL}/puzzles/export/chain.json?timeout=${timeout}`, '_blank');
+        window.open(`${API_BASE_URL}/puzzles/export/chain.json?timeout=${timeout}&mode=${SEARCH_MODE}${exportQuery()}`, '_blank');
+    });
+    
+    // Add merged digit sequence Export Button, gzip compressed
+    const digitsButton = document.createElement('button');
+    digitsButton.id = 'export-digits-btn';
+    digitsButton.className = 'secondary-button';
+    digitsButton.innerHTML = '<span class="icon">🔢</span> Export Digits';
+    digitsButton.addEventListener('click', () => {
+        const timeout = document.getElementById('timeout').value || 60;
+        window.open(`${API_BASE_URL}/puzzles/export/chain.seq?timeout=${timeout}&mode=${SEARCH_MODE}&compress=gzip${exportQuery()}`, '_blank');
     });
     
     // Add buttons to container
     exportContainer.appendChild(textButton);
     exportContainer.appendChild(jsonButton);
+    exportContainer.appendChild(digitsButton);
     
     // Add container after the existing export button
     const exportButton = document.getElementById('export-chain-btn');
@@ -384,15 +499,6 @@ function addExportButtons() {
 }
 
 // Helper functions
-function readFileAsync(file) {
-    return new Promise((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = (e) => resolve(e.target.result);
-        reader.onerror = (e) => reject(new Error('Error reading file'));
-        reader.readAsText(file);
-    });
-}
-
 function updateStatus(message, isError = false) {
     const statusElement = document.getElementById('status');
     if (statusElement) {
@@ -407,18 +513,20 @@ function updateUIState() {
     const buttons = [
         document.getElementById('load-dataset-btn'),
         document.getElementById('find-chain-btn'),
-        document.getElementById('export-chain-btn')
+        document.getElementById('export-chain-btn'),
+        document.getElementById('stop-chain-btn')
     ];
     
     // Update buttons
     if (buttons[0]) buttons[0].disabled = isProcessing;
     if (buttons[1]) buttons[1].disabled = isProcessing || (!currentDataset);
     if (buttons[2]) buttons[2].disabled = isProcessing || (!chainResult?.chain);
+    if (buttons[3]) buttons[3].disabled = !currentJobId;
     
-    // Show/hide loading indicator
+    // Show/hide loading indicator; a running search shows live progress instead
     const loadingIndicator = document.getElementById('loading-indicator');
     if (loadingIndicator) {
-        loadingIndicator.style.display = isProcessing ? 'block' : 'none';
+        loadingIndicator.style.display = isProcessing && !currentJobId ? 'block' : 'none';
     }
     
     // Disable inputs during processing